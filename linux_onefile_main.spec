@@ -12,7 +12,8 @@ a = Analysis(['src/main.py'],
                   ('src/resources/Energy+.schema.epJSON', 'resources'),
                   ('src/resources/template_expansion_structures.yaml', 'resources'),
                   ('logs/logging.conf', 'logs')],
-             hiddenimports=['custom_exceptions', 'epjson_handler', 'expand_objects', 'hvac_template', 'logger'],
+             hiddenimports=['custom_exceptions', 'epjson_handler', 'expand_objects', 'hvac_template', 'json_backend',
+                           'logger', 'stage_scheduler'],
              hookspath=[],
              runtime_hooks=[],
              excludes=[],
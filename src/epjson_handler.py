@@ -1,15 +1,255 @@
+import os
 import pathlib
 import re
-import json
 import jsonschema
 import copy
+import hashlib
+import pickle
+import time
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from collections.abc import Mapping
+from types import MappingProxyType
 from custom_exceptions import PyExpandObjectsFileNotFoundError, PyExpandObjectsSchemaError, \
     PyExpandObjectsTypeError, UniqueNameException, InvalidEpJSONException
 from logger import Logger
+from json_backend import get_json_backend
 
 this_script_path = Path(__file__).resolve()
 
+# suffix of the precompiled schema written next to the schema file
+schema_cache_suffix = '.pickle'
+
+# schema validators shared by all EPJSON objects in the process, keyed by schema version, schema build, and file hash
+schema_validators = {}
+
+# schema validator keys of loaded schema files, keyed by file path, modification time, and file size
+schema_file_keys = {}
+
+
+def load_schema_file(file_location, cache_suffix=schema_cache_suffix):
+    """
+    Load a json schema file, using a precompiled artifact when it is current.
+
+    The artifact is keyed by a sha256 hash of the schema file contents and is only written for a schema that passed
+    the meta-schema check, so a schema read from a current artifact is trusted.  If the stored hash does not match, or
+    the artifact cannot be read, the json file is parsed.  Failure to write the artifact (e.g. read-only install
+    directory) is not an error.
+
+    :param file_location: json schema file path
+    :param cache_suffix: suffix appended to file_location for the precompiled artifact.  None disables the artifact.
+    :return: tuple of file hash, parsed schema, and boolean of whether the schema was read from a current artifact
+    """
+    try:
+        with open(file_location, 'rb') as f:
+            raw_schema = f.read()
+    except FileNotFoundError:
+        raise PyExpandObjectsFileNotFoundError("file does not exist: {}".format(file_location))
+    schema_hash = hashlib.sha256(raw_schema).hexdigest()
+    cache_location = Path(str(file_location) + cache_suffix) if cache_suffix else None
+    if cache_location and cache_location.is_file():
+        try:
+            with open(cache_location, 'rb') as f:
+                cached_hash, cached_schema = pickle.load(f)
+            if cached_hash == schema_hash:
+                return schema_hash, cached_schema, True
+        except (OSError, EOFError, ValueError, TypeError, pickle.UnpicklingError, AttributeError, ImportError):
+            pass
+    try:
+        schema = get_json_backend().loads(raw_schema)
+    except ValueError as e:
+        raise PyExpandObjectsTypeError("file is not a valid json: {}\n{}".format(file_location, str(e)))
+    return schema_hash, schema, False
+
+
+def write_schema_file_cache(file_location, schema_hash, schema, cache_suffix=schema_cache_suffix):
+    """
+    Write the precompiled artifact of a json schema file that passed the meta-schema check.
+
+    :param file_location: json schema file path
+    :param schema_hash: sha256 hash of the schema file contents
+    :param schema: parsed schema
+    :param cache_suffix: suffix appended to file_location for the precompiled artifact.  None disables the artifact.
+    :return: None
+    """
+    if not cache_suffix:
+        return
+    cache_location = Path(str(file_location) + cache_suffix)
+    try:
+        tmp_location = cache_location.with_name('{}.{}.tmp'.format(cache_location.name, os.getpid()))
+        with open(tmp_location, 'wb') as f:
+            pickle.dump((schema_hash, schema), f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp_location.replace(cache_location)
+    except OSError:
+        pass
+    return
+
+
+@lru_cache(maxsize=65536)
+def match_object_type(object_type_regexp, object_type, flags=0):
+    """
+    Check if an object type matches a regular expression.  Results are cached since the same reference patterns and
+    object types are checked for every template.
+
+    :param object_type_regexp: regular expression to match with object type
+    :param object_type: epJSON object type
+    :param flags: regular expression flags
+    :return: boolean of match
+    """
+    return re.match(object_type_regexp, object_type, flags) is not None
+
+
+# minimum number of epJSON objects for which schema validation is split across worker processes
+parallel_validation_minimum_objects = 2000
+
+# EPJSON object with the loaded schema of a validation worker process
+validation_worker_epjson = None
+
+
+def initialize_validation_worker(schema):
+    """
+    Load the schema validator once when a validation worker process starts.  The schema has already passed the
+    meta-schema check in the parent process.
+
+    :param schema: parsed schema
+    :return: None
+    """
+    global validation_worker_epjson
+    validation_worker_epjson = EPJSON(logger_level='ERROR')
+    validation_worker_epjson._validate_schema(schema, trusted=True)
+    return
+
+
+def get_epjson_errors_worker(validation_tasks):
+    """
+    Validate epJSON object types in a worker process
+
+    :param validation_tasks: list of (object type, object structure, required objects) tuples, see
+        EPJSON._get_validation_tasks
+    :return: list of errors from EPJSON._get_object_type_errors, in task order
+    """
+    epjson_errors = []
+    for object_type, object_structure, required_objects in validation_tasks:
+        epjson_errors.extend(validation_worker_epjson._get_object_type_errors(
+            object_type=object_type,
+            object_structure=object_structure,
+            required_objects=required_objects))
+    return epjson_errors
+
+
+def get_object_type_dictionary(object_structure):
+    """
+    Get the objects of an object type as a dictionary.  jsonschema only validates dictionaries as json objects, so the
+    object types of a read-only epJSON mapping (e.g. EPJSONLayeredView) are copied, without copying the objects.
+
+    :param object_structure: dictionary or mapping of object names to objects
+    :return: dictionary of object names to objects
+    """
+    if isinstance(object_structure, Mapping) and not isinstance(object_structure, dict):
+        return dict(object_structure)
+    return object_structure
+
+
+class EPJSONObjectTypeIndex:
+    """
+    Index of the object types in an epJSON dictionary that match each reference pattern, for repeated lookups against
+    the same dictionary.  Matches are listed in the dictionary key order.  Object types added to or removed from the
+    dictionary after the index is created clear the stored matches.
+
+    Attributes:
+        epjson: indexed epJSON dictionary
+
+        object_type_matches: dictionary of reference patterns to lists of matching object types
+    """
+
+    def __init__(self, epjson):
+        self.epjson = epjson
+        self.object_type_matches = {}
+        self._object_types = tuple(epjson)
+        return
+
+    def get_object_types(self, object_type_regexp):
+        """
+        Get the object types in the indexed dictionary that match a reference pattern
+
+        :param object_type_regexp: regular expression to match with object type
+        :return: list of object types
+        """
+        # compare the object types, not only their count, so a removed and an added type also clear the matches
+        object_types = tuple(self.epjson)
+        if object_types != self._object_types:
+            self.object_type_matches = {}
+            self._object_types = object_types
+        try:
+            return self.object_type_matches[object_type_regexp]
+        except KeyError:
+            object_types = [i for i in self.epjson.keys() if match_object_type(object_type_regexp, i)]
+            self.object_type_matches[object_type_regexp] = object_types
+            return object_types
+
+
+def copy_object_fields(epjson):
+    """
+    Copy the object type, object name, and object field levels of an epJSON dictionary.  Field values are not copied,
+    which is sufficient to keep a reference of unresolved objects since resolution replaces or removes top level field
+    values and does not modify nested values.
+
+    :param epjson: epJSON dictionary
+    :return: epJSON dictionary with new object field dictionaries
+    """
+    return {
+        object_type: {
+            object_name: dict(object_fields) if isinstance(object_fields, dict) else object_fields
+            for object_name, object_fields in object_structure.items()}
+        if isinstance(object_structure, dict) else object_structure
+        for object_type, object_structure in epjson.items()}
+
+
+class EPJSONLayeredView(Mapping):
+    """
+    Read-only view of a stack of epJSON dictionaries that behaves as the merge of the layers without copying them.
+    Object types are listed in the order they first appear in the layers.  When an object name exists in more than one
+    layer, the object from the earliest layer is used, the same as merge_epjson skipping a duplicate name.  Changes to
+    the layers are visible in the view.
+
+    Attributes:
+        layers: tuple of epJSON dictionaries, from the base layer to the top layer
+    """
+
+    def __init__(self, *layers):
+        self.layers = layers
+        return
+
+    def __getitem__(self, object_type):
+        object_structures = [layer[object_type] for layer in self.layers if object_type in layer]
+        if not object_structures:
+            raise KeyError(object_type)
+        if len(object_structures) == 1:
+            return MappingProxyType(object_structures[0])
+        merged_structure = {}
+        for object_structure in object_structures:
+            for object_name, object_fields in object_structure.items():
+                merged_structure.setdefault(object_name, object_fields)
+        return MappingProxyType(merged_structure)
+
+    def __contains__(self, object_type):
+        return any(object_type in layer for layer in self.layers)
+
+    def __iter__(self):
+        seen_object_types = set()
+        for layer in self.layers:
+            for object_type in layer:
+                if object_type not in seen_object_types:
+                    seen_object_types.add(object_type)
+                    yield object_type
+
+    def __len__(self):
+        return len(set().union(*self.layers))
+
+    def __bool__(self):
+        return any(self.layers)
+
 
 class EPJSON(Logger):
     """
@@ -24,15 +264,41 @@ class EPJSON(Logger):
 
         schema_is_valid: initialized as None.  False if failed, True if passed.
 
+        schema_load_time: time in seconds of the last schema load, including the meta-schema check.  None if no schema
+            was loaded.
+
         input_epjson_is_valid: initialized as None.  False if failed, True if passed.
+
+        validation_processes: number of worker processes used to validate epJSON objects with at least
+            parallel_validation_minimum_objects objects.  1 validates in serial.
+
+        json_backend: name of the JSON library used to read epJSON files.  None uses the fastest installed library.
     """
 
-    def __init__(self, no_schema=False, logger_level="WARNING", logger_name='console_only_logger', reset_stream=False):
+    def __init__(
+            self,
+            no_schema=False,
+            logger_level="WARNING",
+            logger_name='console_only_logger',
+            reset_stream=False,
+            validation_processes=1,
+            json_backend=None):
+        """
+        :param no_schema: Boolean flag for skipping schema validation
+        :param validation_processes: number of worker processes used to validate large epJSON objects.  The errors are
+            the same as in serial.
+        :param json_backend: JSON library used to read epJSON files, see json_backend.get_json_backend.  None uses the
+            fastest installed library.
+        """
         super().__init__(logger_level=logger_level, logger_name=logger_name, reset_stream=reset_stream)
         self.no_schema = no_schema
+        self.validation_processes = validation_processes
+        self.json_backend = json_backend
         self.schema = None
         self.Validator = jsonschema.Draft4Validator
         self.schema_is_valid = None
+        self.schema_load_time = None
+        self._object_type_validators = (None, {})
         self.input_epjson = None
         self.input_epjson_is_valid = None
         if self.no_schema:
@@ -41,6 +307,19 @@ class EPJSON(Logger):
                 'generated, which may lead to unexplained errors')
         return
 
+    def __getstate__(self):
+        # The validator class is created by jsonschema at runtime and cannot be pickled.
+        state = super().__getstate__()
+        state.pop('Validator', None)
+        state.pop('_object_type_validators', None)
+        return state
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        self.Validator = jsonschema.Draft4Validator
+        self._object_type_validators = (None, {})
+        return
+
     @staticmethod
     def merge_epjson(
             super_dictionary: dict,
@@ -150,22 +429,23 @@ class EPJSON(Logger):
         return None
 
     @staticmethod
-    def _get_json_file(json_location=None):
+    def _get_json_file(json_location=None, json_backend=None):
         """
         Load json file and return an error and None if fails
 
         :param json_location: file location for json object
+        :param json_backend: JSON library name, see json_backend.get_json_backend.  None uses the fastest installed
+            library.
         :return: loaded json object
         """
         if not isinstance(json_location, (str, pathlib.PosixPath, pathlib.WindowsPath)):
             raise PyExpandObjectsFileNotFoundError("JSON file location input is not a string: {}".format(json_location))
         try:
-            with open(json_location) as f:
-                json_obj = json.load(f)
+            json_obj = get_json_backend(json_backend).load(json_location)
             return json_obj
         except FileNotFoundError:
             raise PyExpandObjectsFileNotFoundError("file does not exist: {}".format(json_location))
-        except json.decoder.JSONDecodeError as e:
+        except ValueError as e:
             raise PyExpandObjectsTypeError("file is not a valid json: {}\n{}".format(json_location, str(e)))
 
     def get_epjson_objects(
@@ -175,7 +455,7 @@ class EPJSON(Logger):
         """
         Get objects from epJSON dictionary after filtering by object type and name.
 
-        :param epjson: epJSON formatted Dictionary to scan
+        :param epjson: epJSON formatted Dictionary, or EPJSONLayeredView, to scan
         :param object_type_regexp: regular expression to match with object type
         :param object_name_regexp: regular expression to match with object_name
         :return: epJSON dictionary of matched objects.
@@ -194,16 +474,18 @@ class EPJSON(Logger):
         except (ValueError, AttributeError, KeyError):
             raise InvalidEpJSONException('Invalid epJSON formatted object: {}'.format(epjson))
 
-    def _validate_schema(self, schema):
+    def _validate_schema(self, schema, trusted=False):
         """
         Validate schema based on the loaded
         jsonschema pre-built validator (self.Validator)
 
         :param schema: loaded schema object
+        :param trusted: skip the meta-schema check for a schema that has already passed it
         :return: validated schema object.  object and boolean are added to class attributes.
         """
         try:
-            self.Validator.check_schema(schema)
+            if not trusted:
+                self.Validator.check_schema(schema)
             validated_schema = self.Validator(schema)
             self.logger.info('schema version: %s', schema['epJSON_schema_version'])
             self.logger.info('schema build: %s', schema['epJSON_schema_build'])
@@ -215,6 +497,38 @@ class EPJSON(Logger):
         except Exception as e:
             raise PyExpandObjectsSchemaError("Schema Validator Failed: {}".format(str(e)))
 
+    def _load_schema_file(self, schema_file):
+        """
+        Load a schema file validator, which is shared by all EPJSON objects in the process.  The file is only read
+        again if its modification time or size changed, and the meta-schema check is skipped for a schema read from a
+        current precompiled artifact.
+
+        :param schema_file: location of json schema
+        :return: tuple of validated schema object and load source ('process cache', 'precompiled', or 'json')
+        """
+        try:
+            file_stat = os.stat(schema_file)
+            file_key = (os.path.abspath(schema_file), file_stat.st_mtime_ns, file_stat.st_size)
+        except OSError:
+            file_key = None
+        validator = schema_validators.get(schema_file_keys.get(file_key))
+        if validator:
+            self.logger.info('schema version: %s', validator.schema['epJSON_schema_version'])
+            self.logger.info('schema build: %s', validator.schema['epJSON_schema_build'])
+            self.schema_is_valid = True
+            self.schema = validator
+            return validator, 'process cache'
+        schema_hash, schema, trusted = load_schema_file(schema_file)
+        validator = self._validate_schema(schema, trusted=trusted)
+        if not trusted:
+            write_schema_file_cache(schema_file, schema_hash, schema)
+        schema_key = (schema['epJSON_schema_version'], schema['epJSON_schema_build'], schema_hash)
+        validator = schema_validators.setdefault(schema_key, validator)
+        self.schema = validator
+        if file_key:
+            schema_file_keys[file_key] = schema_key
+        return validator, 'precompiled' if trusted else 'json'
+
     def _load_schema(self, schema_ref=None):
         """
         Load schema to class object.
@@ -228,8 +542,10 @@ class EPJSON(Logger):
             self.schema = False
             self.schema_is_valid = False
         else:
+            start_time = time.perf_counter()
             if isinstance(schema_ref, dict):
-                schema = schema_ref
+                self._validate_schema(schema_ref)
+                load_source = 'dictionary'
             else:
                 # load schema from default if location is not provided.
                 if not schema_ref:
@@ -237,134 +553,277 @@ class EPJSON(Logger):
                         schema_ref = str(this_script_path.parent / 'resources' / 'Energy+.schema.epJSON')
                     except FileNotFoundError:
                         raise PyExpandObjectsFileNotFoundError('Schema default file path is not valid; \n%s')
-                schema = self._get_json_file(schema_ref)
-            self._validate_schema(schema)
+                if not isinstance(schema_ref, (str, pathlib.PosixPath, pathlib.WindowsPath)):
+                    raise PyExpandObjectsFileNotFoundError(
+                        "JSON file location input is not a string: {}".format(schema_ref))
+                _, load_source = self._load_schema_file(schema_ref)
+            self.schema_load_time = time.perf_counter() - start_time
             self.logger.info('Schema loaded')
+            self.logger.debug('Schema load (%s): %.3f s', load_source, self.schema_load_time)
         return
 
-    def validate_epjson(self, epjson):
+    def _get_object_type_validator(self, object_type):
         """
-        Validate json object as epJSON.  Return object if valid
+        Get the validator of an object type sub-schema of the loaded schema.  Validators are created once per loaded
+        schema, and references in the sub-schema are resolved against the full schema.
+
+        :param object_type: epJSON object type
+        :return: validator of the object type, or None if the object type is not a schema property
+        """
+        schema_validator, object_type_validators = self._object_type_validators
+        if schema_validator is not self.schema:
+            object_type_validators = {}
+            self._object_type_validators = (self.schema, object_type_validators)
+        if object_type not in object_type_validators:
+            object_type_schema = self.schema.schema.get('properties', {}).get(object_type)
+            object_type_validators[object_type] = self.Validator(
+                object_type_schema, resolver=self.schema.resolver) if object_type_schema is not None else None
+        return object_type_validators[object_type]
+
+    def _get_object_type_errors(self, object_type, object_structure, required_objects):
+        """
+        Validate the objects of one object type with the validator of its sub-schema, so the errors are attributed to
+        the object type and object that caused them.  Object types that are not schema properties are validated with
+        the full schema, together with the required objects.
+
+        :param object_type: epJSON object type
+        :param object_structure: dictionary of object names to objects
+        :param required_objects: epJSON dictionary of the required Building and GlobalGeometryRules objects
+        :return: list of tuples of object type, object name (None if the error is for the object type), and error
+            message, with the errors of the object type first and the errors of each object in epJSON order
+        """
+        object_type_errors = []
+        object_type_validator = self._get_object_type_validator(object_type)
+        if object_type_validator:
+            for err in object_type_validator.iter_errors(object_structure):
+                object_type_errors.append((object_type, err.path[0] if err.path else None, err.message))
+        else:
+            # errors of the required objects are reported with their own object types
+            for err in self.schema.iter_errors({**required_objects, object_type: object_structure}):
+                if not err.path:
+                    object_type_errors.append((object_type, None, err.message))
+                elif err.path[0] == object_type:
+                    object_type_errors.append((object_type, err.path[1] if len(err.path) > 1 else None, err.message))
+        # list the errors of the object type first, then the errors of each object in epJSON order
+        if len(object_type_errors) > 1 and isinstance(object_structure, dict):
+            object_positions = {object_name: idx for idx, object_name in enumerate(object_structure.keys())}
+            object_type_errors.sort(key=lambda x: object_positions.get(x[1], -1))
+        return object_type_errors
+
+    def _get_validation_tasks(self, epjson, required_objects, chunk_size):
+        """
+        Split the object types of an epJSON object into lists of validation tasks of about chunk_size objects.  Small
+        object types are grouped together, and large object types are split into chunks of objects if their
+        sub-schema has no constraints on the number of objects.
 
         :param epjson: epJSON object
-        :return: validated epJSON object
+        :param required_objects: epJSON dictionary of the required Building and GlobalGeometryRules objects
+        :param chunk_size: number of objects in each task list
+        :return: list of lists of (object type, object structure, required objects) tuples, in epJSON order
+        """
+        task_lists = [[]]
+        task_list_size = 0
+        for object_type, object_structure in epjson.items():
+            object_type_validator = self._get_object_type_validator(object_type)
+            object_names = list(object_structure.keys()) if isinstance(object_structure, dict) else []
+            if object_type_validator and len(object_names) > chunk_size and not any(
+                    i in object_type_validator.schema for i in ('minProperties', 'maxProperties', 'required')):
+                object_chunks = [
+                    {i: object_structure[i] for i in object_names[j:j + chunk_size]}
+                    for j in range(0, len(object_names), chunk_size)]
+            else:
+                object_chunks = [object_structure]
+            for object_chunk in object_chunks:
+                if task_list_size >= chunk_size:
+                    task_lists.append([])
+                    task_list_size = 0
+                task_lists[-1].append((object_type, object_chunk, None if object_type_validator else required_objects))
+                task_list_size += len(object_chunk) if isinstance(object_chunk, dict) else 1
+        return task_lists
+
+    def _get_unvalidated_objects(self, epjson, validated_epjson):
+        """
+        Get the objects of an epJSON object that still need to be validated.  An object is skipped if it is the same
+        object (not only an equal one) as the object of the same type and name in validated_epjson.  All objects of an
+        object type are kept if any of them need to be validated and the sub-schema constrains the number of objects,
+        so e.g. a second unique object is still found.
+
+        :param epjson: epJSON object
+        :param validated_epjson: epJSON dictionary of objects that have passed validation with the loaded schema
+        :return: epJSON dictionary of the object types with objects to validate
+        """
+        unvalidated_epjson = {}
+        for object_type, object_structure in epjson.items():
+            object_structure = get_object_type_dictionary(object_structure)
+            validated_objects = validated_epjson.get(object_type)
+            if not validated_objects or not isinstance(object_structure, dict):
+                unvalidated_epjson[object_type] = object_structure
+                continue
+            unvalidated_objects = {
+                object_name: object_fields for object_name, object_fields in object_structure.items()
+                if validated_objects.get(object_name) is not object_fields}
+            if not unvalidated_objects:
+                continue
+            object_type_validator = self._get_object_type_validator(object_type)
+            if object_type_validator is None or any(
+                    i in object_type_validator.schema for i in ('minProperties', 'maxProperties', 'required')):
+                unvalidated_epjson[object_type] = object_structure
+            else:
+                unvalidated_epjson[object_type] = unvalidated_objects
+        return unvalidated_epjson
+
+    def _get_epjson_errors(self, epjson, validated_epjson=None):
+        """
+        Validate an epJSON object in one pass over its object types, see _get_object_type_errors.  If more than one
+        validation process is used and the epJSON object is large, the object types are validated by a process pool
+        and the errors are merged in task order, so the errors are listed in the same order for every run.
+
+        :param epjson: epJSON object, or read-only epJSON mapping (e.g. EPJSONLayeredView)
+        :param validated_epjson: (Optional) epJSON dictionary of objects that have already passed validation, which are
+            not validated again, see _get_unvalidated_objects.
+        :return: list of tuples of object type, object name (None if the error is for the object type), and error
+            message
         """
         building_object = epjson.get('Building')
         global_geometry_rules_object = epjson.get('GlobalGeometryRules')
         if not building_object or not global_geometry_rules_object:
             raise PyExpandObjectsSchemaError('Building or GlobalGeometryRules object missing')
-        for object_type, object_structure in epjson.items():
-            if object_type not in ['Building', 'GlobalGeometryRules']:
-                epjson_object = {'Building': building_object, 'GlobalGeometryRules': global_geometry_rules_object}
-                self.merge_epjson(
-                    super_dictionary=epjson_object,
-                    object_dictionary={object_type: object_structure})
-                try:
-                    file_validation = self.schema.is_valid(epjson_object)
-                    if not file_validation:
-                        (object_name, _), = object_structure.items()
-                        # if the schema validation fails for the epJSON object, write out specific errors that occurred.
-                        self.logger.error("Error: Input file does not meet schema format")
-                        for err in self.schema.iter_errors(epjson_object):
-                            if re.match(r'.*{.*}.*', err.message):
-                                msg = '. '.join([
-                                    err.message,
-                                    '.  It appears a complex YAML reference was not resolved.'])
-                            else:
-                                msg = err.message
-                            self.logger.error('Error: Invalid choice in {} ({}). {}'
-                                              .format(object_type, object_name, msg))
-                    else:
-                        continue
-                except Exception as e:
-                    raise PyExpandObjectsSchemaError("epJSON validation failed while processing {}: {}"
-                                                     .format(object_type, str(e)))
+        required_objects = {
+            'Building': get_object_type_dictionary(building_object),
+            'GlobalGeometryRules': get_object_type_dictionary(global_geometry_rules_object)}
+        if validated_epjson:
+            unvalidated_epjson = self._get_unvalidated_objects(epjson=epjson, validated_epjson=validated_epjson)
+            self.logger.debug(
+                'Validating %s of %s epJSON objects',
+                sum(len(i) if isinstance(i, dict) else 1 for i in unvalidated_epjson.values()),
+                sum(len(i) if isinstance(i, Mapping) else 1 for i in epjson.values()))
+            epjson = unvalidated_epjson
+        elif not isinstance(epjson, dict):
+            epjson = {
+                object_type: get_object_type_dictionary(object_structure)
+                for object_type, object_structure in epjson.items()}
+        object_count = sum(len(i) if isinstance(i, dict) else 1 for i in epjson.values())
+        if not self.validation_processes or self.validation_processes <= 1 \
+                or object_count < parallel_validation_minimum_objects:
+            epjson_errors = []
+            for object_type, object_structure in epjson.items():
+                epjson_errors.extend(self._get_object_type_errors(
+                    object_type=object_type,
+                    object_structure=object_structure,
+                    required_objects=required_objects))
+            return epjson_errors
+        # Use several task lists per worker so uneven object types are balanced
+        task_lists = self._get_validation_tasks(
+            epjson=epjson,
+            required_objects=required_objects,
+            chunk_size=-(-object_count // (self.validation_processes * 4)))
+        with ProcessPoolExecutor(
+                max_workers=self.validation_processes,
+                initializer=initialize_validation_worker,
+                initargs=(self.schema.schema,)) as process_pool:
+            futures = [process_pool.submit(get_epjson_errors_worker, i) for i in task_lists]
+            epjson_errors = []
+            for future in futures:
+                epjson_errors.extend(future.result())
+        return epjson_errors
+
+    def _log_epjson_errors(self, epjson_errors):
+        """
+        Write epJSON schema validation errors to the logger
+
+        :param epjson_errors: list of tuples of object type, object name, and error message from _get_epjson_errors
+        :return: None
+        """
+        for object_type, object_name, message in epjson_errors:
+            if object_name is None:
+                self.logger.error('Error: Invalid choice in {} {}'.format(object_type, message))
+            else:
+                if re.match(r'.*{.*}.*', message):
+                    message = '. '.join([
+                        message,
+                        '.  It appears a complex YAML reference was not resolved.'])
+                self.logger.error('Error: Invalid choice in {} ({}). {}'.format(object_type, object_name, message))
+        return
+
+    def validate_epjson(self, epjson):
+        """
+        Validate json object as epJSON.  Return object if valid
+
+        :param epjson: epJSON object
+        :return: validated epJSON object
+        """
+        try:
+            epjson_errors = self._get_epjson_errors(epjson)
+        except PyExpandObjectsSchemaError:
+            raise
+        except Exception as e:
+            raise PyExpandObjectsSchemaError("epJSON validation failed: {}".format(str(e)))
+        if epjson_errors:
+            # if the schema validation fails for the epJSON object, write out specific errors that occurred.
+            self.logger.error("Error: Input file does not meet schema format")
+            self._log_epjson_errors(epjson_errors)
         return epjson
 
-    def _validate_epjson(self, input_epjson):
+    def _validate_epjson(self, input_epjson, validated_epjson=None):
         """
         Validate json file based on loaded schema.  I schema validation is off, then will return True for any
         dictionary.
 
         :param input_epjson: epJSON object
+        :param validated_epjson: (Optional) epJSON dictionary of objects that have already passed validation, which are
+            not validated again.
         :return: validated epJSON object.  object and boolean flag added to class attributes.
         """
         if self.no_schema:
-            if isinstance(input_epjson, dict):
+            if isinstance(input_epjson, Mapping):
                 setattr(self, 'input_epjson_is_valid', True)
                 setattr(self, 'input_epjson', input_epjson)
                 return input_epjson
             else:
                 raise PyExpandObjectsTypeError("input epJSON is not a dictionary object")
         try:
-            # Building ang GlobalGeometryRules are required objects. Retrieve those objects and one by one verify
-            # epJSON object types such that when an error is kicked, the logging statement can identify
-            # where it came from
-            building_object = input_epjson.get('Building')
-            global_geometry_rules_object = input_epjson.get('GlobalGeometryRules')
-            if not building_object or not global_geometry_rules_object:
-                raise PyExpandObjectsSchemaError('Building or GlobalGeometryRules object missing')
-            for object_type, object_structure in input_epjson.items():
-                if object_type not in ['Building', 'GlobalGeometryRules']:
-                    epjson_object = {'Building': building_object, 'GlobalGeometryRules': global_geometry_rules_object}
-                    self.merge_epjson(
-                        super_dictionary=epjson_object,
-                        object_dictionary={object_type: object_structure})
-                    file_validation = self.schema.is_valid(epjson_object)
-                    if not file_validation:
-                        if len(object_structure.keys()) > 1:
-                            self.logger.error("Error: Input file does not meet schema format")
-                            for err in self.schema.iter_errors(input_epjson):
-                                self.logger.error('Error: Invalid choice in {} {}'
-                                                  .format(object_type, err.message))
-                            raise PyExpandObjectsSchemaError("Error: Schema Format is invalid")
-                        else:
-                            (object_name, _), = object_structure.items()
-                            # if the schema validation fails for the epJSON object, write out specific errors that occurred.
-                            self.logger.error("Error: Input file does not meet schema format")
-                            for err in self.schema.iter_errors(input_epjson):
-                                if re.match(r'.*{.*}.*', err.message):
-                                    msg = '. '.join([
-                                        err.message,
-                                        '.  It appears a complex YAML reference was not resolved.'])
-                                else:
-                                    msg = err.message
-                                self.logger.error('Error: Invalid choice in {} ({}). {}'
-                                                  .format(object_type, object_name, msg))
-                            raise PyExpandObjectsSchemaError("Error: Schema Format is invalid")
-                    else:
-                        continue
+            # Building ang GlobalGeometryRules are required objects.  All errors are collected in one pass over the
+            # object types, so the logging statements can identify where each error came from.
+            epjson_errors = self._get_epjson_errors(input_epjson, validated_epjson=validated_epjson)
+            if epjson_errors:
+                self.logger.error("Error: Input file does not meet schema format")
+                self._log_epjson_errors(epjson_errors)
+                raise PyExpandObjectsSchemaError("Error: Schema Format is invalid")
             setattr(self, 'input_epjson_is_valid', True)
             setattr(self, 'input_epjson', input_epjson)
             return input_epjson
         except Exception as e:
             raise PyExpandObjectsSchemaError("Error: epJSON validation failed: {}".format(str(e)))
 
-    def _load_epjson(self, epjson_ref):
+    def _load_epjson(self, epjson_ref, validated_epjson=None):
         """
         Load schema to class object.
 
         :param epjson_ref: Location of epJSON file to read or object itself
+        :param validated_epjson: (Optional) epJSON dictionary of objects that have already passed validation, which are
+            not validated again.
 
         :return: boolean flag for valid epJSON and epJSON object as class attributes
         """
-        if isinstance(epjson_ref, dict):
+        if isinstance(epjson_ref, Mapping):
             input_epjson = epjson_ref
         else:
-            input_epjson = self._get_json_file(epjson_ref)
-        self._validate_epjson(input_epjson)
+            input_epjson = self._get_json_file(epjson_ref, json_backend=self.json_backend)
+        self._validate_epjson(input_epjson, validated_epjson=validated_epjson)
         self.logger.info(
             'input EPJSON file loaded, %s EnergyPlus object types',
             len(self.input_epjson.keys())
         )
         return self.input_epjson
 
-    def epjson_process(self, epjson_ref):
+    def epjson_process(self, epjson_ref, validated_epjson=None):
         """
         Default loading and verification of epJSON file
         :param epjson_ref: epJSON in dictionary format or file location.
+        :param validated_epjson: (Optional) epJSON dictionary of objects that have already passed validation with the
+            same schema, e.g. the unmodified input objects of an expanded epJSON, which are not validated again.
         :return: initialized class attributes and input_epJSON object
         """
         self._load_schema()
-        self._load_epjson(epjson_ref=epjson_ref)
+        self._load_epjson(epjson_ref=epjson_ref, validated_epjson=validated_epjson)
         return
@@ -1,19 +1,30 @@
+import os
 import copy
+import json
+import logging
 import yaml
 import re
+import ast
+import operator
+import hashlib
+import pickle
+from functools import lru_cache
 from pathlib import Path
 import numbers
 import typing
+import sys
 
 from custom_exceptions import PyExpandObjectsTypeError, InvalidTemplateException, \
     PyExpandObjectsYamlError, PyExpandObjectsFileNotFoundError, PyExpandObjectsYamlStructureException, \
-    PyExpandObjectsException
-from epjson_handler import EPJSON
+    PyExpandObjectsException, CustomException
+from epjson_handler import EPJSON, EPJSONObjectTypeIndex, EPJSONLayeredView, copy_object_fields
 
 source_dir = Path(__file__).parent
 
 yaml_file = None
 
+yaml_file_index = None
+
 this_script_path = Path(__file__).resolve()
 
 try:
@@ -22,6 +33,443 @@ try:
 except FileNotFoundError:
     raise PyExpandObjectsFileNotFoundError('YAML file not found')
 
+# suffix of the precompiled expansion structure written next to the source yaml file
+expansion_structure_cache_suffix = '.pickle'
+
+# template values that match an AnyValue TemplateObjects option start with a word character
+word_character_regex = re.compile(r'\w')
+
+
+def load_expansion_structure(file_location, cache_suffix=expansion_structure_cache_suffix):
+    """
+    Load a yaml expansion structure file, using a precompiled artifact when it is current.
+
+    The artifact is keyed by a sha256 hash of the yaml file contents.  If the stored hash does not match, or the
+    artifact cannot be read, the yaml file is parsed and the artifact is rewritten.  Failure to write the artifact
+    (e.g. read-only install directory) is not an error.
+
+    :param file_location: yaml file path
+    :param cache_suffix: suffix appended to file_location for the precompiled artifact.  None disables the artifact.
+    :return: parsed yaml structure
+    """
+    with open(file_location, 'rb') as f:
+        raw_yaml = f.read()
+    yaml_hash = hashlib.sha256(raw_yaml).hexdigest()
+    cache_location = Path(str(file_location) + cache_suffix) if cache_suffix else None
+    if cache_location and cache_location.is_file():
+        try:
+            with open(cache_location, 'rb') as f:
+                cached_hash, cached_structure = pickle.load(f)
+            if cached_hash == yaml_hash:
+                return cached_structure
+        except (OSError, EOFError, ValueError, TypeError, pickle.UnpicklingError, AttributeError, ImportError):
+            pass
+    try:
+        # todo_eo: discuss tradeoff of safety vs functionality of SafeLoader/FullLoader.
+        #   With FullLoader there would be more functionality and the ability to create more
+        #   complex yaml files but it might not be necessary.
+        parsed_value = yaml.load(raw_yaml, Loader=yaml.SafeLoader)
+    except yaml.YAMLError as err:
+        raise PyExpandObjectsYamlError('Failed to load YAML:\n{}'.format(err))
+    if cache_location:
+        try:
+            tmp_location = cache_location.with_name('{}.{}.tmp'.format(cache_location.name, os.getpid()))
+            with open(tmp_location, 'wb') as f:
+                pickle.dump((yaml_hash, parsed_value), f, protocol=pickle.HIGHEST_PROTOCOL)
+            tmp_location.replace(cache_location)
+        except OSError:
+            pass
+    return parsed_value
+
+
+# operators allowed in field value expressions
+expression_binary_operators = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow}
+
+expression_unary_operators = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg}
+
+# functions allowed in field value expressions
+expression_functions = {
+    'min': min,
+    'max': max,
+    'abs': abs}
+
+# constant node types of field value expressions, mapped to the attribute holding the value.  Python 3.7 parses
+#   numbers to Num nodes and True/False/None to NameConstant nodes instead of Constant nodes.
+if sys.version_info < (3, 8):
+    expression_constant_nodes = {ast.Num: 'n', ast.NameConstant: 'value'}
+else:
+    expression_constant_nodes = {ast.Constant: 'value'}
+
+# maximum absolute exponent allowed for the power operator
+expression_maximum_exponent = 100
+
+# characters that can start an arithmetic expression.  Other strings are not parsed unless they start with a
+#   function call.
+expression_start_characters = frozenset('0123456789.+-(')
+
+
+@lru_cache(maxsize=4096)
+def _parse_expression(expression):
+    """
+    Parse an expression string to an abstract syntax tree.  Results are cached, including failed parses.
+
+    :param expression: expression string
+    :return: expression body node, or None if the string is not valid syntax
+    """
+    try:
+        return ast.parse(expression.lstrip(' \t'), mode='eval').body
+    except SyntaxError:
+        return None
+
+
+def _evaluate_expression_node(node):
+    """
+    Evaluate an arithmetic expression node.  Nodes are evaluated in the same order as Python, so 'or' and 'and'
+    short circuit before an unsupported branch is reached.
+
+    :param node: abstract syntax tree node
+    :return: numeric value
+    """
+    if type(node) in expression_constant_nodes:
+        value = getattr(node, expression_constant_nodes[type(node)])
+        if isinstance(value, (int, float)):
+            return value
+    elif isinstance(node, ast.BinOp) and type(node.op) in expression_binary_operators:
+        left = _evaluate_expression_node(node.left)
+        right = _evaluate_expression_node(node.right)
+        if isinstance(node.op, ast.Pow) and abs(right) > expression_maximum_exponent:
+            raise SyntaxError('Exponent is too large for field value expression')
+        return expression_binary_operators[type(node.op)](left, right)
+    elif isinstance(node, ast.UnaryOp) and type(node.op) in expression_unary_operators:
+        return expression_unary_operators[type(node.op)](_evaluate_expression_node(node.operand))
+    elif isinstance(node, ast.BoolOp):
+        for value_node in node.values:
+            value = _evaluate_expression_node(value_node)
+            if isinstance(node.op, ast.Or) == bool(value):
+                return value
+        return value
+    elif isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and \
+            node.func.id in expression_functions and not node.keywords and \
+            not any(isinstance(i, ast.Starred) for i in node.args):
+        return expression_functions[node.func.id](*[_evaluate_expression_node(i) for i in node.args])
+    elif isinstance(node, ast.Name):
+        raise NameError("name '{}' is not defined".format(node.id))
+    raise SyntaxError('Unsupported field value expression')
+
+
+def evaluate_expression(expression, fast_path=True):
+    """
+    Evaluate a numeric expression from a formatted field value (e.g. '0.5 * 2 or Autosize').  Only numeric
+    constants with arithmetic and boolean operators, and the functions in expression_functions, are evaluated.  This
+    replaces eval() with the same NameError and SyntaxError signals for values that are not expressions.
+
+    :param expression: formatted field value string
+    :param fast_path: raise SyntaxError without parsing if the string cannot start an arithmetic expression
+    :return: numeric value
+    """
+    if fast_path:
+        expression_text = expression.lstrip(' \t')
+        if expression_text[:1] not in expression_start_characters and \
+                expression_text.partition('(')[0].rstrip() not in expression_functions:
+            raise SyntaxError('Field value is not an expression')
+    node = _parse_expression(expression)
+    if node is None:
+        raise SyntaxError('Field value is not an expression')
+    return _evaluate_expression_node(node)
+
+
+class ExpansionStructureIndex:
+    """
+    Lookup table for a loaded expansion structure.  Every key path in the nested dictionaries is mapped to its node
+    as a tuple, so a structure hierarchy is retrieved with one dictionary call instead of a walk.  Each dictionary node
+    also has an option table to resolve TemplateObjects keys ('AnyValue', 'AnyNumber', or a literal option) without
+    regex.
+
+    The indexed structure is shared and must not be modified.
+
+    Attributes:
+        structure: indexed expansion structure
+
+        paths: dictionary of tuple key paths to nodes
+
+        node_paths: dictionary of node ids to their tuple key path, for dictionary nodes
+
+        lookups: number of index lookups requested
+
+        hits: number of index lookups resolved from the table
+
+        option_tree_plans: dictionary of OptionTree tuple key paths to compiled OptionTreePlan objects
+    """
+
+    def __init__(self, structure):
+        self.structure = structure
+        self.paths = {(): structure}
+        self.node_paths = {}
+        self.option_tables = {}
+        self.lookups = 0
+        self.hits = 0
+        self.option_tree_plans = {}
+        self._index_node(node_path=(), node=structure)
+        return
+
+    def _index_node(self, node_path, node):
+        """
+        Add a dictionary node and all of its nested dictionary values to the index
+
+        :param node_path: tuple key path of the node
+        :param node: dictionary node
+        :return: None
+        """
+        self.node_paths.setdefault(id(node), node_path)
+        self.option_tables[node_path] = self.build_option_table(node)
+        for key, value in node.items():
+            self.paths[node_path + (key, )] = value
+            if isinstance(value, dict):
+                self._index_node(node_path=node_path + (key, ), node=value)
+        return
+
+    @staticmethod
+    def build_option_table(node):
+        """
+        Build the option dispatch table for a dictionary node
+
+        :param node: dictionary node
+        :return: tuple of (literal option keys, AnyValue present, AnyNumber present)
+        """
+        return (
+            frozenset(i for i in node.keys() if isinstance(i, str) and i not in ('AnyValue', 'AnyNumber')),
+            'AnyValue' in node,
+            'AnyNumber' in node)
+
+    @staticmethod
+    def match_option(option_table, key):
+        """
+        Get the option key from a node that matches a template value.
+
+        :param option_table: option table of the node, from build_option_table
+        :param key: template value
+        :return: list of matching option keys
+        """
+        literal_keys, any_value, any_number = option_table
+        key_text = str(key)
+        matches = []
+        if key_text in literal_keys:
+            matches.append(key_text)
+        if any_value and key_text != 'None' and (key_text[:1].isalnum() or key_text[:1] == '_'):
+            matches.append('AnyValue')
+        if any_number and key_text != 'None' and isinstance(key, (int, float)):
+            matches.append('AnyNumber')
+        return matches
+
+    def get(self, structure_hierarchy, structure=None, match_option=False):
+        """
+        Retrieve a node from the index.
+
+        :param structure_hierarchy: list representing structure hierarchy
+        :param structure: indexed node to start from.  Default is the structure root.
+        :param match_option: resolve the last hierarchy key as a TemplateObjects option.
+        :return: tuple of (found, node).  The node is the shared object and is not copied.
+        """
+        self.lookups += 1
+        node_path = () if structure is None or structure is self.structure else self.node_paths.get(id(structure))
+        if node_path is None:
+            return False, None
+        path = node_path + tuple(structure_hierarchy)
+        if not match_option:
+            if path in self.paths:
+                self.hits += 1
+                return True, self.paths[path]
+            return False, None
+        parent_path = path[:-1]
+        option_table = self.option_tables.get(parent_path)
+        if option_table is None:
+            return False, None
+        matches = self.match_option(option_table, path[-1])
+        # multiple matches depend on key order, so leave those to a direct walk
+        if len(matches) > 1:
+            return False, None
+        self.hits += 1
+        parent = self.paths[parent_path]
+        return True, parent[matches[0]] if matches else parent
+
+
+def get_shared_expansion_structure(file_location=expansion_structure_location):
+    """
+    Get the yaml expansion structure shared by all instances in the process, loading it on the first call
+
+    :param file_location: yaml file path used if the structure is not loaded
+    :return: parsed yaml structure
+    """
+    global yaml_file
+    if not yaml_file:
+        yaml_file = load_expansion_structure(file_location)
+    return yaml_file
+
+
+def get_expansion_structure_index(structure):
+    """
+    Get the index for an expansion structure.  The process-wide yaml structure index is built once and reused.
+
+    :param structure: loaded expansion structure
+    :return: ExpansionStructureIndex
+    """
+    global yaml_file_index
+    if structure is yaml_file:
+        if yaml_file_index is None or yaml_file_index.structure is not yaml_file:
+            yaml_file_index = ExpansionStructureIndex(yaml_file)
+        return yaml_file_index
+    return ExpansionStructureIndex(structure)
+
+
+class OptionTreePlan:
+    """
+    Expansion plan compiled from an OptionTree branch of the shared expansion structure.  The plan is built once per
+    process for each template type and holds the pre-flattened leaves (Objects, Transitions, Mappings) for BuildPath,
+    BaseObjects, and each TemplateObjects option, along with the flattened BuildPath actions.  Template expansion
+    copies only the leaves that are selected instead of the whole option tree.
+
+    A leaf value of None means the leaf could not be compiled and must be retrieved from the option tree directly,
+    which reproduces the original error handling.  A ValueError is raised if the option tree cannot be compiled.
+
+    Attributes:
+        option_tree: shared OptionTree node.  This object must not be modified.
+
+        build_path_leaf: compiled BuildPath BaseObjects leaf
+
+        build_path_actions: flattened BuildPath actions
+
+        base_objects_leaf: compiled BaseObjects leaf
+
+        template_objects: dictionary of template fields to a tuple of (option table, option dispatch, dictionary of
+            compiled leaves)
+    """
+
+    def __init__(self, option_tree, flatten_list):
+        """
+        :param option_tree: shared OptionTree node
+        :param flatten_list: function to flatten nested yaml lists
+        """
+        self.option_tree = option_tree
+        self.flatten_list = flatten_list
+        self.build_path_leaf = None
+        self.build_path_actions = None
+        self.base_objects_leaf = None
+        self.template_objects = {}
+        build_path = option_tree.get('BuildPath')
+        if 'BuildPath' in option_tree:
+            # an empty or missing BuildPath BaseObjects key is an error that is raised by the direct retrieval
+            if not isinstance(build_path, dict) or not build_path or 'BaseObjects' not in build_path:
+                raise ValueError('OptionTree BuildPath cannot be compiled')
+            self.build_path_leaf = self._compile_leaf(build_path['BaseObjects'])
+            if build_path.get('Actions'):
+                self.build_path_actions = self.flatten_list(build_path['Actions'])
+        if 'BaseObjects' in option_tree:
+            self.base_objects_leaf = self._compile_leaf(option_tree['BaseObjects'])
+        if option_tree.get('TemplateObjects'):
+            if not isinstance(option_tree['TemplateObjects'], dict):
+                raise ValueError('OptionTree TemplateObjects cannot be compiled')
+            for template_field, template_tree in option_tree['TemplateObjects'].items():
+                if not isinstance(template_tree, dict):
+                    raise ValueError('OptionTree TemplateObjects cannot be compiled')
+                self.template_objects[template_field] = (
+                    ExpansionStructureIndex.build_option_table(template_tree),
+                    self.build_option_dispatch(template_tree),
+                    {k: self._compile_leaf(v) for k, v in template_tree.items()})
+        return
+
+    @staticmethod
+    def build_option_dispatch(template_tree):
+        """
+        Build the option dispatch of a TemplateObjects field, which holds the position of each option key so the
+        first option in yaml order that matches a template value can be selected without walking the options.
+
+        :param template_tree: TemplateObjects field node
+        :return: dictionary of option keys to their position in the node
+        """
+        return {k: idx for idx, k in enumerate(template_tree.keys()) if isinstance(k, str)}
+
+    @staticmethod
+    def select_option(option_dispatch, template_value):
+        """
+        Select the TemplateObjects option for a template value.  An option matches if it is 'None' and the template
+        value is 'None' or not provided, if it is the template value, if it is AnyValue and the template value starts
+        with a word character, or if it is AnyNumber and the template value is a number.  When several options match,
+        the first one in yaml order is selected.
+
+        :param option_dispatch: option dispatch of the field, from build_option_dispatch
+        :param template_value: template field value, 'None' if not provided
+        :return: selected option key, or None if no option matches
+        """
+        matches = []
+        if template_value == 'None' and 'None' in option_dispatch:
+            matches.append('None')
+        if template_value:
+            template_text = str(template_value)
+            if template_text in option_dispatch:
+                matches.append(template_text)
+            if 'AnyValue' in option_dispatch and word_character_regex.match(template_text):
+                matches.append('AnyValue')
+            if 'AnyNumber' in option_dispatch and isinstance(template_value, (int, float)):
+                matches.append('AnyNumber')
+        if not matches:
+            return None
+        return min(matches, key=option_dispatch.__getitem__)
+
+    def _compile_leaf(self, option_leaf):
+        """
+        Compile an OptionTree leaf into a dictionary of flattened Objects, Transitions, and Mappings
+
+        :param option_leaf: shared OptionTree leaf node
+        :return: compiled leaf, or None if the leaf must be retrieved directly
+        """
+        if not option_leaf:
+            return {}
+        if not isinstance(option_leaf, dict) or 'Objects' not in option_leaf:
+            return None
+        try:
+            objects = self.flatten_list(option_leaf['Objects'])
+        except TypeError:
+            return None
+        return {
+            'Objects': objects,
+            'Transitions': option_leaf.get('Transitions'),
+            'Mappings': option_leaf.get('Mappings')
+        }
+
+    def get_template_objects_leaf(self, template_field, template_value):
+        """
+        Get a copy of the compiled TemplateObjects leaf for a template value
+
+        :param template_field: template field name
+        :param template_value: template field value
+        :return: compiled leaf, or None if the leaf must be retrieved directly
+        """
+        option_table, _, option_leaves = self.template_objects[template_field]
+        matches = ExpansionStructureIndex.match_option(option_table, template_value)
+        if len(matches) != 1 or option_leaves[matches[0]] is None:
+            return None
+        return copy.deepcopy(option_leaves[matches[0]])
+
+
+def get_expansion_structure_index_counters():
+    """
+    Get the lookup counters of the process-wide expansion structure index
+
+    :return: dictionary of lookups and hits
+    """
+    if yaml_file_index is None:
+        return {'lookups': 0, 'hits': 0}
+    return {'lookups': yaml_file_index.lookups, 'hits': yaml_file_index.hits}
+
 
 class ExpansionStructureLocation:
     """
@@ -31,7 +479,6 @@ class ExpansionStructureLocation:
         return obj._expansion_structure
 
     def __set__(self, obj, value):
-        global yaml_file
         if isinstance(value, dict):
             parsed_value = value
         elif isinstance(value, str):
@@ -40,18 +487,9 @@ class ExpansionStructureLocation:
                 if not value.endswith(('.yaml', '.yml')):
                     raise PyExpandObjectsTypeError('Error: File extension does not match yaml type: {}'.format(value))
                 else:
-                    if yaml_file:
-                        parsed_value = copy.deepcopy(yaml_file)
-                    else:
-                        with open(value, 'r') as f:
-                            try:
-                                # todo_eo: discuss tradeoff of safety vs functionality of SafeLoader/FullLoader.
-                                #   With FullLoader there would be more functionality and the ability to create more
-                                #   complex yaml files but it might not be necessary.
-                                parsed_value = yaml.load(f, Loader=yaml.SafeLoader)
-                                yaml_file = parsed_value
-                            except yaml.YAMLError as err:
-                                raise PyExpandObjectsYamlError('Failed to load YAML:\n{}'.format(err))
+                    # the loaded structure is shared by all instances in the process and must not be modified.
+                    #   get_structure returns copies of the requested nodes for any instance-specific changes.
+                    parsed_value = get_shared_expansion_structure(value)
             else:
                 try:
                     # if the string is not a file, then try to load it directly with SafeLoader.
@@ -70,6 +508,10 @@ class ExpansionStructureLocation:
             raise PyExpandObjectsTypeError(
                 'Error: Template expansion structure reference is not a file path or dictionary: {}'.format(value))
         obj._expansion_structure = parsed_value
+        if isinstance(parsed_value, dict):
+            obj._expansion_structure_index = get_expansion_structure_index(parsed_value)
+        else:
+            obj._expansion_structure_index = None
         return
 
 
@@ -169,6 +611,21 @@ class ExpandObjects(EPJSON):
         self.epjson = {}
         return
 
+    def __getstate__(self):
+        # The shared expansion structure is not copied when an object is sent to another process.  It is restored from
+        #   the structure loaded in the receiving process.
+        state = super().__getstate__()
+        if state.get('_expansion_structure') is yaml_file:
+            state['_expansion_structure'] = None
+            state.pop('_expansion_structure_index', None)
+        return state
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        if '_expansion_structure' in state and state['_expansion_structure'] is None:
+            self.expansion_structure = expansion_structure_location
+        return
+
     def rename_attribute(self, old_attribute, new_attribute):
         """
         Change attribute name to commonize variables.  Do not perform the operation if the target attribute
@@ -179,7 +636,7 @@ class ExpandObjects(EPJSON):
         :return: None.  Old attribute is deleted and new attribute created in class
         """
         if hasattr(self, old_attribute) and not getattr(self, new_attribute, None):
-            self.logger.info('{} renamed to {}'.format(old_attribute, new_attribute))
+            self.logger.info('%s renamed to %s', old_attribute, new_attribute)
             setattr(self, new_attribute, getattr(self, old_attribute))
             # Possibly make this optional
             delattr(self, old_attribute)
@@ -216,38 +673,44 @@ class ExpandObjects(EPJSON):
         will be matched via regex instead of a direct key call for TemplateObjects.  This is done to allow for
         multiple template options in a single mapping.
 
+        The hierarchy is walked on the shared structure and only the returned node is copied, so callers receive a
+        private object that can be modified without affecting the loaded structure.
+
         :param structure_hierarchy: list representing structure hierarchy
         :param structure: YAML loaded dictionary, default is loaded yaml loaded object
         :return: structured object as dictionary
         """
         try:
-            structure = copy.deepcopy(structure or self.expansion_structure)
+            structure = structure or self.expansion_structure
             if not isinstance(structure_hierarchy, list):
                 raise PyExpandObjectsTypeError(
                     "Error: In {} ({}) Structure hierarchy input must be a list of structure keys: {}"
                     .format(self.template_type, self.template_name, structure_hierarchy))
+            match_option = bool(structure_hierarchy) and structure_hierarchy[0] == 'TemplateObjects'
+            # use the path index when the structure is part of the indexed expansion structure
+            structure_index = getattr(self, '_expansion_structure_index', None)
+            if structure_index:
+                index_found, index_structure = structure_index.get(
+                    structure_hierarchy=structure_hierarchy,
+                    structure=structure,
+                    match_option=match_option)
+                if index_found:
+                    return copy.deepcopy(index_structure)
             # iterate over structure hierarchy list. For each item, call the key to the YAML object.  When looking up
-            #   TemplateObjects, For the last item get the YAML object's keys and try a regex match.
+            #   TemplateObjects, For the last item get the YAML object's keys and match them against the option keys.
             for idx, key in enumerate(structure_hierarchy):
-                if structure_hierarchy[0] != 'TemplateObjects' or not idx == len(structure_hierarchy) - 1:
+                if not match_option or not idx == len(structure_hierarchy) - 1:
                     structure = structure[key]
                 else:
-                    structure_key_list = list(structure.keys())
-                    for skl in structure_key_list:
-                        if skl == 'AnyValue':
-                            if re.match(r'\w+', str(key)) and str(key) != 'None':
-                                structure = structure['AnyValue']
-                        elif skl == 'AnyNumber':
-                            if isinstance(key, (int, float)) and str(key) != 'None':
-                                structure = structure['AnyNumber']
-                        else:
-                            if skl == str(key):
-                                structure = structure[skl]
+                    option_table = ExpansionStructureIndex.build_option_table(structure)
+                    for skl in list(structure.keys()):
+                        if skl in ExpansionStructureIndex.match_option(option_table, key):
+                            structure = structure[skl]
         except KeyError:
             raise PyExpandObjectsTypeError(
                 'Error: In {} ({}) YAML structure does not exist for hierarchy: {}'
                 .format(self.template_type, self.template_name, structure_hierarchy))
-        return structure
+        return copy.deepcopy(structure)
 
     def _get_option_tree(
             self,
@@ -271,6 +734,36 @@ class ExpandObjects(EPJSON):
         structure = self.get_structure(structure_hierarchy=structure_hierarchy)
         return structure
 
+    def _get_option_tree_plan(
+            self,
+            structure_hierarchy: list) -> typing.Optional[OptionTreePlan]:
+        """
+        Retrieve the compiled plan for an option tree.  Plans are compiled once per expansion structure and shared
+        between instances.
+
+        :param structure_hierarchy: list representing structure hierarchy
+        :return: OptionTreePlan, or None if the option tree is not in the structure index or cannot be compiled
+        """
+        structure_index = getattr(self, '_expansion_structure_index', None)
+        if not structure_index or not isinstance(structure_hierarchy, list) or not structure_hierarchy:
+            return None
+        if structure_hierarchy[0] != 'OptionTree':
+            structure_hierarchy = ['OptionTree', *structure_hierarchy]
+        try:
+            plan_key = tuple(structure_hierarchy)
+            if plan_key not in structure_index.option_tree_plans:
+                option_tree = structure_index.paths.get(plan_key)
+                option_tree_plan = None
+                if isinstance(option_tree, dict):
+                    try:
+                        option_tree_plan = OptionTreePlan(option_tree=option_tree, flatten_list=self._flatten_list)
+                    except ValueError:
+                        self.logger.debug('OptionTree could not be compiled: %s', structure_hierarchy)
+                structure_index.option_tree_plans[plan_key] = option_tree_plan
+        except TypeError:
+            return None
+        return structure_index.option_tree_plans[plan_key]
+
     def _get_option_tree_objects(
             self,
             structure_hierarchy: list) -> dict:
@@ -280,18 +773,30 @@ class ExpandObjects(EPJSON):
         :param structure_hierarchy: list representing structure hierarchy
         :return: epJSON dictionary with unresolved complex inputs
         """
-        self.logger.info('Processing option tree: {}'.format(structure_hierarchy))
-        option_tree = self._get_option_tree(structure_hierarchy=structure_hierarchy)
+        self.logger.info('Processing option tree: %s', structure_hierarchy)
+        # Use the compiled plan when available so that only the selected leaves are copied.  The shared option tree
+        #   is only read, and leaves that are not compiled are retrieved as copies through get_structure.
+        option_tree_plan = self._get_option_tree_plan(structure_hierarchy=structure_hierarchy)
+        if option_tree_plan:
+            option_tree = option_tree_plan.option_tree
+        else:
+            option_tree = self._get_option_tree(structure_hierarchy=structure_hierarchy)
         option_tree_dictionary = {}
         if "BuildPath" in option_tree.keys():
-            object_list = self._process_build_path(option_tree=option_tree['BuildPath'])
+            if option_tree_plan:
+                object_list = self._process_build_path_plan(option_tree_plan=option_tree_plan)
+            else:
+                object_list = self._process_build_path(option_tree=option_tree['BuildPath'])
             self.merge_epjson(
                 super_dictionary=option_tree_dictionary,
                 object_dictionary=self.yaml_list_to_epjson_dictionaries(object_list))
         if 'BaseObjects' in option_tree.keys():
-            option_tree_leaf = self._get_option_tree_leaf(
-                option_tree=option_tree,
-                leaf_path=['BaseObjects', ])
+            if option_tree_plan and option_tree_plan.base_objects_leaf is not None:
+                option_tree_leaf = copy.deepcopy(option_tree_plan.base_objects_leaf)
+            else:
+                option_tree_leaf = self._get_option_tree_leaf(
+                    option_tree=option_tree,
+                    leaf_path=['BaseObjects', ])
             object_list = self._apply_transitions(option_tree_leaf=option_tree_leaf)
             self.merge_epjson(
                 super_dictionary=option_tree_dictionary,
@@ -300,28 +805,31 @@ class ExpandObjects(EPJSON):
             try:
                 template_applied = None
                 template_field_processing = None
-                for template_field, template_tree in option_tree['TemplateObjects'].items():
-                    template_applied = None
+                if option_tree_plan:
+                    template_fields = [(k, v[1]) for k, v in option_tree_plan.template_objects.items()]
+                else:
+                    template_fields = [
+                        (k, OptionTreePlan.build_option_dispatch(v))
+                        for k, v in option_tree['TemplateObjects'].items()]
+                for template_field, option_dispatch in template_fields:
                     template_field_processing = template_field
-                    for field_option, objects in template_tree.items():
-                        # check if field option is 'None' and if object doesn't exist in the class, or if
-                        #   the fields match
-                        if (field_option == 'None' and getattr(self, template_field, 'None') == 'None') or \
-                                (getattr(self, template_field, None) and (
-                                    field_option == str(getattr(self, template_field)) or (
-                                        field_option == 'AnyValue' and re.match(r'\w+', str(getattr(self, template_field)))) or (
-                                        field_option == 'AnyNumber' and isinstance(getattr(self, template_field), (int, float)))
-                                )):
+                    template_value = getattr(self, template_field, 'None')
+                    # select the first option in yaml order that matches the template value
+                    template_applied = OptionTreePlan.select_option(option_dispatch, template_value) is not None
+                    if template_applied:
+                        option_tree_leaf = None
+                        if option_tree_plan:
+                            option_tree_leaf = option_tree_plan.get_template_objects_leaf(
+                                template_field=template_field,
+                                template_value=template_value)
+                        if option_tree_leaf is None:
                             option_tree_leaf = self._get_option_tree_leaf(
                                 option_tree=option_tree,
-                                leaf_path=['TemplateObjects', template_field, getattr(self, template_field, 'None')])
-                            object_list = self._apply_transitions(option_tree_leaf=option_tree_leaf)
-                            self.merge_epjson(
-                                super_dictionary=option_tree_dictionary,
-                                object_dictionary=self.yaml_list_to_epjson_dictionaries(object_list))
-                            # Only one field option should be applied, so break after it is successful
-                            template_applied = True
-                            break
+                                leaf_path=['TemplateObjects', template_field, template_value])
+                        object_list = self._apply_transitions(option_tree_leaf=option_tree_leaf)
+                        self.merge_epjson(
+                            super_dictionary=option_tree_dictionary,
+                            object_dictionary=self.yaml_list_to_epjson_dictionaries(object_list))
                 if not template_applied:
                     raise PyExpandObjectsYamlStructureException(
                         'Error: In {} ({}) A template option was not applied for template field {} and option {}'
@@ -449,7 +957,9 @@ class ExpandObjects(EPJSON):
                                                 elif any(i in ['*', '+', '/', '-'] for i in object_val) and '{' in object_val:
                                                     # Add '0.' for accessing class object attributes
                                                     try:
-                                                        object_value = eval(object_val.replace('{', '{0.').format(self))
+                                                        object_value = evaluate_expression(
+                                                            object_val.replace('{', '{0.').format(self),
+                                                            fast_path=False)
                                                     except SyntaxError:
                                                         # if attempt at numerical evaluation fails, just pass the
                                                         # string directly
@@ -460,13 +970,13 @@ class ExpandObjects(EPJSON):
                                                 object_value = getattr(self, template_field)
                                         except (AttributeError, KeyError, NameError):
                                             object_value = None
-                                            self.logger.debug("A template field ({}) / value ({}) pair was attempted "
-                                                              "to be applied to an object ({}) field ({}) but the "
-                                                              "transition did not complete."
-                                                              .format(template_field,
-                                                                      getattr(self, template_field, None),
-                                                                      object_type,
-                                                                      object_field))
+                                            self.logger.debug("A template field (%s) / value (%s) pair was attempted "
+                                                              "to be applied to an object (%s) field (%s) but the "
+                                                              "transition did not complete.",
+                                                              template_field,
+                                                              getattr(self, template_field, None),
+                                                              object_type,
+                                                              object_field)
                                         if object_value:
                                             # On a match and valid value, apply the field.
                                             # If the object is a 'super' object used in a
@@ -661,22 +1171,26 @@ class ExpandObjects(EPJSON):
             input_value: typing.Union[str, int, float, dict, list],
             epjson: dict = None,
             build_path: list = None,
-            recursions: int = 0) -> \
+            recursions: int = 0,
+            object_type_index: EPJSONObjectTypeIndex = None) -> \
             typing.Generator[str, typing.Dict[str, str], None]:
         """
         Resolve a complex input reference into a field value
 
         :param field_name: object field name
         :param input_value: field value input
-        :param epjson: epJSON dictionary of objects
+        :param epjson: epJSON dictionary, or EPJSONLayeredView, of objects
         :param build_path: BuildPath to reference for lookup
         :param recursions: cumulative count of recursive calls so that a cap can be made.  This is a backup in case
             RecursionError misses an infinite loop.
+        :param object_type_index: (optional) EPJSONObjectTypeIndex of the epjson dictionary, shared between calls
         :return: resolved field value
         """
         # Try class attributes if variables not defined in function
-        epjson = epjson or self.epjson
+        epjson = self.epjson if epjson is None else epjson
         build_path = build_path or getattr(self, 'build_path', None)
+        if object_type_index is None or object_type_index.epjson is not epjson:
+            object_type_index = EPJSONObjectTypeIndex(epjson)
         if isinstance(input_value, numbers.Number):
             yield {"field": field_name, "value": input_value}
         elif isinstance(input_value, str):
@@ -710,7 +1224,7 @@ class ExpandObjects(EPJSON):
                     if re.match(r'Autosize.*or\s+Autosize', formatted_value):
                         formatted_value = 'Autosize'
                     try:
-                        formatted_value = eval(formatted_value)
+                        formatted_value = evaluate_expression(formatted_value)
                     except (NameError, SyntaxError):
                         # Try to convert formatted value to correct type if it was not evaluated
                         num_rgx = re.match(r'^[-\d\.]+$', formatted_value)
@@ -752,7 +1266,8 @@ class ExpandObjects(EPJSON):
                             epjson=epjson,
                             field_name=field_name,
                             input_value=extracted_value,
-                            recursions=recursions + 1)
+                            recursions=recursions + 1,
+                            object_type_index=object_type_index)
                         for cg in complex_generator:
                             yield cg
                     except RecursionError:
@@ -767,8 +1282,8 @@ class ExpandObjects(EPJSON):
             else:
                 # If the input_value is an object type reference then try to match it with the EnergyPlus objects in
                 # the super dictionary.
-                for object_type in epjson.keys():
-                    if re.match(reference_object_type, object_type):
+                for object_type in object_type_index.get_object_types(reference_object_type):
+                    if object_type in epjson:
                         # if 'self' is used as the reference node, return the energyplus object type
                         # if 'key' is used as the reference node, return the unique object name
                         # if the reference node is a dictionary, then it is a nested complex input and the function
@@ -791,7 +1306,8 @@ class ExpandObjects(EPJSON):
                                         epjson=epjson,
                                         field_name=field_name,
                                         input_value=epjson[object_type][object_name][lookup_instructions],
-                                        recursions=recursions + 1)
+                                        recursions=recursions + 1,
+                                        object_type_index=object_type_index)
                                     for cg in complex_generator:
                                         yield cg
                                 except RecursionError:
@@ -837,7 +1353,8 @@ class ExpandObjects(EPJSON):
                             epjson=epjson,
                             field_name=input_list_field,
                             input_value=input_list_value,
-                            recursions=recursions + 1)
+                            recursions=recursions + 1,
+                            object_type_index=object_type_index)
                         for cg in complex_generator:
                             tmp_d[cg["field"]] = cg["value"]
                     tmp_list.append(tmp_d)
@@ -853,13 +1370,15 @@ class ExpandObjects(EPJSON):
         Resolve complex inputs in epJSON formatted dictionary
 
         :param epjson: epJSON dictionary with complex inputs
-        :param reference_epjson: (optional) epJSON dictionary to be used as reference objects for complex lookups.  If
-            None, then the input epjson will be used
+        :param reference_epjson: (optional) epJSON dictionary, or EPJSONLayeredView, to be used as reference objects for
+            complex lookups.  If None, then the input epjson will be used
         :return: epJSON dictionary with values replacing complex inputs
         """
         schedule_dictionary = None
         if not reference_epjson:
-            reference_epjson = copy.deepcopy(epjson)
+            # Keep the unresolved field values for reference.
+            reference_epjson = copy_object_fields(epjson)
+        object_type_index = EPJSONObjectTypeIndex(reference_epjson)
         for object_type, object_structure in epjson.items():
             for object_name, object_fields in object_structure.items():
                 # If a Schedule:Compact object is specified, and has special formatting, build it here.  The object
@@ -872,11 +1391,12 @@ class ExpandObjects(EPJSON):
                         structure_hierarchy=structure.split(':'),
                         insert_values=insert_values)
                 else:
-                    for field_name, field_value in copy.deepcopy(object_fields).items():
+                    for field_name, field_value in list(object_fields.items()):
                         input_generator = self._resolve_complex_input(
                             epjson=reference_epjson,
                             field_name=field_name,
-                            input_value=field_value)
+                            input_value=field_value,
+                            object_type_index=object_type_index)
                         generated_output = False
                         for ig in input_generator:
                             generated_output = True
@@ -923,7 +1443,7 @@ class ExpandObjects(EPJSON):
             the newly created objects
         """
         # if epJSON dictionary not passed, use the class attribute
-        epjson = epjson or self.epjson
+        epjson = self.epjson if epjson is None else epjson
         # Get the yaml structure from the template type
         structure_hierarchy = self.template_type.split(':')
         epjson_from_option_tree = self._get_option_tree_objects(structure_hierarchy=structure_hierarchy)
@@ -931,15 +1451,16 @@ class ExpandObjects(EPJSON):
         epjson_from_option_tree.pop('DummyObject', None)
         # Always use merge_epjson to store objects in self.epjson in case objects have already been stored to
         # that dictionary during processing
-        # For this processing, a temporary dictinoary needs to be made that merges the base epjson and the epjson
-        # created from the option tree.  This is necessary such that a complex reference can find any epjson object that
-        # was created.
-        tmp_epjson = copy.deepcopy(epjson)
-        self.merge_epjson(
-            super_dictionary=tmp_epjson,
-            object_dictionary=copy.deepcopy(epjson_from_option_tree)
-        )
-        resolved_inputs = self.resolve_objects(epjson_from_option_tree, reference_epjson=tmp_epjson)
+        # For this processing, the reference is a layered view of the base epjson and the epjson created from the
+        # option tree.  This is necessary such that a complex reference can find any epjson object that was created.
+        # Only the created objects are copied, since they are resolved in place and the unresolved values are needed
+        # for reference.
+        reference_epjson = EPJSONLayeredView(epjson, copy_object_fields(epjson_from_option_tree))
+        resolved_inputs = self.resolve_objects(epjson_from_option_tree, reference_epjson=reference_epjson)
+        # The epJSON dump is only created when it is logged
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug('%s (%s) created objects: %s', self.template_type, self.unique_name,
+                              json.dumps(resolved_inputs, indent=4, default=str))
         self.merge_epjson(
             super_dictionary=epjson,
             object_dictionary=resolved_inputs)
@@ -963,11 +1484,15 @@ class ExpandObjects(EPJSON):
         if object_list:
             # make a temporary object list since non-super objects will be removed from the list
             tmp_object_list = []
+            # The reference epJSON of the whole object list is converted once, when the first regular object is found,
+            #   and shared for all regular objects.  It is only read during resolution.
+            epjson_objects = None
             for o in object_list:
                 (object_type, object_structure), = o.items()
                 if not object_structure.get('Fields') and not object_structure.get('Connectors'):
                     epjson_object = self.yaml_list_to_epjson_dictionaries([o, ])
-                    epjson_objects = self.yaml_list_to_epjson_dictionaries(object_list)
+                    if epjson_objects is None:
+                        epjson_objects = self.yaml_list_to_epjson_dictionaries(object_list)
                     epjson_resolved_object = self.resolve_objects(epjson=epjson_object, reference_epjson=epjson_objects)
                     self.merge_epjson(
                         super_dictionary=epjson,
@@ -1035,6 +1560,10 @@ class ExpandObjects(EPJSON):
             object_list = self._apply_transitions(option_tree_leaf=option_tree_leaf)
         else:
             object_list = None
+        # The regular objects of an action are resolved against the objects of this action only, so the reference
+        #   is converted from the action object list and is not shared with the build path or other actions.  A shared
+        #   reference would let a lookup such as {'Coil:.*': 'key'} match the objects of another action.  Each action
+        #   list is only converted once, so this is not quadratic in the number of actions.
         object_list = self._parse_build_path(object_list=object_list)
         # Create new build path dictionary since the input dictionary will be mutated
         output_build_path = copy.deepcopy(build_path)
@@ -1150,7 +1679,7 @@ class ExpandObjects(EPJSON):
             input epJSON object.
         """
         # if build_path and/or epjson are not passed to function, get the class attributes
-        epjson = epjson or self.epjson
+        epjson = self.epjson if epjson is None else epjson
         availability_managers = {i: j for i, j in epjson.items() if re.match(r'^AvailabilityManager:.*', i)}
         # loop over availability managers and add them to the list.
         availability_manager_list_object = \
@@ -1168,10 +1697,11 @@ class ExpandObjects(EPJSON):
                 .format(self.template_type, self.template_name, availability_managers))
         availability_manager_assignment_list_object = self.yaml_list_to_epjson_dictionaries([
             {'AvailabilityManagerAssignmentList': availability_manager_list_object}, ])
+        resolved_objects = self.resolve_objects(epjson=availability_manager_assignment_list_object)
         self.merge_epjson(
             super_dictionary=epjson,
-            object_dictionary=self.resolve_objects(epjson=availability_manager_assignment_list_object))
-        return self.resolve_objects(epjson=availability_manager_assignment_list_object)
+            object_dictionary=resolved_objects)
+        return resolved_objects
 
     def _process_build_path(self, option_tree):
         """
@@ -1190,12 +1720,40 @@ class ExpandObjects(EPJSON):
         build_path_leaf = self._get_option_tree_leaf(
             option_tree=option_tree,
             leaf_path=['BaseObjects', ])
+        # Get the list actions to perform on a build bath, based on template inputs, and process them in order
+        actions = option_tree.pop('Actions', None)
+        return self._apply_build_path_instructions(build_path_leaf=build_path_leaf, actions=actions)
+
+    def _process_build_path_plan(self, option_tree_plan):
+        """
+        Create a connected group of objects from the BuildPath branch of a compiled OptionTree plan.  This is the same
+        process as _process_build_path, using copies of the compiled BuildPath leaf and actions.
+
+        :param option_tree_plan: OptionTreePlan for the template
+        :return: list of EnergyPlus super objects.
+        """
+        if option_tree_plan.build_path_leaf is not None:
+            build_path_leaf = copy.deepcopy(option_tree_plan.build_path_leaf)
+        else:
+            build_path_leaf = self._get_option_tree_leaf(
+                option_tree=option_tree_plan.option_tree['BuildPath'],
+                leaf_path=['BaseObjects', ])
+        return self._apply_build_path_instructions(
+            build_path_leaf=build_path_leaf,
+            actions=copy.deepcopy(option_tree_plan.build_path_actions))
+
+    def _apply_build_path_instructions(self, build_path_leaf, actions):
+        """
+        Apply transitions to a BuildPath leaf, perform the actions on the resulting build path, and connect the objects.
+
+        :param build_path_leaf: OptionTree leaf of BuildPath base objects
+        :param actions: list of BuildPath actions.  These are modified during processing.
+        :return: list of EnergyPlus super objects.
+        """
         build_path = self._apply_transitions(build_path_leaf)
         # if the build path from base objects is empty, it comes back as a dictionary.  Therefore, it needs to be
         # explicity changed to a list
         build_path = build_path if bool(build_path) else []
-        # Get the list actions to perform on a build bath, based on template inputs, and process them in order
-        actions = option_tree.pop('Actions', None)
         if actions:
             # flatten action list due to yaml formatting
             actions = self._flatten_list(actions)
@@ -1234,6 +1792,10 @@ class ExpandObjects(EPJSON):
                             template_field_processing,
                             getattr(self, template_field_processing, None),
                             action))
+        # The build path dump is only created when it is logged
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug('%s (%s) build path: %s', self.template_type, self.unique_name,
+                              json.dumps(build_path, indent=4, default=str))
         # Format the created build path
         object_list = self._connect_and_convert_build_path_to_object_list(build_path)
         return object_list
@@ -1286,6 +1848,47 @@ class ExpandObjects(EPJSON):
         return schedule_object
 
 
+class ExpandObjectsHelper(ExpandObjects):
+    """
+    ExpandObjects object without a template, used for the YAML and epJSON functions (structure lookup,
+    yaml_list_to_epjson_dictionaries, resolve_objects, build_compact_schedule) that connect template outputs.  One
+    object is created per run and re-targeted for each set of objects, so the logger and expansion structure are only
+    set up once.
+
+    Attributes:
+        base_attributes: names of the attributes set on creation, which are kept when the object is re-targeted
+    """
+
+    def __init__(
+            self,
+            expansion_structure=expansion_structure_location,
+            logger_level='WARNING',
+            logger_name='console_only_logger'):
+        super().__init__(
+            expansion_structure=expansion_structure,
+            logger_level=logger_level,
+            logger_name=logger_name)
+        self.base_attributes = frozenset(self.__dict__) | {'base_attributes'}
+        return
+
+    def retarget(self, unique_name=None, **attributes):
+        """
+        Prepare the object for a new set of objects.  The epJSON dictionary is emptied and the attributes set since the
+        last call (e.g. plenum names) are removed, so nothing carries over between calls.
+
+        :param unique_name: unique string used to modify the epJSON object names
+        :param attributes: attributes referenced by the expansion structure, as keyword arguments
+        :return: ExpandObjectsHelper object
+        """
+        for attribute in set(self.__dict__) - self.base_attributes:
+            delattr(self, attribute)
+        self.unique_name = unique_name
+        self.epjson = {}
+        for attribute_name, attribute_value in attributes.items():
+            setattr(self, attribute_name, attribute_value)
+        return self
+
+
 class ExpandThermostat(ExpandObjects):
     """
     Thermostat expansion operations
@@ -1295,7 +1898,7 @@ class ExpandThermostat(ExpandObjects):
         # fill/create class attributes values with template inputs
         super().__init__(template=template, logger_level=logger_level, logger_name=logger_name)
         self.unique_name = self.template_name
-        self.epjson = epjson or self.epjson
+        self.epjson = self.epjson if epjson is None else epjson
         return
 
     def _create_and_set_schedules(self):
@@ -1365,7 +1968,7 @@ class ExpandThermostat(ExpandObjects):
         Perform all template expansion operations and return the class to the parent calling function.
         :return: Class object with epJSON dictionary as class attribute
         """
-        self.logger.info('Processing Thermostat: {}'.format(self.unique_name))
+        self.logger.info('Processing Thermostat: %s', self.unique_name)
         self._create_and_set_schedules()
         self._create_thermostat_setpoints()
         return self
@@ -1730,6 +2333,9 @@ class ExpandZone(ExpandObjects):
     humidistat_object_type = HumidistatObjectType()
     fan_powered_reheat_type = FanPoweredReheatType()
     vrf_type = VRFType()
+    # template fields that only name the zone objects.  Templates that differ only in these fields share an expansion
+    #   in ExpansionCache.
+    expansion_cache_naming_fields = ('zone_name', 'template_thermostat_name')
 
     def __init__(self, template, logger_level='WARNING', logger_name='console_only_logger',
                  epjson=None, system_class_objects=None):
@@ -1751,7 +2357,7 @@ class ExpandZone(ExpandObjects):
         self.humidistat_object_type = template
         self.fan_powered_reheat_type = template
         self.vrf_type = template
-        self.epjson = epjson or self.epjson
+        self.epjson = self.epjson if epjson is None else epjson
         # Zone warnings
         if self.template_type == 'HVACTemplate:Zone:WaterToAirHeatPump':
             cooling_coil_gross_rated_total_capacity = \
@@ -1782,11 +2388,276 @@ class ExpandZone(ExpandObjects):
         Process zone template
         :return: Class object with epJSON dictionary as class attribute
         """
-        self.logger.info('Processing Zone: {}'.format(self.unique_name))
+        self.logger.info('Processing Zone: %s', self.unique_name)
         self._create_objects()
         return self
 
 
+class ExpansionWarningCounter(logging.Handler):
+    """
+    Logging handler that counts warning messages emitted while a template is expanded
+    """
+
+    def __init__(self):
+        super().__init__(level=logging.WARNING)
+        self.count = 0
+        return
+
+    def emit(self, record):
+        self.count += 1
+        return
+
+
+class ExpansionCache:
+    """
+    Cache of template expansions for templates that differ only in naming fields (e.g. zone_name).  The signature of
+    a template is its type and every field value except the naming fields of the expand class.  The first template of
+    a signature is fully expanded.  A prototype is also expanded with placeholders in the naming fields, and it is
+    stored only if renaming it gives the same result as the full expansion.  Later templates of the signature are
+    clones of the prototype with the placeholders replaced by their names.
+
+    The cache must only be used with the same keyword arguments (e.g. system_class_objects) for every template, since
+    the system transitions of a zone are applied from the system class object named in the template.
+
+    Attributes:
+        expand_class: ExpandObjects child class with an expansion_cache_naming_fields attribute (e.g. ExpandZone)
+
+        verify_all: fully expand every template and check the clone against it
+
+        prototypes: dictionary of signatures to prototype class objects
+
+        uncacheable_signatures: set of signatures that are always fully expanded
+
+        hits: number of templates cloned from a prototype
+
+        misses: number of prototypes created
+    """
+
+    # Placeholder character for naming fields.  It is not a letter, digit, or format character so it is not changed
+    #   by formatting or expression evaluation.
+    placeholder_character = '\x1e'
+
+    # Attributes that hold process-wide objects, which are shared by clones instead of copied
+    shared_attributes = (
+        'logger', 'stream', 'Validator', 'schema', '_object_type_validators', '_expansion_structure',
+        '_expansion_structure_index')
+
+    def __init__(self, expand_class, verify_all=False):
+        self.expand_class = expand_class
+        self.verify_all = verify_all
+        self.prototypes = {}
+        self.uncacheable_signatures = set()
+        self.hits = 0
+        self.misses = 0
+        return
+
+    @classmethod
+    def is_cacheable_name(cls, name):
+        """
+        Check that a naming field value is only used as text during expansion.  Values that are converted to numbers,
+        evaluated as expressions, or matched as special values are not cached.
+
+        :param name: naming field value
+        :return: boolean
+        """
+        if not isinstance(name, str) or not name or cls.placeholder_character in name:
+            return False
+        if re.match(r'^[-\d\.]+$', name) or re.search(r'[{}]|Autosize|HVACTemplate-Always|^None$', name):
+            return False
+        try:
+            evaluate_expression(name)
+        except (NameError, SyntaxError):
+            return True
+        return False
+
+    def get_signature(self, template):
+        """
+        Get the cache signature of a template
+
+        :param template: HVACTemplate epJSON dictionary
+        :return: signature string, or None if the template is not cacheable
+        """
+        naming_fields = getattr(self.expand_class, 'expansion_cache_naming_fields', None)
+        if not naming_fields:
+            return None
+        try:
+            (template_type, template_structure), = template.items()
+            (template_name, template_fields), = template_structure.items()
+        except (AttributeError, ValueError):
+            return None
+        if not self.is_cacheable_name(template_name) or \
+                not all(self.is_cacheable_name(template_fields[i]) for i in naming_fields if i in template_fields):
+            return None
+        try:
+            return json.dumps(
+                [template_type, {k: v for k, v in template_fields.items() if k not in naming_fields}],
+                sort_keys=True)
+        except (TypeError, ValueError):
+            return None
+
+    def _get_template_names(self, template):
+        """
+        Get the template name and naming field values, with a placeholder for each one
+
+        :param template: HVACTemplate epJSON dictionary
+        :return: dictionary of placeholders to names
+        """
+        (_, template_structure), = template.items()
+        (template_name, template_fields), = template_structure.items()
+        names = {'{0}template_name{0}'.format(self.placeholder_character): template_name}
+        for naming_field in self.expand_class.expansion_cache_naming_fields:
+            if naming_field in template_fields:
+                names['{0}{1}{0}'.format(self.placeholder_character, naming_field)] = template_fields[naming_field]
+        return names
+
+    @classmethod
+    def substitute_names(cls, value, names):
+        """
+        Replace placeholders with names in strings, including dictionary keys and nested values.  New dictionaries
+        and lists are returned.
+
+        :param value: string, dictionary, list, or other value
+        :param names: dictionary of placeholders to names
+        :return: value with placeholders replaced
+        """
+        if isinstance(value, str):
+            if cls.placeholder_character in value:
+                for placeholder, name in names.items():
+                    value = value.replace(placeholder, name)
+            return value
+        elif isinstance(value, dict):
+            return {cls.substitute_names(k, names): cls.substitute_names(v, names) for k, v in value.items()}
+        elif isinstance(value, list):
+            return [cls.substitute_names(i, names) for i in value]
+        return value
+
+    def _create_prototype(self, template, **kwargs):
+        """
+        Expand a template with placeholders in the template name and naming fields.  Messages of the expansion logger
+        are dropped since they would contain placeholders.
+
+        :param template: HVACTemplate epJSON dictionary
+        :return: expanded class object
+        """
+        (template_type, template_structure), = template.items()
+        (_, template_fields), = template_structure.items()
+        prototype_template = {
+            template_type: {
+                '{0}template_name{0}'.format(self.placeholder_character): {
+                    k: '{0}{1}{0}'.format(self.placeholder_character, k)
+                    if k in self.expand_class.expansion_cache_naming_fields else v
+                    for k, v in template_fields.items()}}}
+        expand_logger = logging.getLogger(kwargs.get('logger_name', 'console_only_logger'))
+        expand_logger.addFilter(self._drop_log_record)
+        try:
+            return self.expand_class(template=prototype_template, **kwargs).run()
+        finally:
+            expand_logger.removeFilter(self._drop_log_record)
+
+    @staticmethod
+    def _drop_log_record(record):
+        """
+        Logging filter that drops every message
+
+        :param record: log record
+        :return: False
+        """
+        return False
+
+    def _clone(self, prototype, template):
+        """
+        Create a class object for a template from a prototype.  String, dictionary, and list attributes are renamed
+        into new objects, other attributes are copied, and the process-wide objects in shared_attributes are shared
+        with the prototype.
+
+        :param prototype: prototype class object
+        :param template: HVACTemplate epJSON dictionary
+        :return: expanded class object
+        """
+        names = self._get_template_names(template)
+        clone = copy.copy(prototype)
+        for attribute_name, attribute_value in vars(prototype).items():
+            if attribute_name in self.shared_attributes:
+                continue
+            elif isinstance(attribute_value, (str, dict, list)):
+                setattr(clone, attribute_name, self.substitute_names(attribute_value, names))
+            else:
+                setattr(clone, attribute_name, copy.deepcopy(attribute_value))
+        return clone
+
+    @staticmethod
+    def _is_same_expansion(class_object, reference_class_object):
+        """
+        Check that two expanded class objects have the same epJSON, in the same order, and the same attributes
+
+        :param class_object: expanded class object
+        :param reference_class_object: fully expanded class object
+        :return: boolean
+        """
+        if json.dumps(class_object.epjson) != json.dumps(reference_class_object.epjson):
+            return False
+        attributes = {k: v for k, v in vars(class_object).items() if k not in ('epjson', 'logger', 'stream')}
+        reference_attributes = {
+            k: v for k, v in vars(reference_class_object).items() if k not in ('epjson', 'logger', 'stream')}
+        return attributes == reference_attributes
+
+    def _expand(self, template, **kwargs):
+        """
+        Fully expand a template and count the warnings logged
+
+        :param template: HVACTemplate epJSON dictionary
+        :return: expanded class object and warning count
+        """
+        warning_counter = ExpansionWarningCounter()
+        expand_logger = logging.getLogger(kwargs.get('logger_name', 'console_only_logger'))
+        expand_logger.addHandler(warning_counter)
+        try:
+            return self.expand_class(template=template, **kwargs).run(), warning_counter.count
+        finally:
+            expand_logger.removeHandler(warning_counter)
+
+    def expand(self, template, **kwargs):
+        """
+        Expand a template, cloning a verified prototype when one exists for its signature
+
+        :param template: HVACTemplate epJSON dictionary
+        :param kwargs: keyword arguments for the expand class
+        :return: expanded class object
+        """
+        signature = self.get_signature(template)
+        if signature is None or signature in self.uncacheable_signatures:
+            return self.expand_class(template=template, **kwargs).run()
+        prototype = self.prototypes.get(signature)
+        if prototype is None:
+            expanded_template, warning_count = self._expand(template, **kwargs)
+            # Warnings are not reproduced by clones, so templates that log them are always fully expanded.
+            if warning_count:
+                self.uncacheable_signatures.add(signature)
+                return expanded_template
+            try:
+                prototype = self._create_prototype(template, **kwargs)
+            except CustomException:
+                self.uncacheable_signatures.add(signature)
+                return expanded_template
+            if not self._is_same_expansion(self._clone(prototype, template), expanded_template):
+                self.uncacheable_signatures.add(signature)
+                return expanded_template
+            self.prototypes[signature] = prototype
+            self.misses += 1
+            return expanded_template
+        expanded_template = self._clone(prototype, template)
+        if self.verify_all:
+            reference_template, warning_count = self._expand(template, **kwargs)
+            if warning_count or not self._is_same_expansion(expanded_template, reference_template):
+                self.uncacheable_signatures.add(signature)
+                self.prototypes.pop(signature)
+                return reference_template
+        self.hits += 1
+        expanded_template.logger.info('Processing %s: %s (cloned from cached expansion)',
+                                      expanded_template.template_type, expanded_template.unique_name)
+        return expanded_template
+
+
 class AirLoopHVACUnitaryObjectType:
     """
     Set a class attribute to select the appropriate unitary equipment type from TemplateObjects in the YAML lookup.
@@ -2240,7 +3111,7 @@ class ExpandSystem(ExpandObjects):
         # self.rename_attribute('economizer_lower_temperature_limit', 'economizer_minimum_limit_dry_bulb_temperature')
         # self.rename_attribute('economizer_upper_enthalpy_limit', 'economizer_maximum_limit_enthalpy')
         self.unique_name = self.template_name
-        self.epjson = epjson or self.epjson
+        self.epjson = self.epjson if epjson is None else epjson
         self.build_path = None
         self.airloop_hvac_unitary_object_type = template
         self.airloop_hvac_object_type = template
@@ -2357,7 +3228,7 @@ class ExpandSystem(ExpandObjects):
             input epJSON object.
         """
         # if epjson/build_path not provided, use the class attribute:
-        epjson = epjson or self.epjson
+        epjson = self.epjson if epjson is None else epjson
         build_path = build_path or self.build_path
         # Create a list of actuators in stream order.  This will be used to determine the controller list order.
         actuator_list = []
@@ -2440,10 +3311,11 @@ class ExpandSystem(ExpandObjects):
                                                    .format(self.template_type, self.template_name, controller_objects))
                 object_list.append({'AirLoopHVAC:ControllerList': airloop_hvac_controllerlist_object})
         controller_epjson = self.yaml_list_to_epjson_dictionaries(object_list)
+        resolved_objects = self.resolve_objects(epjson=controller_epjson)
         self.merge_epjson(
             super_dictionary=epjson,
-            object_dictionary=self.resolve_objects(epjson=controller_epjson))
-        return self.resolve_objects(epjson=controller_epjson)
+            object_dictionary=resolved_objects)
+        return resolved_objects
 
     def _create_outdoor_air_equipment_list_from_build_path(
             self, build_path: list = None, epjson: dict = None) -> dict:
@@ -2459,7 +3331,7 @@ class ExpandSystem(ExpandObjects):
             back to the input epJSON object.
         """
         # if build_path and/or epjson are not passed to function, get the class attributes
-        epjson = epjson or self.epjson
+        epjson = self.epjson if epjson is None else epjson
         build_path = build_path or getattr(self, 'build_path', None)
         if not build_path:
             raise PyExpandObjectsException(
@@ -2523,10 +3395,11 @@ class ExpandSystem(ExpandObjects):
                 object_count += 1
         outdoor_air_equipment_list_object = self.yaml_list_to_epjson_dictionaries([
             {'AirLoopHVAC:OutdoorAirSystem:EquipmentList': oa_equipment_list_dictionary}, ])
+        resolved_objects = self.resolve_objects(epjson=outdoor_air_equipment_list_object)
         self.merge_epjson(
             super_dictionary=epjson,
-            object_dictionary=self.resolve_objects(epjson=outdoor_air_equipment_list_object))
-        return self.resolve_objects(epjson=outdoor_air_equipment_list_object)
+            object_dictionary=resolved_objects)
+        return resolved_objects
 
     def _create_outdoor_air_system(self, epjson: dict = None) -> dict:
         """
@@ -2538,7 +3411,7 @@ class ExpandSystem(ExpandObjects):
         :return: epJSON formatted AirLoopHVAC:OutdoorAirSystem objects.  These objects are also stored back to the
             input epJSON object.
         """
-        epjson = epjson or self.epjson
+        epjson = self.epjson if epjson is None else epjson
         # find oa controllerlist by looking for the Controller:OutdoorAir
         oa_controller_list_name = None
         controller_list_objects = epjson.get('AirLoopHVAC:ControllerList')
@@ -2549,9 +3422,9 @@ class ExpandSystem(ExpandObjects):
                         oa_controller_list_name = object_name
                         break
         if not oa_controller_list_name:
-            self.logger.info("No outdoor air AirLoopHVAC:ControllerList present in the {} system "
+            self.logger.info("No outdoor air AirLoopHVAC:ControllerList present in the %s system "
                              "build process, possibly because no Controller:OutdooAir object present "
-                             "in template creation process either.".format(self.unique_name))
+                             "in template creation process either.", self.unique_name)
         # get outdoor air system equipment list
         try:
             oa_system_equipment_list_object = epjson.get('AirLoopHVAC:OutdoorAirSystem:EquipmentList')
@@ -2574,10 +3447,11 @@ class ExpandSystem(ExpandObjects):
         outdoor_air_system_yaml_object['outdoor_air_equipment_list_name'] = oa_system_equipment_name
         outdoor_air_system_list_object = self.yaml_list_to_epjson_dictionaries([
             {'AirLoopHVAC:OutdoorAirSystem': outdoor_air_system_yaml_object}, ])
+        resolved_objects = self.resolve_objects(epjson=outdoor_air_system_list_object)
         self.merge_epjson(
             super_dictionary=epjson,
-            object_dictionary=self.resolve_objects(epjson=outdoor_air_system_list_object))
-        return self.resolve_objects(epjson=outdoor_air_system_list_object)
+            object_dictionary=resolved_objects)
+        return resolved_objects
 
     def _modify_build_path_for_outside_air_system(
             self, loop_type: str = 'AirLoop', epjson: dict = None, build_path: list = None) -> list:
@@ -2589,7 +3463,7 @@ class ExpandSystem(ExpandObjects):
         :return: build path
         """
         # if build_path is not passed to function, get the class attributes
-        epjson = epjson or self.epjson
+        epjson = self.epjson if epjson is None else epjson
         build_path = build_path or getattr(self, 'build_path', None)
         if not build_path:
             raise PyExpandObjectsException(
@@ -2862,7 +3736,7 @@ class ExpandSystem(ExpandObjects):
             input epJSON object.
         """
         # if build_path and/or epjson are not passed to function, get the class attributes
-        epjson = epjson or self.epjson
+        epjson = self.epjson if epjson is None else epjson
         build_path = build_path or getattr(self, 'build_path', None)
         if not build_path:
             raise PyExpandObjectsException(
@@ -2913,10 +3787,11 @@ class ExpandSystem(ExpandObjects):
             branch_and_branchlist_objects = self.yaml_list_to_epjson_dictionaries([branch, branchlist])
         else:
             branch_and_branchlist_objects = self.yaml_list_to_epjson_dictionaries([branch, ])
+        resolved_objects = self.resolve_objects(epjson=branch_and_branchlist_objects)
         self.merge_epjson(
             super_dictionary=epjson,
-            object_dictionary=self.resolve_objects(epjson=branch_and_branchlist_objects))
-        return self.resolve_objects(epjson=branch_and_branchlist_objects)
+            object_dictionary=resolved_objects)
+        return resolved_objects
 
     def _dual_duct_custom_edits(self):
         """
@@ -3028,7 +3903,7 @@ class ExpandSystem(ExpandObjects):
         Process system template
         :return: class object with epJSON dictionary as class attribute
         """
-        self.logger.info('Processing System: {}'.format(self.unique_name))
+        self.logger.info('Processing System: %s', self.unique_name)
         if self.template_type == 'HVACTemplate:System:DualDuct':
             self._dual_duct_custom_edits()
         self._create_objects()
@@ -3130,7 +4005,7 @@ class ExpandPlantLoop(ExpandObjects):
         self.unique_name = self.template_name
         self.primary_pump_flow_and_type = template
         self.secondary_pump_flow_and_type = template
-        self.epjson = epjson or self.epjson
+        self.epjson = self.epjson if epjson is None else epjson
         return
 
     def run(self):
@@ -3138,7 +4013,7 @@ class ExpandPlantLoop(ExpandObjects):
         Process plant loop template
         :return: class object with epJSON dictionary as class attribute
         """
-        self.logger.info('Processing PlantLoop: {}'.format(self.unique_name))
+        self.logger.info('Processing PlantLoop: %s', self.unique_name)
         self._create_objects()
         self._create_availability_manager_assignment_list()
         return self
@@ -3412,7 +4287,7 @@ class ExpandPlantEquipment(ExpandObjects):
         elif self.template_plant_loop_type == 'HotWaterLoop':
             self.plant_loop_type_short = 'HW'
         self.chiller_and_condenser_type = template
-        self.epjson = epjson or self.epjson
+        self.epjson = self.epjson if epjson is None else epjson
         return
 
     def run(self):
@@ -3420,6 +4295,6 @@ class ExpandPlantEquipment(ExpandObjects):
         Process plant loop template
         :return: class object with epJSON dictionary as class attribute
         """
-        self.logger.info('Processing Plant Equipment: {}'.format(self.unique_name))
+        self.logger.info('Processing Plant Equipment: %s', self.unique_name)
         self._create_objects()
         return self
@@ -1,9 +1,240 @@
 import re
 import copy
-from epjson_handler import EPJSON
-from expand_objects import ExpandObjects, ExpandThermostat, ExpandZone, ExpandSystem, ExpandPlantLoop, \
-    ExpandPlantEquipment
-from custom_exceptions import InvalidTemplateException, InvalidEpJSONException, PyExpandObjectsYamlStructureException
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from logger import Logger, message_stream
+from epjson_handler import EPJSON, EPJSONLayeredView
+from expand_objects import ExpandObjectsHelper, ExpandThermostat, ExpandZone, ExpandSystem, ExpandPlantLoop, \
+    ExpandPlantEquipment, ExpansionCache, get_expansion_structure_index_counters, get_shared_expansion_structure, \
+    get_expansion_structure_index
+from stage_scheduler import Stage, StageScheduler
+from custom_exceptions import InvalidTemplateException, InvalidEpJSONException, PyExpandObjectsYamlStructureException, \
+    CustomException
+
+
+def expand_template_list(template_list, expand_class, logger_level, logger_name, expansion_cache=None, **kwargs):
+    """
+    Expand templates in order
+
+    :param template_list: list of (template, external epJSON objects) tuples, where each template is an epJSON
+        dictionary of one HVACTemplate object
+    :param expand_class: ExpandObjects child class to operate on template (e.g. ExpandZone).
+    :param logger_level: logger level of the expanded class objects
+    :param logger_name: logger name of the expanded class objects
+    :param expansion_cache: (optional) ExpansionCache of expand_class used for templates without external epJSON
+        objects
+    :return: dictionary of expanded objects with unique name as key
+    """
+    expanded_template_dictionary = {}
+    for template, external_epjson_objects in template_list:
+        (_, template_structure), = template.items()
+        (template_name, _), = template_structure.items()
+        if expansion_cache and not external_epjson_objects:
+            expanded_template = expansion_cache.expand(
+                template=template,
+                logger_level=logger_level,
+                logger_name=logger_name,
+                **kwargs)
+        else:
+            expanded_template = expand_class(
+                template=template,
+                epjson=external_epjson_objects,
+                logger_level=logger_level,
+                logger_name=logger_name,
+                **kwargs).run()
+        expanded_template_dictionary[template_name] = expanded_template
+    return expanded_template_dictionary
+
+
+def initialize_expansion_worker():
+    """
+    Load the expansion structure and its index once when a worker process starts
+    """
+    get_expansion_structure_index(get_shared_expansion_structure())
+    return
+
+
+def expand_template_list_worker(template_list, expand_class, logger_level, logger_name, expansion_cache, kwargs):
+    """
+    Expand templates in a worker process.  The messages logged during the expansion are returned so they can be added
+    to the output stream of the parent process in template order.  A failed expansion returns its exception pickled,
+    without its own logged message, so the message is logged once when the parent process loads it.
+
+    :param template_list: list of (template, external epJSON objects) tuples
+    :param expand_class: ExpandObjects child class to operate on template (e.g. ExpandZone).
+    :param logger_level: logger level of the expanded class objects
+    :param logger_name: logger name of the expanded class objects
+    :param expansion_cache: ExpansionCache of expand_class, or None
+    :param kwargs: keyword arguments for expand_class
+    :return: tuple of expanded objects dictionary (None if failed), logged messages, pickled exception (None if
+        passed), expansion cache hits and misses, and expansion structure index counters
+    """
+    stream = Logger(logger_level=logger_level, logger_name=logger_name, reset_stream=True).stream
+    index_counters = get_expansion_structure_index_counters()
+    # The cache may be sent after the parent process added the counters of other chunks, so only the change is returned
+    cache_counters = (expansion_cache.hits, expansion_cache.misses) if expansion_cache else (0, 0)
+    expanded_template_dictionary = None
+    error = None
+    try:
+        expanded_template_dictionary = expand_template_list(
+            template_list=template_list,
+            expand_class=expand_class,
+            logger_level=logger_level,
+            logger_name=logger_name,
+            expansion_cache=expansion_cache,
+            **kwargs)
+        messages = stream.getvalue()
+    except CustomException as e:
+        messages = stream.getvalue()
+        error_message = '{}\n'.format(e.msg)
+        if messages.endswith(error_message):
+            messages = messages[:-len(error_message)]
+        error = pickle.dumps(e)
+    if expansion_cache:
+        cache_counters = (expansion_cache.hits - cache_counters[0], expansion_cache.misses - cache_counters[1])
+    index_counters = {k: v - index_counters[k] for k, v in get_expansion_structure_index_counters().items()}
+    return expanded_template_dictionary, messages, error, cache_counters, index_counters
+
+
+class WaterLoopBranchRegistry:
+    """
+    Water loop branches of expanded templates by loop type and loop side.  The branches of each group of templates are
+    added once the group is expanded, so the connections of a plant loop read its branches directly instead of
+    scanning and copying the epJSON of every expanded template.  The branch dictionaries are shared with the expanded
+    templates and must not be modified.
+
+    Attributes:
+        branches: dictionary of (loop type, loop side) keys, with a dictionary of template group (zones, systems,
+            plant_equipment) to epJSON Branch dictionary as values.  The groups are filled independently.
+    """
+
+    loop_types = ('ChilledWaterLoop', 'HotWaterLoop', 'MixedWaterLoop', 'CondenserWaterLoop')
+
+    # zone and system branches connect to the demand side of a loop based on the type of their first component
+    demand_component_regexes = {
+        'ChilledWaterLoop': ('^Coil:Cooling:Water($|:DetailedGeometry)+', ),
+        'HotWaterLoop': ('^Coil:Heating:Water($|:DetailedGeometry)+', '^ZoneHVAC:Baseboard.*Water'),
+        'MixedWaterLoop': ('^Coil:.*HeatPump.*', '^AirConditioner:VariableRefrigerantFlow$')}
+
+    template_groups = ('zones', 'systems', 'plant_equipment')
+
+    def __init__(self):
+        self.branches = {}
+        return
+
+    @classmethod
+    def get_loop_type(cls, plant_loop_class_object):
+        """
+        Get the loop type of a plant loop
+
+        :param plant_loop_class_object: ExpandPlantLoop class object
+        :return: loop type (e.g. ChilledWaterLoop), or None if the template type is not a water loop
+        """
+        template_type = plant_loop_class_object.template_type.lower()
+        for loop_type in cls.loop_types:
+            if loop_type.lower()[:-len('loop')] in template_type:
+                return loop_type
+        return None
+
+    def _add_branch(self, loop_type, loop_side, template_group, branch_name, branch_structure):
+        self.branches.setdefault((loop_type, loop_side), {}).setdefault(template_group, {})[branch_name] = \
+            branch_structure
+        return
+
+    def add_zone_system_branches(self, expanded_objects, template_group):
+        """
+        Add the water coil and baseboard branches of expanded zones or systems to the demand side of their loops
+
+        :param expanded_objects: dictionary of ExpandZone or ExpandSystem objects
+        :param template_group: zones or systems
+        :return: None
+        """
+        for co in expanded_objects.values():
+            for branch_name, branch_structure in co.epjson.get('Branch', {}).items():
+                # the regex check for 'main branch' is to avoid DualDuct main branches from accidentally being
+                # included since they have coil objects in them as well.  They typical main branch is never accidentally
+                # caught because the coil objects are never in the 0th position.
+                if re.match('.*main branch$', branch_name.lower()):
+                    continue
+                component_object_type = branch_structure['components'][0]['component_object_type']
+                for loop_type, branch_regexes in self.demand_component_regexes.items():
+                    if any(re.match(br, component_object_type) for br in branch_regexes):
+                        self._add_branch(
+                            loop_type=loop_type,
+                            loop_side='Demand',
+                            template_group=template_group,
+                            branch_name=branch_name,
+                            branch_structure=branch_structure)
+        return
+
+    def _add_plant_equipment_branch(self, loop_type, branch_name, branch_structure):
+        # Special handling for condenser water loop where the chiller objects are the demand side.
+        try:
+            if loop_type == 'CondenserWaterLoop' and \
+                    re.match(r'Chiller:.*', branch_structure['components'][0]['component_object_type']):
+                loop_side = 'Demand'
+            else:
+                loop_side = 'Supply'
+        except (AttributeError, KeyError):
+            raise InvalidTemplateException(
+                'Error: Branch object is incorrectly formatted: {}'.format({branch_name: branch_structure}))
+        self._add_branch(
+            loop_type=loop_type,
+            loop_side=loop_side,
+            template_group='plant_equipment',
+            branch_name=branch_name,
+            branch_structure=branch_structure)
+        return
+
+    def add_plant_equipment_branches(self, expanded_plant_equipment):
+        """
+        Add the branches of expanded plant equipment to their loops
+
+        :param expanded_plant_equipment: dictionary of ExpandPlantEquipment objects
+        :return: None
+        """
+        for pe in expanded_plant_equipment.values():
+            branch_objects = pe.epjson.get('Branch', {})
+            for branch_name, branch_structure in branch_objects.items():
+                components = branch_structure.get('components')
+                if not components:
+                    raise InvalidTemplateException(
+                        'Error: In {} ({}) A branch object failed to create component fields {}'
+                        .format(pe.template_type, pe.template_name, branch_name))
+            # Special handling for chillers with condenser water and chilled water branches
+            # todo_eo: Currently the chilled and condenser water branches are separated by parsing the names.  A more
+            #  robust solution should be investigated.
+            if pe.template_type in ['HVACTemplate:Plant:Chiller', 'HVACTemplate:Plant:Chiller:ObjectReference'] \
+                    and getattr(pe, 'condenser_type', 'WaterCooled') == 'WaterCooled':
+                for branch_name, branch_structure in branch_objects.items():
+                    if 'chw' in branch_name.lower():
+                        self._add_plant_equipment_branch('ChilledWaterLoop', branch_name, branch_structure)
+                    if 'cnd' in branch_name.lower():
+                        self._add_plant_equipment_branch('CondenserWaterLoop', branch_name, branch_structure)
+            # typical handling when all plant equipment branches belong in one loop
+            else:
+                loop_type = str(pe.template_plant_loop_type)
+                loop_type = loop_type if loop_type.endswith('Loop') else ''.join([loop_type, 'Loop'])
+                for branch_name, branch_structure in branch_objects.items():
+                    self._add_plant_equipment_branch(loop_type, branch_name, branch_structure)
+        return
+
+    def get_branches(self, loop_type, loop_side):
+        """
+        Get the branches of a loop side, in template group order
+
+        :param loop_type: loop type (e.g. ChilledWaterLoop)
+        :param loop_side: Demand or Supply
+        :return: epJSON Branch dictionary, which must not be modified
+        """
+        template_group_branches = self.branches.get((loop_type, loop_side), {})
+        if len(template_group_branches) == 1:
+            (branches, ) = template_group_branches.values()
+            return branches
+        branches = {}
+        for template_group in self.template_groups:
+            branches.update(template_group_branches.get(template_group, {}))
+        return branches
 
 
 class HVACTemplate(EPJSON):
@@ -26,19 +257,70 @@ class HVACTemplate(EPJSON):
         expanded_*: List of class objects for each template type
 
         epjson: epJSON used to store connection objects
+
+        expansion_structure_lookups: expansion structure index lookups and hits for the last run
+
+        zone_expansion_cache: flag to clone zone templates that differ only in naming fields from a cached expansion.
+            Disabled by default.
+
+        zone_expansion_cache_hits: number of zone templates cloned from a cached expansion in the last run
+
+        processes: number of worker processes used to expand the templates of each phase.  1 expands in serial.
+
+        stage_workers: number of threads used to overlap independent workflow stages.  None uses the number of
+            processes.
+
+        validation_processes: number of worker processes used to validate large input epJSON objects.  1 validates in
+            serial.
+
+        merge_output_epjson: flag to merge the output epJSON into a new dictionary.  If False, the output epJSON is a
+            read-only EPJSONLayeredView of the base objects and the epJSON of the expanded classes.
+
+        stage_timings: list of StageTiming objects of the workflow stages in the last run
+
+        zone_system_index: expanded zones indexed by the system template they reference, see _get_zone_system_index
+
+        water_loop_branches: WaterLoopBranchRegistry of the expanded zones, systems, and plant equipment
+
+        validated_base_objects: base objects of the last run that passed input validation and are not replaced or
+            returned by an expansion.  They do not need to be validated again in the output epJSON.
+
+        zone_system_template_field_names: zone template fields that reference a system template
     """
 
+    zone_system_template_field_names = (
+        'template_constant_volume_system_name', 'dedicated_outdoor_air_system_name', 'template_dual_duct_system_name',
+        'template_unitary_system_name', 'template_vav_system_name', 'template_vrf_system_name')
+
     def __init__(
             self,
             no_schema=False,
             logger_level='WARNING',
             logger_name='console_only_logger',
-            reset_stream=True):
+            reset_stream=True,
+            zone_expansion_cache=False,
+            processes=1,
+            stage_workers=None,
+            validation_processes=1,
+            json_backend=None,
+            merge_output_epjson=True):
         """
         :param no_schema: Boolean flag for skipping schema validation
+        :param zone_expansion_cache: Boolean flag for cloning zone templates that differ only in naming fields
+        :param processes: number of worker processes used to expand templates.  The output is the same as in serial.
+        :param stage_workers: number of threads used to overlap independent workflow stages.  Stages overlap while they
+            wait on worker processes, and the output is the same as in serial.  Default is the number of processes.
+        :param validation_processes: number of worker processes used to validate large input epJSON objects.  The
+            errors are the same as in serial.
+        :param json_backend: JSON library used to read epJSON files, see json_backend.get_json_backend.  None uses the
+            fastest installed library.
+        :param merge_output_epjson: Boolean flag for merging the base objects and the objects of the expanded classes
+            into a new dictionary for the output epJSON.  If False, the output epJSON is a read-only view of them, which
+            can be written with json_backend.JSONBackend.dump without building the merged dictionary.
         """
         super().__init__(no_schema=no_schema, logger_level=logger_level, logger_name=logger_name,
-                         reset_stream=reset_stream)
+                         reset_stream=reset_stream, validation_processes=validation_processes,
+                         json_backend=json_backend)
         self.logger_level = logger_level
         self.logger_name = logger_name
         self.templates = {}
@@ -53,6 +335,21 @@ class HVACTemplate(EPJSON):
         self.expanded_systems = {}
         self.expanded_plant_loops = {}
         self.expanded_plant_equipment = {}
+        self.zone_system_index = {}
+        self.water_loop_branches = WaterLoopBranchRegistry()
+        self.validated_base_objects = {}
+        self.expansion_structure_lookups = {}
+        self.zone_expansion_cache = zone_expansion_cache
+        self.zone_expansion_cache_hits = 0
+        self.processes = processes
+        self._process_pool = None
+        self._process_pool_futures = []
+        self._worker_index_counters = {}
+        self.stage_workers = stage_workers
+        self.merge_output_epjson = merge_output_epjson
+        self.stage_timings = []
+        self._stage_scheduler = None
+        self._expand_objects_helper = None
         self.epjson = {}
         return
 
@@ -239,8 +536,8 @@ class HVACTemplate(EPJSON):
                         # check for required info
                         if not object_fields.get('template_thermostat_name', None):
                             self.logger.info(
-                                'In {} ({}) template thermostat name not provided'
-                                .format(object_type, object_name))
+                                'In %s (%s) template thermostat name not provided',
+                                object_type, object_name)
                         # check baseboard settings
                         if object_fields.get('baseboard_heating_type', None) == 'HotWater' and (
                                 not epjson.get('HVACTemplate:Plant:HotWaterLoop') or not
@@ -826,28 +1123,106 @@ class HVACTemplate(EPJSON):
                     unique_name_override=False)
         return
 
-    def _expand_templates(self, templates, expand_class, **kwargs):
+    def _get_process_pool(self):
+        """
+        Get the worker process pool for template expansion, creating it on the first call
+
+        :return: ProcessPoolExecutor, or None if templates are expanded in serial
+        """
+        if self.processes is None or self.processes <= 1:
+            return None
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=self.processes,
+                initializer=initialize_expansion_worker)
+        return self._process_pool
+
+    def _shutdown_process_pool(self):
+        """
+        Stop the worker processes, if any were started.  Chunks that have not started, e.g. those of other stages
+        after an error, are cancelled first so the shutdown only waits for the running chunks.
+
+        :return: None
+        """
+        if self._process_pool is not None:
+            for future in self._process_pool_futures:
+                future.cancel()
+            self._process_pool.shutdown(wait=True)
+            self._process_pool = None
+            self._process_pool_futures = []
+        return
+
+    def _expand_templates(self, templates, expand_class, expansion_cache=None, **kwargs):
         """
-        Run Expand operations on multiple templates
+        Run Expand operations on multiple templates.  If worker processes are enabled, the templates are expanded in
+        chunks by the process pool and the results are merged in template order.
+
         :param templates: dictionary of HVACTemplate:.* objects
         :param expand_class: ExpandObjects child class to operate on template (e.g. ExpandZone).
+        :param expansion_cache: (optional) ExpansionCache of expand_class used for templates without external epJSON
+            objects.  Each chunk sent to a worker process uses a copy of the cache, and the counters are added to it.
         :return: dictionary of expanded objects with unique name as key
         """
-        expanded_template_dictionary = {}
-        templates = self.epjson_genexp(templates)
-        for template in templates:
+        template_list = []
+        for template in self.epjson_genexp(templates):
             (_, template_structure), = template.items()
-            (template_name, template_fields), = template_structure.items()
-            external_epjson_objects = template_fields.pop('epjson', None)
-            expanded_template = expand_class(
-                template=template,
-                epjson=external_epjson_objects,
+            (_, template_fields), = template_structure.items()
+            template_list.append((template, template_fields.pop('epjson', None)))
+        process_pool = self._get_process_pool() if len(template_list) > 1 else None
+        if not process_pool:
+            return expand_template_list(
+                template_list=template_list,
+                expand_class=expand_class,
                 logger_level=self.logger_level,
                 logger_name=self.logger_name,
-                **kwargs).run()
-            expanded_template_dictionary[template_name] = expanded_template
+                expansion_cache=expansion_cache,
+                **kwargs)
+        # Use several chunks per worker so uneven templates are balanced, while the read-only keyword arguments
+        #   (e.g. system_class_objects) are only sent once per chunk.
+        chunk_size = -(-len(template_list) // (self.processes * 4))
+        futures = [
+            process_pool.submit(
+                expand_template_list_worker,
+                template_list[i:i + chunk_size],
+                expand_class,
+                self.logger_level,
+                self.logger_name,
+                expansion_cache,
+                kwargs)
+            for i in range(0, len(template_list), chunk_size)]
+        self._process_pool_futures.extend(futures)
+        expanded_template_dictionary = {}
+        for future in futures:
+            # Let other workflow stages run while the worker processes expand this stage
+            if self._stage_scheduler:
+                with self._stage_scheduler.released():
+                    future.result()
+            expanded_chunk, messages, error, cache_counters, index_counters = future.result()
+            self.stream.write(messages)
+            for counter_name, counter_value in index_counters.items():
+                self._worker_index_counters[counter_name] = \
+                    self._worker_index_counters.get(counter_name, 0) + counter_value
+            if error:
+                raise pickle.loads(error)
+            if expansion_cache:
+                expansion_cache.hits += cache_counters[0]
+                expansion_cache.misses += cache_counters[1]
+            expanded_template_dictionary.update(expanded_chunk)
         return expanded_template_dictionary
 
+    def _get_expand_objects_helper(self, unique_name=None):
+        """
+        Get the ExpandObjectsHelper of the run, which is created on the first call and re-targeted on each call.
+
+        :param unique_name: unique string used to modify the epJSON object names
+        :return: ExpandObjectsHelper object
+        """
+        if self._expand_objects_helper is None:
+            self._expand_objects_helper = ExpandObjectsHelper(
+                logger_level=self.logger_level,
+                logger_name=self.logger_name)
+        return self._expand_objects_helper.retarget(unique_name=unique_name)
+
     def _create_zonecontrol_thermostat(self, zone_class_object):
         """
         Create ZoneControl:Thermostat objects.  This operations is performed outside of ExpandObjects because it
@@ -862,8 +1237,8 @@ class HVACTemplate(EPJSON):
             thermostat_template_name = getattr(zone_class_object, 'template_thermostat_name')
         except AttributeError:
             self.logger.info(
-                'In {} ({}) Zone object does not reference a thermostat class object'
-                .format(zone_class_object.template_type, zone_class_object.unique_name))
+                'In %s (%s) Zone object does not reference a thermostat class object',
+                zone_class_object.template_type, zone_class_object.unique_name)
             return
         except ValueError:
             raise InvalidTemplateException('Error: Zone template ({}) is improperly formatted.'
@@ -884,20 +1259,17 @@ class HVACTemplate(EPJSON):
             (thermostat_name, _), = thermostat_structure.items()
             # create control schedule based on thermostat type
             if thermostat_type == "ThermostatSetpoint:SingleHeating":
-                control_schedule = ExpandObjects(logger_level=self.logger_level, logger_name=self.logger_name)\
-                    .build_compact_schedule(
-                        structure_hierarchy=['Objects', 'Common', 'Objects', 'Schedule', 'Compact', 'ALWAYS_VAL'],
-                        insert_values=[1, ])
+                control_schedule = self._get_expand_objects_helper().build_compact_schedule(
+                    structure_hierarchy=['Objects', 'Common', 'Objects', 'Schedule', 'Compact', 'ALWAYS_VAL'],
+                    insert_values=[1, ])
             elif thermostat_type == "ThermostatSetpoint:SingleCooling":
-                control_schedule = ExpandObjects(logger_level=self.logger_level, logger_name=self.logger_name)\
-                    .build_compact_schedule(
-                        structure_hierarchy=['Objects', 'Common', 'Objects', 'Schedule', 'Compact', 'ALWAYS_VAL'],
-                        insert_values=[2, ])
+                control_schedule = self._get_expand_objects_helper().build_compact_schedule(
+                    structure_hierarchy=['Objects', 'Common', 'Objects', 'Schedule', 'Compact', 'ALWAYS_VAL'],
+                    insert_values=[2, ])
             elif thermostat_type == "ThermostatSetpoint:DualSetpoint":
-                control_schedule = ExpandObjects(logger_level=self.logger_level, logger_name=self.logger_name)\
-                    .build_compact_schedule(
-                        structure_hierarchy=['Objects', 'Common', 'Objects', 'Schedule', 'Compact', 'ALWAYS_VAL'],
-                        insert_values=[4, ])
+                control_schedule = self._get_expand_objects_helper().build_compact_schedule(
+                    structure_hierarchy=['Objects', 'Common', 'Objects', 'Schedule', 'Compact', 'ALWAYS_VAL'],
+                    insert_values=[4, ])
             else:
                 raise InvalidTemplateException("Error: {} ({}) Invalid thermostat type set in ExpandThermostat"
                                                .format(thermostat_type, thermostat_object.unique_name))
@@ -950,7 +1322,35 @@ class HVACTemplate(EPJSON):
                 "Error: Invalid system type passed to supply path creation function: {}".format(template_type))
         return zone_system_template_field_name
 
-    def _create_system_path_connection_objects(self, system_class_object, expanded_zones):
+    def _get_zone_system_index(self, expanded_zones):
+        """
+        Index the expanded zones by the system templates they reference, so each system can find its zones without
+        scanning all of them.  The zone objects that connect to the system air paths are extracted once per zone.
+
+        :param expanded_zones: dictionary of ExpandZone objects
+        :return: dictionary of (zone system template field name, system template name) keys, with a list of
+            (ExpandZone object, zone connection epJSON objects) tuples in zone order as values.  The connection objects
+            are the AirTerminal, AirLoopHVAC:SupplyPlenum, AirLoopHVAC:ReturnPlenum and ZoneHVAC:EquipmentConnections
+            objects of the zone.
+        """
+        zone_system_index = {}
+        for _, ez in expanded_zones.items():
+            zone_system_keys = []
+            for zone_system_template_field_name in self.zone_system_template_field_names:
+                system_template_name = getattr(ez, zone_system_template_field_name, None)
+                if system_template_name is not None:
+                    zone_system_keys.append((zone_system_template_field_name, system_template_name))
+            if not zone_system_keys:
+                continue
+            zone_connection_objects = self.get_epjson_objects(epjson=ez.epjson, object_type_regexp=r'^AirTerminal:.*')
+            for object_type in ['AirLoopHVAC:SupplyPlenum', 'AirLoopHVAC:ReturnPlenum', 'ZoneHVAC:EquipmentConnections']:
+                if object_type in ez.epjson:
+                    zone_connection_objects[object_type] = ez.epjson[object_type]
+            for zone_system_key in zone_system_keys:
+                zone_system_index.setdefault(zone_system_key, []).append((ez, zone_connection_objects))
+        return zone_system_index
+
+    def _create_system_path_connection_objects(self, system_class_object, expanded_zones, zone_system_index=None):
         """
         Create objects connecting system supply air to zone objects.  An AirLoopHVAC:SupplyPath object is created with
         either an AirLoopHVAC:SupplyPlenum or an AirLoopHVAC:ZoneSplitter object.  The same is true for
@@ -958,123 +1358,129 @@ class HVACTemplate(EPJSON):
 
         :param system_class_object: Expanded HVACTemplate:System:.* class object
         :param expanded_zones: dictionary of ExpandZone objects
+        :param zone_system_index: (optional) index of expanded_zones from _get_zone_system_index.  If not provided, it
+            is created.
         :return: system supply air connection objects.  AirLoopHVAC:SupplyPath object and either
             AirLoopHVAC:SupplyPlenum or AirLoopHVAC:ZoneSplitter object as well ass AirLoopHVAC:ReturnPath and either
             AirLoopHVAC:ReturnPlenum or AirLoopHVAC:ZoneMixer.
         """
         zone_system_template_field_name = \
             self._get_zone_template_field_from_system_type(template_type=system_class_object.template_type)
+        if zone_system_index is None:
+            zone_system_index = self._get_zone_system_index(expanded_zones=expanded_zones)
+        system_zones = zone_system_index.get((zone_system_template_field_name, system_class_object.template_name), [])
         # iterate over inlet node name types.  For DualDuct, this is two entries (hot/cold).  For all other systems,
         # this is a single value
         if system_class_object.template_type == 'HVACTemplate:System:DualDuct':
             inlet_nodes = ['cold_air_inlet_node_name', 'hot_air_inlet_node_name']
         else:
             inlet_nodes = ['air_inlet_node_name', ]
-        # create ExpandObjects class object to use some yaml and epjson functions
-        eo = ExpandObjects(logger_level=self.logger_level, logger_name=self.logger_name)
-        eo.unique_name = getattr(system_class_object, 'template_name')
-        # iterate over expanded zones and if the system reference field exists, and is for the referenced system,
-        # append them in the splitter and mixer lists
+        # use the shared ExpandObjectsHelper for yaml and epjson functions
+        eo = self._get_expand_objects_helper(unique_name=getattr(system_class_object, 'template_name'))
+        # iterate over the expanded zones that reference the system and append them in the splitter and mixer lists
         zone_return_plenums = []
         zone_induced_air_nodes = []
         for node_idx, inlet_node in enumerate(inlet_nodes):
             zone_splitters = []
             zone_mixers = []
             zone_supply_plenums = []
-            for _, ez in expanded_zones.items():
-                if getattr(ez, zone_system_template_field_name, None) == system_class_object.template_name:
-                    if getattr(ez, 'flow_type', None) in ['SeriesFromPlenum', 'ParallelFromPlenum']:
-                        zone_induced_air_node = ez.unique_name
-                    else:
-                        zone_induced_air_node = None
-                    if getattr(ez, 'supply_plenum_name', None) or (
-                            getattr(ez, 'cold_supply_plenum_name', None) and inlet_node == 'cold_air_inlet_node_name') or (
-                            getattr(ez, 'hot_supply_plenum_name', None) and inlet_node == 'hot_air_inlet_node_name'):
-                        try:
-                            zone_supply_equipment = {'AirLoopHVAC:SupplyPlenum': ez.epjson['AirLoopHVAC:SupplyPlenum']}
-                        except (KeyError, AttributeError):
-                            raise InvalidTemplateException(
-                                'Error: supply_plenum_name indicated for zone template {} but '
-                                'AirLoopHVAC:SupplyPlenum was not created'.format(ez.unique_name))
-                    else:
-                        zone_supply_equipment = self.get_epjson_objects(
-                            epjson=ez.epjson,
-                            object_type_regexp=r'^AirTerminal:.*')
+            for ez, zone_connection_objects in system_zones:
+                if getattr(ez, 'flow_type', None) in ['SeriesFromPlenum', 'ParallelFromPlenum']:
+                    zone_induced_air_node = ez.unique_name
+                else:
+                    zone_induced_air_node = None
+                if getattr(ez, 'supply_plenum_name', None) or (
+                        getattr(ez, 'cold_supply_plenum_name', None) and inlet_node == 'cold_air_inlet_node_name') or (
+                        getattr(ez, 'hot_supply_plenum_name', None) and inlet_node == 'hot_air_inlet_node_name'):
                     try:
-                        (zone_supply_equipment_type, zone_supply_equipment_structure), = zone_supply_equipment.items()
-                        (zone_supply_equipment_name, zone_supply_equipment_fields), = zone_supply_equipment_structure.items()
-
-                        if zone_supply_equipment_type == 'AirLoopHVAC:SupplyPlenum':
-                            outlet_node_name = zone_supply_equipment_fields['inlet_node_name']
-                            zone_supply_plenums.append({
-                                'component_name': zone_supply_equipment_name,
-                                'component_object_type': zone_supply_equipment_type
-                            })
-                        elif zone_supply_equipment_type in ['AirTerminal:SingleDuct:SeriesPIU:Reheat',
-                                                            'AirTerminal:SingleDuct:ParallelPIU:Reheat']:
-                            # Raise error if inlet node name is overridden for multi-inlet node systems (DualDuct)
-                            if len(inlet_nodes) > 1:
-                                raise InvalidTemplateException(
-                                    'Error: Series or Parallel PIU is being referenced '
-                                    'by an invalid system {}'.format(system_class_object.template_type))
-                            outlet_node_name = zone_supply_equipment_fields['supply_air_inlet_node_name']
-                        else:
-                            outlet_node_name = zone_supply_equipment_fields[inlet_node]
-                    except (KeyError, AttributeError, ValueError):
+                        zone_supply_equipment = {
+                            'AirLoopHVAC:SupplyPlenum': zone_connection_objects['AirLoopHVAC:SupplyPlenum']}
+                    except (KeyError, AttributeError):
                         raise InvalidTemplateException(
-                            'Error: Search for zone equipment from Supply Path creation failed for '
-                            'outlet node.  system {}, zone {}, zone equipment {}'
-                            .format(system_class_object.template_name, ez.unique_name, zone_supply_equipment))
-                    if getattr(ez, 'return_plenum_name', None):
-                        try:
-                            zone_return_equipment = {'AirLoopHVAC:ReturnPlenum': ez.epjson['AirLoopHVAC:ReturnPlenum']}
-                        except (KeyError, AttributeError):
+                            'Error: supply_plenum_name indicated for zone template {} but '
+                            'AirLoopHVAC:SupplyPlenum was not created'.format(ez.unique_name))
+                else:
+                    zone_supply_equipment = {
+                        object_type: object_structure
+                        for object_type, object_structure in zone_connection_objects.items()
+                        if object_type.lower().startswith('airterminal:')}
+                try:
+                    (zone_supply_equipment_type, zone_supply_equipment_structure), = zone_supply_equipment.items()
+                    (zone_supply_equipment_name, zone_supply_equipment_fields), = zone_supply_equipment_structure.items()
+
+                    if zone_supply_equipment_type == 'AirLoopHVAC:SupplyPlenum':
+                        outlet_node_name = zone_supply_equipment_fields['inlet_node_name']
+                        zone_supply_plenums.append({
+                            'component_name': zone_supply_equipment_name,
+                            'component_object_type': zone_supply_equipment_type
+                        })
+                    elif zone_supply_equipment_type in ['AirTerminal:SingleDuct:SeriesPIU:Reheat',
+                                                        'AirTerminal:SingleDuct:ParallelPIU:Reheat']:
+                        # Raise error if inlet node name is overridden for multi-inlet node systems (DualDuct)
+                        if len(inlet_nodes) > 1:
                             raise InvalidTemplateException(
-                                'Error: return_plenum_name indicated for zone template {} but '
-                                'AirLoopHVAC:ReturnPlenum was not created'.format(ez.unique_name))
+                                'Error: Series or Parallel PIU is being referenced '
+                                'by an invalid system {}'.format(system_class_object.template_type))
+                        outlet_node_name = zone_supply_equipment_fields['supply_air_inlet_node_name']
                     else:
-                        try:
-                            zone_return_equipment = {'ZoneHVAC:EquipmentConnections': ez.epjson['ZoneHVAC:EquipmentConnections']}
-                        except (KeyError, AttributeError, ValueError):
-                            raise InvalidTemplateException(
-                                'Error: Search for ZoneHVAC:EquipmentConnections object from Supply '
-                                'Path creation failed for inlet node.  system {}, zone {}'
-                                .format(system_class_object.template_name, ez.unique_name))
+                        outlet_node_name = zone_supply_equipment_fields[inlet_node]
+                except (KeyError, AttributeError, ValueError):
+                    raise InvalidTemplateException(
+                        'Error: Search for zone equipment from Supply Path creation failed for '
+                        'outlet node.  system {}, zone {}, zone equipment {}'
+                        .format(system_class_object.template_name, ez.unique_name, zone_supply_equipment))
+                if getattr(ez, 'return_plenum_name', None):
                     try:
-                        (zone_return_equipment_type, zone_return_equipment_structure), = zone_return_equipment.items()
-                        (zone_return_equipment_name, zone_return_equipment_fields), = zone_return_equipment_structure.items()
-                        if zone_return_equipment_type == 'AirLoopHVAC:ReturnPlenum':
-                            inlet_node_name = zone_return_equipment_fields['outlet_node_name']
-                            # use node_idx to prevent multiple zone_return_plenum objects from being created in dualduct zones
-                            if node_idx == 0:
-                                zone_return_plenums.append({
-                                    'component_name': zone_return_equipment_name,
-                                    'component_object_type': zone_return_equipment_type
-                                })
-                        else:
-                            inlet_node_name = zone_return_equipment_fields['zone_return_air_node_or_nodelist_name']
+                        zone_return_equipment = {
+                            'AirLoopHVAC:ReturnPlenum': zone_connection_objects['AirLoopHVAC:ReturnPlenum']}
+                    except (KeyError, AttributeError):
+                        raise InvalidTemplateException(
+                            'Error: return_plenum_name indicated for zone template {} but '
+                            'AirLoopHVAC:ReturnPlenum was not created'.format(ez.unique_name))
+                else:
+                    try:
+                        zone_return_equipment = {
+                            'ZoneHVAC:EquipmentConnections': zone_connection_objects['ZoneHVAC:EquipmentConnections']}
                     except (KeyError, AttributeError, ValueError):
                         raise InvalidTemplateException(
-                            'Error: Search for zone equipment from Return Path creation failed for '
-                            'inlet node.  system {}, zone {}, zone equipment {}'
-                            .format(system_class_object.template_name, ez.unique_name, zone_return_equipment))
-                    zone_splitters.append(
-                        {
-                            "outlet_node_name": outlet_node_name
-                        }
-                    )
-                    zone_mixers.append(
+                            'Error: Search for ZoneHVAC:EquipmentConnections object from Supply '
+                            'Path creation failed for inlet node.  system {}, zone {}'
+                            .format(system_class_object.template_name, ez.unique_name))
+                try:
+                    (zone_return_equipment_type, zone_return_equipment_structure), = zone_return_equipment.items()
+                    (zone_return_equipment_name, zone_return_equipment_fields), = zone_return_equipment_structure.items()
+                    if zone_return_equipment_type == 'AirLoopHVAC:ReturnPlenum':
+                        inlet_node_name = zone_return_equipment_fields['outlet_node_name']
+                        # use node_idx to prevent multiple zone_return_plenum objects from being created in dualduct zones
+                        if node_idx == 0:
+                            zone_return_plenums.append({
+                                'component_name': zone_return_equipment_name,
+                                'component_object_type': zone_return_equipment_type
+                            })
+                    else:
+                        inlet_node_name = zone_return_equipment_fields['zone_return_air_node_or_nodelist_name']
+                except (KeyError, AttributeError, ValueError):
+                    raise InvalidTemplateException(
+                        'Error: Search for zone equipment from Return Path creation failed for '
+                        'inlet node.  system {}, zone {}, zone equipment {}'
+                        .format(system_class_object.template_name, ez.unique_name, zone_return_equipment))
+                zone_splitters.append(
+                    {
+                        "outlet_node_name": outlet_node_name
+                    }
+                )
+                zone_mixers.append(
+                    {
+                        "inlet_node_name": inlet_node_name
+                    }
+                )
+                if zone_induced_air_node:
+                    # This is for PIU objects that use SeriesFromPlenum or ParallelFromPlenum
+                    zone_induced_air_nodes.append(
                         {
-                            "inlet_node_name": inlet_node_name
+                            "node_name": '{} Return'.format(zone_induced_air_node)
                         }
                     )
-                    if zone_induced_air_node:
-                        # This is for PIU objects that use SeriesFromPlenum or ParallelFromPlenum
-                        zone_induced_air_nodes.append(
-                            {
-                                "node_name": '{} Return'.format(zone_induced_air_node)
-                            }
-                        )
             # create plenums or spliters/mixers, depending on template inputs
             supply_object = None
             supply_plenum_name = getattr(system_class_object, 'supply_plenum_name', None)
@@ -1176,36 +1582,38 @@ class HVACTemplate(EPJSON):
             object_dictionary=resolved_path_dictionary)
         return resolved_path_dictionary
 
-    def _create_system_vrf_path_connection_objects(self, system_class_object, expanded_zones):
+    def _create_system_vrf_path_connection_objects(self, system_class_object, expanded_zones, zone_system_index=None):
         """
         Create objects connecting VRF system to zone objects.
 
         :param system_class_object: Expanded HVACTemplate:System:.* class object
         :param expanded_zones: dictionary of ExpandZone objects
+        :param zone_system_index: (optional) index of expanded_zones from _get_zone_system_index.  If not provided, it
+            is created.
         :return: system supply air connection objects.  AirLoopHVAC:SupplyPath object and either
             AirLoopHVAC:SupplyPlenum or AirLoopHVAC:ZoneSplitter object as well ass AirLoopHVAC:ReturnPath and either
             AirLoopHVAC:ReturnPlenum or AirLoopHVAC:ZoneMixer.
         """
-        # create ExpandObjects class object to use some yaml and epjson functions
-        eo = ExpandObjects(logger_level=self.logger_level, logger_name=self.logger_name)
-        eo.unique_name = getattr(system_class_object, 'template_name')
+        # use the shared ExpandObjectsHelper for yaml and epjson functions
+        eo = self._get_expand_objects_helper(unique_name=getattr(system_class_object, 'template_name'))
         vrf_object_name_list = []
         zone_system_template_field_name = \
             self._get_zone_template_field_from_system_type(template_type=system_class_object.template_type)
-        for _, ez in expanded_zones.items():
-            if getattr(ez, zone_system_template_field_name, None) == system_class_object.template_name:
-                try:
-                    vrf_object = ez.epjson['ZoneHVAC:TerminalUnit:VariableRefrigerantFlow']
-                    (vrf_object_name, _), = vrf_object.items()
-                except (KeyError, AttributeError):
-                    raise InvalidTemplateException(
-                        "Error: VRF zone template {} expanded with no "
-                        "ZoneHVAC:TerminalUnit:VariableRefrigerantFlow object".format(ez.unique_name))
-                except ValueError:
-                    raise InvalidTemplateException(
-                        'ZoneHVAC:TerminalUnit:VariableRefrigerantFlow object incorrectly formatted: {}'
-                        .format(ez.epjson.get('ZoneHVAC:TerminalUnit:VariableRefrigerantFlow', 'None')))
-                vrf_object_name_list.append({'zone_terminal_unit_name': vrf_object_name})
+        if zone_system_index is None:
+            zone_system_index = self._get_zone_system_index(expanded_zones=expanded_zones)
+        for ez, _ in zone_system_index.get((zone_system_template_field_name, system_class_object.template_name), []):
+            try:
+                vrf_object = ez.epjson['ZoneHVAC:TerminalUnit:VariableRefrigerantFlow']
+                (vrf_object_name, _), = vrf_object.items()
+            except (KeyError, AttributeError):
+                raise InvalidTemplateException(
+                    "Error: VRF zone template {} expanded with no "
+                    "ZoneHVAC:TerminalUnit:VariableRefrigerantFlow object".format(ez.unique_name))
+            except ValueError:
+                raise InvalidTemplateException(
+                    'ZoneHVAC:TerminalUnit:VariableRefrigerantFlow object incorrectly formatted: {}'
+                    .format(ez.epjson.get('ZoneHVAC:TerminalUnit:VariableRefrigerantFlow', 'None')))
+            vrf_object_name_list.append({'zone_terminal_unit_name': vrf_object_name})
         if vrf_object_name_list:
             vrf_terminal_object = eo.get_structure(structure_hierarchy=[
                 'AutoCreated', 'System', 'ZoneTerminalUnitList', 'Base'])
@@ -1268,8 +1676,8 @@ class HVACTemplate(EPJSON):
                     try:
                         cndw_attributes[cndw_attribute] = getattr(chw_loop[0], chw_attribute)
                     except AttributeError:
-                        self.logger.debug('Chilled water attribute {} not set by user, using default for '
-                                          'condenser water'.format(chw_attribute))
+                        self.logger.debug('Chilled water attribute %s not set by user, using default for '
+                                          'condenser water', chw_attribute)
             cndw_attributes['template_plant_loop_type'] = 'CondenserWaterLoop'
             self.merge_epjson(
                 super_dictionary=plant_loop_dictionary,
@@ -1339,6 +1747,8 @@ class HVACTemplate(EPJSON):
                     for expanded_name, expanded_object in additional_plant_equipment.items():
                         if expanded_name not in expanded_plant_loops.keys():
                             expanded_plant_equipment[expanded_name] = expanded_object
+                            self.water_loop_branches.add_plant_equipment_branches(
+                                expanded_plant_equipment={expanded_name: expanded_object})
                 except (AttributeError, ValueError):
                     raise InvalidTemplateException(
                         'Error: A Plant equipment was specified to be created from a plant '
@@ -1356,28 +1766,12 @@ class HVACTemplate(EPJSON):
         :param expanded_plant_equipment: dictionary of ExpandPlantEquipment objects
         :return: epJSON formatted dictionary of branch objects for loop connections
         """
-        branch_dictionary = {}
-        for pe in expanded_plant_equipment.values():
-            branch_objects = copy.deepcopy(pe.epjson.get('Branch', {}))
-            for branch_name, branch_structure in branch_objects.items():
-                components = branch_structure.get('components')
-                if not components:
-                    raise InvalidTemplateException(
-                        'Error: In {} ({}) A branch object failed to create component fields {}'
-                        .format(pe.template_type, pe.template_name, branch_name))
-            # Special handling for chillers with condenser water and chilled water branches
-            # todo_eo: Currently the chilled and condenser water branches are separated by parsing the names.  A more
-            #  robust solution should be investigated.
-            if pe.template_type in ['HVACTemplate:Plant:Chiller', 'HVACTemplate:Plant:Chiller:ObjectReference'] \
-                    and getattr(pe, 'condenser_type', 'WaterCooled') == 'WaterCooled':
-                for branch_name, branch_structure in branch_objects.items():
-                    if 'chilledwater' in plant_loop_class_object.template_type.lower() and 'chw' in branch_name.lower():
-                        branch_dictionary.update({branch_name: branch_objects[branch_name]})
-                    if 'condenserwater' in plant_loop_class_object.template_type.lower() and 'cnd' in branch_name.lower():
-                        branch_dictionary.update({branch_name: branch_objects[branch_name]})
-            # typical handling when all plant equipment branches belong in one loop
-            elif pe.template_plant_loop_type in plant_loop_class_object.template_type:
-                branch_dictionary.update(branch_objects)
+        water_loop_branches = WaterLoopBranchRegistry()
+        water_loop_branches.add_plant_equipment_branches(expanded_plant_equipment=expanded_plant_equipment)
+        loop_type = water_loop_branches.get_loop_type(plant_loop_class_object)
+        branch_dictionary = {
+            **water_loop_branches.get_branches(loop_type=loop_type, loop_side='Demand'),
+            **water_loop_branches.get_branches(loop_type=loop_type, loop_side='Supply')}
         if branch_dictionary:
             return {'Branch': branch_dictionary}
         else:
@@ -1396,31 +1790,12 @@ class HVACTemplate(EPJSON):
         :param expanded_systems: ExpandSystem objects
         :return: epJSON formatted dictionary of branch objects
         """
-        # create list of regex matches for the given loop
-        if 'chilledwater' in plant_loop_class_object.template_type.lower():
-            branch_rgx = ['^Coil:Cooling:Water($|:DetailedGeometry)+', ]
-        elif 'hotwater' in plant_loop_class_object.template_type.lower():
-            branch_rgx = ['^Coil:Heating:Water($|:DetailedGeometry)+', '^ZoneHVAC:Baseboard.*Water']
-        elif 'mixedwater' in plant_loop_class_object.template_type.lower():
-            branch_rgx = ['^Coil:.*HeatPump.*', '^AirConditioner:VariableRefrigerantFlow$']
-        elif 'condenserwater' in plant_loop_class_object.template_type.lower():
-            return None
-        else:
-            InvalidTemplateException('an invalid loop type was specified when creating plant loop connections: {}'
-                                     .format(plant_loop_class_object.template_type))
-        branch_dictionary = {}
-        object_list = [expanded_zones or {}, expanded_systems or {}]
-        for class_object in object_list:
-            for co in class_object.values():
-                branch_objects = copy.deepcopy(co.epjson.get('Branch', {}))
-                for branch_name, branch_structure in branch_objects.items():
-                    # the regex check for 'main branch' is to avoid DualDuct main branches from accidentally being
-                    # included since they have coil objects in them as well.  They typical main branch is never accidentally
-                    # caught because the coil objects are never in the 0th position.
-                    for br in branch_rgx:
-                        if re.match(br, branch_structure['components'][0]['component_object_type']) and not \
-                                re.match('.*main branch$', branch_name.lower()):
-                            branch_dictionary.update({branch_name: branch_objects[branch_name]})
+        water_loop_branches = WaterLoopBranchRegistry()
+        water_loop_branches.add_zone_system_branches(expanded_objects=expanded_zones or {}, template_group='zones')
+        water_loop_branches.add_zone_system_branches(expanded_objects=expanded_systems or {}, template_group='systems')
+        branch_dictionary = water_loop_branches.get_branches(
+            loop_type=water_loop_branches.get_loop_type(plant_loop_class_object),
+            loop_side='Demand')
         if branch_dictionary:
             return {'Branch': branch_dictionary}
         else:
@@ -1431,7 +1806,8 @@ class HVACTemplate(EPJSON):
             plant_loop_class_object,
             expanded_plant_equipment,
             expanded_systems,
-            expanded_zones):
+            expanded_zones,
+            water_loop_branches=None):
         """
         Separate plant equipment, zone, and system branches into supply and demand sides for a given ExpandPlantLoop
         object.
@@ -1440,43 +1816,56 @@ class HVACTemplate(EPJSON):
         :param expanded_plant_equipment: expanded dictionary of ExpandPlantEquipment objects
         :param expanded_systems: expanded dictionary of ExpandSystem objects
         :param expanded_zones: expanded dictionary of ExpandZone objects
-        :return: tuple of demand and supply side branches for processing
+        :param water_loop_branches: (optional) WaterLoopBranchRegistry of the expanded objects.  If not provided, it is
+            created.
+        :return: tuple of demand and supply side branches for processing.  The branch dictionaries must not be
+            modified.
         """
-        # Get plant equipment, zone, and system branches
-        plant_equipment_branch_dictionary = self._get_plant_equipment_waterloop_branches_by_loop_type(
-            plant_loop_class_object=plant_loop_class_object,
-            expanded_plant_equipment=expanded_plant_equipment
-        )
-        zone_system_branch_dictionary = self._get_zone_system_waterloop_branches_by_loop_type(
-            plant_loop_class_object=plant_loop_class_object,
-            expanded_zones=expanded_zones,
-            expanded_systems=expanded_systems
-        )
-        # get branches in the loop
-        demand_branches = {}
-        # Special handling for condenser water loop where the chiller objects are the demand side.
-        if 'condenserwater' in plant_loop_class_object.template_type.lower():
-            pebd = copy.deepcopy(plant_equipment_branch_dictionary)
-            for object_name, object_structure in plant_equipment_branch_dictionary['Branch'].items():
-                try:
-                    if re.match(r'Chiller:.*', object_structure['components'][0]['component_object_type']):
-                        demand_branches.update({object_name: pebd['Branch'].pop(object_name)})
-                except (AttributeError, KeyError):
-                    raise InvalidTemplateException(
-                        'Error: Branch object is incorrectly formatted: {}'.format(plant_equipment_branch_dictionary))
-            supply_branches = pebd['Branch']
-        else:
-            demand_branches = zone_system_branch_dictionary.get('Branch') if zone_system_branch_dictionary else None
-            supply_branches = plant_equipment_branch_dictionary.get('Branch') \
-                if plant_equipment_branch_dictionary else None
+        if water_loop_branches is None:
+            water_loop_branches = WaterLoopBranchRegistry()
+            water_loop_branches.add_zone_system_branches(expanded_objects=expanded_zones or {}, template_group='zones')
+            water_loop_branches.add_zone_system_branches(
+                expanded_objects=expanded_systems or {}, template_group='systems')
+            water_loop_branches.add_plant_equipment_branches(expanded_plant_equipment=expanded_plant_equipment)
+        loop_type = water_loop_branches.get_loop_type(plant_loop_class_object)
+        demand_branches = water_loop_branches.get_branches(loop_type=loop_type, loop_side='Demand') or None
+        supply_branches = water_loop_branches.get_branches(loop_type=loop_type, loop_side='Supply') or None
         return demand_branches, supply_branches
 
+    @staticmethod
+    def _get_repeated_insert_list(entries, new_entries, index):
+        """
+        Get the list made by inserting each new entry, in order, at the same index of a list.  The output is built in
+        linear time instead of with one list insert per entry.
+
+        :param entries: list of existing entries, which is not modified
+        :param new_entries: list of entries to insert
+        :param index: insert index, 0, 1, or -1
+        :return: list of entries
+        """
+        if not new_entries:
+            return list(entries)
+        if index == 0:
+            return new_entries[::-1] + entries
+        elif index == 1:
+            # inserting into an empty list places the first entry at the start
+            if not entries:
+                return new_entries[:1] + new_entries[:0:-1]
+            return entries[:1] + new_entries[::-1] + entries[1:]
+        elif index == -1:
+            # inserting into an empty list places the first entry at the end
+            if not entries:
+                return new_entries[1:] + new_entries[:1]
+            return entries[:-1] + new_entries + entries[-1:]
+        raise ValueError('Insert index {} is not supported'.format(index))
+
     def _create_water_loop_connectors_and_nodelist(
             self,
             plant_loop_class_object,
             expanded_plant_equipment,
             expanded_zones=None,
-            expanded_systems=None):
+            expanded_systems=None,
+            water_loop_branches=None):
         """
         Create Branchlist, Connector, ConnectorList, and supply NodeLists objects that connect the PlantLoop to supply
         and demand water objects.  This operation is performed outside of ExpandObjects because it requires outputs
@@ -1486,6 +1875,7 @@ class HVACTemplate(EPJSON):
         :param expanded_plant_equipment: expanded dictionary of ExpandPlantEquipment objects
         :param expanded_systems: expanded dictionary of ExpandSystem objects
         :param expanded_zones: expanded dictionary of ExpandZone objects
+        :param water_loop_branches: (optional) WaterLoopBranchRegistry of the expanded objects
         :return: Updated class epjson attribute with Branchlist, Connector, and ConnectorList objects.
         """
         # Get plant equipment, zone, and system branches.  Split them into demand and supply sides
@@ -1493,7 +1883,8 @@ class HVACTemplate(EPJSON):
             plant_loop_class_object=plant_loop_class_object,
             expanded_plant_equipment=expanded_plant_equipment,
             expanded_systems=expanded_systems,
-            expanded_zones=expanded_zones
+            expanded_zones=expanded_zones,
+            water_loop_branches=water_loop_branches
         )
         # check to make sure loops aren't empty
         if demand_branches:
@@ -1534,9 +1925,8 @@ class HVACTemplate(EPJSON):
                 'Error: in {} ({}). {}'
                 .format(plant_loop_class_object.template_type, plant_loop_class_object.unique_name,
                         ' '.join(msg)))
-        # Use ExpandObjects class for helper functions
-        eo = ExpandObjects(logger_level=self.logger_level, logger_name=self.logger_name)
-        eo.unique_name = getattr(plant_loop_class_object, 'template_name')
+        # use the shared ExpandObjectsHelper for yaml and epjson functions
+        eo = self._get_expand_objects_helper(unique_name=getattr(plant_loop_class_object, 'template_name'))
         # create connector objects based on template attributes
         if (plant_loop_class_object.template_type == 'HVACTemplate:Plant:ChilledWaterLoop' and getattr(
                 plant_loop_class_object, 'chilled_water_supply_side_bypass_pipe', 'Yes') == 'No') or \
@@ -1593,20 +1983,34 @@ class HVACTemplate(EPJSON):
         # create supply nodelist
         supply_nodelist = eo.get_structure(
             structure_hierarchy=['AutoCreated', 'PlantLoop', 'NodeList', 'Supply'])
-        # apply branches
+        # apply branches.  The lists are assembled in one pass, with the same order as inserting each branch at the
+        #  given index of the YAML list.
         try:
-            for branch in demand_branches:
-                demand_branchlist['branches'].insert(1, {'branch_name': branch})
-                connector_demand_splitter['branches'].append({'outlet_branch_name': branch})
-                connector_demand_mixer['branches'].append({'inlet_branch_name': branch})
-            for branch in supply_branches:
-                supply_branchlist['branches'].insert(1, {'branch_name': branch})
-                connector_supply_splitter['branches'].insert(-1, {'outlet_branch_name': branch})
-                connector_supply_mixer['branches'].insert(-1, {'inlet_branch_name': branch})
-                supply_nodelist['nodes'].insert(
-                    0,
-                    {'node_name': supply_branches[branch]['components'][-1]['component_outlet_node_name']})
-        except (KeyError, AttributeError):
+            demand_branchlist['branches'] = self._get_repeated_insert_list(
+                entries=demand_branchlist['branches'],
+                new_entries=[{'branch_name': branch} for branch in demand_branches],
+                index=1)
+            connector_demand_splitter['branches'].extend([{'outlet_branch_name': branch} for branch in demand_branches])
+            connector_demand_mixer['branches'].extend([{'inlet_branch_name': branch} for branch in demand_branches])
+            supply_branchlist['branches'] = self._get_repeated_insert_list(
+                entries=supply_branchlist['branches'],
+                new_entries=[{'branch_name': branch} for branch in supply_branches],
+                index=1)
+            connector_supply_splitter['branches'] = self._get_repeated_insert_list(
+                entries=connector_supply_splitter['branches'],
+                new_entries=[{'outlet_branch_name': branch} for branch in supply_branches],
+                index=-1)
+            connector_supply_mixer['branches'] = self._get_repeated_insert_list(
+                entries=connector_supply_mixer['branches'],
+                new_entries=[{'inlet_branch_name': branch} for branch in supply_branches],
+                index=-1)
+            supply_nodelist['nodes'] = self._get_repeated_insert_list(
+                entries=supply_nodelist['nodes'],
+                new_entries=[
+                    {'node_name': branch_structure['components'][-1]['component_outlet_node_name']}
+                    for branch_structure in supply_branches.values()],
+                index=0)
+        except (KeyError, AttributeError, TypeError):
             raise PyExpandObjectsYamlStructureException(
                 'Error: In {} AutoCreated PlantLoop Connector YAML object was '
                 'improperly formatted'.format(plant_loop_class_object.template_type))
@@ -1641,7 +2045,8 @@ class HVACTemplate(EPJSON):
     def _create_plant_equipment_lists(
             self,
             plant_loop_class_object,
-            expanded_plant_equipment):
+            expanded_plant_equipment,
+            water_loop_branches=None):
         """
         Create PlantEquipmentList and CondenserEquipmentList for a given ExpandPlantLoop class object.
         This operation is performed outside of ExpandObjects because it requires outputs from
@@ -1649,6 +2054,7 @@ class HVACTemplate(EPJSON):
 
         :param plant_loop_class_object: ExpandPlantLoop class object
         :param expanded_plant_equipment: expanded dictionary of ExpandPlantEquipment objects
+        :param water_loop_branches: (optional) WaterLoopBranchRegistry of the expanded objects
         :return: Updated class epjson attribute with PlantEquipmentList or CondenserEquipmentlist.
         """
         # Get plant equipment, zone, and system branches.  Split them into demand and supply sides
@@ -1656,7 +2062,8 @@ class HVACTemplate(EPJSON):
             plant_loop_class_object=plant_loop_class_object,
             expanded_plant_equipment=expanded_plant_equipment,
             expanded_systems=None,
-            expanded_zones=None
+            expanded_zones=None,
+            water_loop_branches=water_loop_branches
         )
         equipment = []
         # Extract priority from each equipment object referenced by the branch and use it to order the equipment list
@@ -1681,9 +2088,8 @@ class HVACTemplate(EPJSON):
                 'equipment_name': sb['components'][-1]['component_name'],
                 'equipment_object_type': sb['components'][-1]['component_object_type']
             })
-        # use ExpandObjects functions
-        eo = ExpandObjects(logger_level=self.logger_level, logger_name=self.logger_name)
-        eo.unique_name = getattr(plant_loop_class_object, 'template_name')
+        # use the shared ExpandObjectsHelper for yaml and epjson functions
+        eo = self._get_expand_objects_helper(unique_name=getattr(plant_loop_class_object, 'template_name'))
         if 'hotwater' in plant_loop_class_object.template_type.lower() or \
                 'chilledwater' in plant_loop_class_object.template_type.lower():
             list_dictionary = \
@@ -1720,71 +2126,155 @@ class HVACTemplate(EPJSON):
             object_dictionary=resolved_path_dictionary)
         return
 
-    def run(self, input_epjson=None):
+    def _preprocess_input_epjson(self):
         """
-        Execute HVAC Template process workflow
+        Sort the objects of the input epJSON into templates and base objects
 
-        :param input_epjson: input epJSON file
-        :return: epJSON containing expanded objects from templates
+        :return: None.  The objects are stored in the class templates* and base_objects attributes.
         """
-        if not input_epjson:
-            if self.input_epjson:
-                input_epjson = self.input_epjson
-            else:
-                raise InvalidEpJSONException("No epJSON file loaded or provided to HVACTemplate processor")
-        self.epjson_process(epjson_ref=input_epjson)
         self.logger.info('##### PreProcessing Data #####')
         self._hvac_template_preprocess(epjson=self.input_epjson)
+        return
+
+    def _process_thermostats(self):
+        """
+        Expand the HVACTemplate:Thermostat objects
+
+        :return: None.  The expanded objects are stored in the class expanded_thermostats attribute.
+        """
         self.logger.info('##### Processing Thermostats #####')
         self.expanded_thermostats = self._expand_templates(
             templates=self.templates_thermostats,
             expand_class=ExpandThermostat)
+        return
+
+    def _process_systems(self):
+        """
+        Expand the HVACTemplate:System objects
+
+        :return: None.  The expanded objects are stored in the class expanded_systems attribute.
+        """
         self.logger.info('##### Processing Systems #####')
         self.expanded_systems = self._expand_templates(
             templates=self.templates_systems,
             expand_class=ExpandSystem)
+        self.water_loop_branches.add_zone_system_branches(
+            expanded_objects=self.expanded_systems, template_group='systems')
+        return
+
+    def _process_zones(self):
+        """
+        Expand the HVACTemplate:Zone objects, which reference the expanded systems, and index them by system
+
+        :return: None.  The expanded objects are stored in the class expanded_zones and zone_system_index attributes.
+        """
         self.logger.info('##### Processing Zones #####')
+        zone_expansion_cache = ExpansionCache(expand_class=ExpandZone) if self.zone_expansion_cache else None
         self.expanded_zones = self._expand_templates(
             templates=self.templates_zones,
             expand_class=ExpandZone,
+            expansion_cache=zone_expansion_cache,
             system_class_objects=self.expanded_systems)
+        self.zone_system_index = self._get_zone_system_index(expanded_zones=self.expanded_zones)
+        self.water_loop_branches.add_zone_system_branches(expanded_objects=self.expanded_zones, template_group='zones')
+        if zone_expansion_cache:
+            self.zone_expansion_cache_hits = zone_expansion_cache.hits
+            self.logger.debug('Zone expansion cache hits: %s, expansions cached: %s',
+                              zone_expansion_cache.hits, zone_expansion_cache.misses)
+        return
+
+    def _build_zone_thermostat_connections(self):
+        """
+        Create the ZoneControl:Thermostat objects of the expanded zones
+
+        :return: None.  Objects are added to the class epjson attribute.
+        """
         self.logger.info('##### Building Zone-Thermostat Connections #####')
         for _, zone_class_object in self.expanded_zones.items():
             self._create_zonecontrol_thermostat(zone_class_object=zone_class_object)
+        return
+
+    def _build_system_zone_connections(self):
+        """
+        Create the air path objects that connect the expanded systems to their zones
+
+        :return: None.  Objects are added to the class epjson attribute.
+        """
         self.logger.info('##### Building System-Zone Connections #####')
         for _, system_class_object in self.expanded_systems.items():
             # VRF systems do not connect via air paths, and need a separate function.
             if system_class_object.template_type == 'HVACTemplate:System:VRF':
                 self._create_system_vrf_path_connection_objects(
                     system_class_object=system_class_object,
-                    expanded_zones=self.expanded_zones)
+                    expanded_zones=self.expanded_zones,
+                    zone_system_index=self.zone_system_index)
             else:
                 self._create_system_path_connection_objects(
                     system_class_object=system_class_object,
-                    expanded_zones=self.expanded_zones)
+                    expanded_zones=self.expanded_zones,
+                    zone_system_index=self.zone_system_index)
+        return
+
+    def _process_plant_loops(self):
+        """
+        Expand the HVACTemplate:Plant loop objects
+
+        :return: None.  The expanded objects are stored in the class expanded_plant_loops attribute.
+        """
         self.logger.info('##### Processing Plant Loops #####')
         self.expanded_plant_loops = self._expand_templates(
             templates=self.templates_plant_loops,
             expand_class=ExpandPlantLoop)
+        return
+
+    def _process_plant_equipment(self):
+        """
+        Expand the HVACTemplate:Plant equipment objects, which reference the expanded plant loops
+
+        :return: None.  The expanded objects are stored in the class expanded_plant_equipment attribute.
+        """
         self.logger.info('##### Processing Plant Equipment #####')
         self.expanded_plant_equipment = self._expand_templates(
             templates=self.templates_plant_equipment,
             expand_class=ExpandPlantEquipment,
             plant_loop_class_objects=self.expanded_plant_loops)
-        # Pass through expanded plant equipment objects to create additional plant loops and equipment if necessary
-        self._create_additional_plant_loops_and_equipment_from_equipment(
-            expanded_plant_equipment=self.expanded_plant_equipment,
-            expanded_plant_loops=self.expanded_plant_loops)
+        self.water_loop_branches.add_plant_equipment_branches(expanded_plant_equipment=self.expanded_plant_equipment)
+        return
+
+    def _build_plant_equipment_connections(self):
+        """
+        Create the branches, connectors, and equipment lists of each expanded plant loop
+
+        :return: None.  Objects are added to the class epjson attribute.
+        """
         self.logger.info('##### Building Plant-Plant Equipment Connections #####')
         for expanded_pl in self.expanded_plant_loops.values():
             self._create_water_loop_connectors_and_nodelist(
                 plant_loop_class_object=expanded_pl,
                 expanded_plant_equipment=self.expanded_plant_equipment,
                 expanded_systems=self.expanded_systems,
-                expanded_zones=self.expanded_zones)
+                expanded_zones=self.expanded_zones,
+                water_loop_branches=self.water_loop_branches)
             self._create_plant_equipment_lists(
                 plant_loop_class_object=expanded_pl,
-                expanded_plant_equipment=self.expanded_plant_equipment)
+                expanded_plant_equipment=self.expanded_plant_equipment,
+                water_loop_branches=self.water_loop_branches)
+        return
+
+    def _create_output_epjson(self, index_counters):
+        """
+        Record the expansion structure lookups of the run and merge the epJSON objects of all expanded classes
+
+        :param index_counters: expansion structure index counters at the start of the run
+        :return: merged epJSON dictionary, or a read-only EPJSONLayeredView of the epJSON dictionaries if
+            merge_output_epjson is False
+        """
+        self.expansion_structure_lookups = {
+            k: v - index_counters[k] + self._worker_index_counters.get(k, 0)
+            for k, v in get_expansion_structure_index_counters().items()}
+        # internal counters are logged at DEBUG so they are not added to the Output:PreprocessorMessage at INFO
+        self.logger.debug('Expansion structure index lookups: %(lookups)s, hits: %(hits)s',
+                          self.expansion_structure_lookups)
         self.logger.info('##### Creating epJSON #####')
         # Merge each set of epJSON dictionaries
         merge_list = [
@@ -1795,6 +2285,11 @@ class HVACTemplate(EPJSON):
             *[j.epjson for i, j in self.expanded_systems.items()],
             *[j.epjson for i, j in self.expanded_plant_loops.items()],
             *[j.epjson for i, j in self.expanded_plant_equipment.items()]]
+        self.validated_base_objects = self._get_validated_base_objects(
+            generated_epjson_list=[i for i in merge_list if i is not self.base_objects])
+        if not self.merge_output_epjson:
+            # The layers are reversed so objects of later dictionaries replace those of the same name, as in the merge
+            return EPJSONLayeredView(*reversed(merge_list))
         output_epjson = {}
         # The unique_name_override option is enabled here due to ObjectReference templates having the base equipment
         # in them as well as being present in the base epjson.  A better solution should be investigated so that this
@@ -1804,15 +2299,149 @@ class HVACTemplate(EPJSON):
                 super_dictionary=output_epjson,
                 object_dictionary=merge_dictionary,
                 unique_name_override=True)
-        # Use this for file debugging
-        # import json
-        # with open('test.epJSON', 'w') as base_file:
-        #     json.dump(output_epjson, base_file, indent=4, sort_keys=True)
-        # Create output format
-        output_epjson = {
-            "epJSON": output_epjson,
-            "epJSON_base": self.base_objects,
-            "epJSON_hvac_templates": self.templates,
-            'Output:PreprocessorMessage': self.stream.getvalue()
-        }
         return output_epjson
+
+    def _get_validated_base_objects(self, generated_epjson_list):
+        """
+        Get the base objects that passed validation with the input epJSON and were not replaced or returned by an
+        expansion, which may have modified them.
+
+        :param generated_epjson_list: list of epJSON dictionaries created by the expansion
+        :return: epJSON dictionary of base objects
+        """
+        if not self.schema or not self.input_epjson_is_valid:
+            return {}
+        generated_object_names = {}
+        for generated_epjson in generated_epjson_list:
+            for object_type, object_structure in generated_epjson.items():
+                generated_object_names.setdefault(object_type, set()).update(object_structure.keys())
+        validated_base_objects = {}
+        for object_type, object_structure in self.base_objects.items():
+            generated_names = generated_object_names.get(object_type, ())
+            validated_base_objects[object_type] = {
+                object_name: object_fields for object_name, object_fields in object_structure.items()
+                if object_name not in generated_names}
+        return validated_base_objects
+
+    def _get_run_stages(self, index_counters):
+        """
+        Get the stages of the HVAC Template process workflow.  The inputs and outputs are the class attributes each
+        stage reads and writes, from which the stage dependencies are found.  The list order is the serial order.
+
+        :param index_counters: expansion structure index counters at the start of the run
+        :return: list of Stage objects
+        """
+        expanded_plant = ('expanded_plant_loops', 'expanded_plant_equipment')
+        return [
+            Stage(
+                name='preprocess',
+                function=self._preprocess_input_epjson,
+                inputs=('input_epjson', ),
+                outputs=('templates', 'base_objects', 'templates_thermostats', 'templates_systems',
+                         'templates_zones', 'templates_plant_loops', 'templates_plant_equipment')),
+            Stage(
+                name='thermostats',
+                function=self._process_thermostats,
+                inputs=('templates_thermostats', ),
+                outputs=('expanded_thermostats', )),
+            Stage(
+                name='systems',
+                function=self._process_systems,
+                inputs=('templates_systems', ),
+                outputs=('expanded_systems', 'system_water_loop_branches')),
+            Stage(
+                name='zones',
+                function=self._process_zones,
+                inputs=('templates_zones', 'expanded_systems'),
+                outputs=('expanded_zones', 'zone_system_index', 'zone_water_loop_branches')),
+            Stage(
+                name='zone_thermostat_connections',
+                function=self._build_zone_thermostat_connections,
+                inputs=('expanded_zones', 'expanded_thermostats'),
+                outputs=('epjson', )),
+            Stage(
+                name='system_zone_connections',
+                function=self._build_system_zone_connections,
+                inputs=('expanded_systems', 'expanded_zones', 'zone_system_index'),
+                outputs=('epjson', )),
+            Stage(
+                name='plant_loops',
+                function=self._process_plant_loops,
+                inputs=('templates_plant_loops', ),
+                outputs=('expanded_plant_loops', )),
+            Stage(
+                name='plant_equipment',
+                function=self._process_plant_equipment,
+                inputs=('templates_plant_equipment', 'expanded_plant_loops'),
+                outputs=('expanded_plant_equipment', 'plant_equipment_water_loop_branches')),
+            # Pass through expanded plant equipment objects to create additional plant loops and equipment if necessary
+            Stage(
+                name='additional_plant_loops_and_equipment',
+                function=lambda: self._create_additional_plant_loops_and_equipment_from_equipment(
+                    expanded_plant_equipment=self.expanded_plant_equipment,
+                    expanded_plant_loops=self.expanded_plant_loops),
+                inputs=expanded_plant,
+                outputs=(*expanded_plant, 'plant_equipment_water_loop_branches', 'templates', 'templates_plant_loops',
+                         'templates_plant_equipment')),
+            Stage(
+                name='plant_equipment_connections',
+                function=self._build_plant_equipment_connections,
+                inputs=(*expanded_plant, 'expanded_systems', 'expanded_zones', 'zone_water_loop_branches',
+                        'system_water_loop_branches', 'plant_equipment_water_loop_branches'),
+                outputs=('epjson', )),
+            Stage(
+                name='epjson',
+                function=lambda: self._create_output_epjson(index_counters=index_counters),
+                inputs=('epjson', 'base_objects', 'expanded_thermostats', 'expanded_zones', 'expanded_systems',
+                        *expanded_plant),
+                outputs=('expansion_structure_lookups', 'validated_base_objects'))]
+
+    def run(self, input_epjson=None):
+        """
+        Execute HVAC Template process workflow.  The workflow stages are run by a StageScheduler, which overlaps
+        independent stages while they wait on worker processes if more than one stage worker is used.
+
+        :param input_epjson: input epJSON file
+        :return: epJSON containing expanded objects from templates
+        """
+        # messages of the run are written to the stream of this object, even if another object reset the stream
+        with message_stream(self.stream):
+            if not input_epjson:
+                if self.input_epjson:
+                    input_epjson = self.input_epjson
+                else:
+                    raise InvalidEpJSONException("No epJSON file loaded or provided to HVACTemplate processor")
+            self.epjson_process(epjson_ref=input_epjson)
+            # Worker processes, if enabled, are started on the first parallel expansion and stopped when the run ends.
+            try:
+                index_counters = get_expansion_structure_index_counters()
+                self._worker_index_counters = {}
+                self.water_loop_branches = WaterLoopBranchRegistry()
+                self.validated_base_objects = {}
+                self._expand_objects_helper = None
+                self._stage_scheduler = StageScheduler(
+                    stages=self._get_run_stages(index_counters=index_counters),
+                    stream=self.stream,
+                    max_workers=self.processes if self.stage_workers is None else self.stage_workers)
+                output_epjson = self._stage_scheduler.run()['epjson']
+                self.stage_timings = self._stage_scheduler.timings
+                for stage_timing in self.stage_timings:
+                    self.logger.debug(
+                        'Stage %s (%s): start %.3f s, end %.3f s, duration %.3f s',
+                        stage_timing.name, stage_timing.thread, stage_timing.start, stage_timing.end,
+                        stage_timing.duration)
+                # Use this for file debugging
+                # import json
+                # with open('test.epJSON', 'w') as base_file:
+                #     json.dump(output_epjson, base_file, indent=4, sort_keys=True)
+                # Create output format
+                output_epjson = {
+                    "epJSON": output_epjson,
+                    "epJSON_base": self.base_objects,
+                    "epJSON_hvac_templates": self.templates,
+                    'Output:PreprocessorMessage': self.stream.getvalue()
+                }
+                return output_epjson
+            finally:
+                self._stage_scheduler = None
+                self._shutdown_process_pool()
@@ -0,0 +1,154 @@
+import json
+import importlib
+import importlib.util
+from collections.abc import Mapping
+from custom_exceptions import PyExpandObjectsException
+
+# JSON libraries in order of preference.  The standard library json module is always available.
+json_backend_names = ('orjson', 'ujson', 'rapidjson', 'json')
+
+# JSONBackend objects that have been created, keyed by library name
+json_backends = {}
+
+# Text written by JSON libraries for NaN and Infinity values.  orjson writes them as null.
+non_finite_tokens = ('null', 'NaN', 'Infinity')
+
+
+class JSONBackend:
+    """
+    Read and write JSON with one JSON library.  Objects are always written with sorted keys, so the output of every
+    library has the same objects in the same order.  Compact output has no indentation or whitespace, and is written
+    by the library.  Indented output uses 4 spaces and is always written by the standard library json module, so
+    indented files are the same for every library.
+
+    A library that fails to read or write an object (e.g. integers that do not fit in 64 bits, which orjson rejects)
+    falls back to the standard library json module, which reports the error if it fails as well.  NaN and Infinity
+    values, which are not valid JSON, are rejected with a ValueError instead of being written.  Compact output of a
+    library that contains null, NaN, or Infinity is written again by the standard library to check for them, since
+    orjson writes these values as null.
+
+    Attributes:
+        name: JSON library name
+
+        module: imported JSON library
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.module = importlib.import_module(name)
+        return
+
+    def loads(self, data):
+        """
+        Parse a JSON document
+
+        :param data: str or bytes of a JSON document
+        :return: parsed object
+        """
+        if self.module is not json:
+            try:
+                return self.module.loads(data)
+            except (ValueError, TypeError, OverflowError):
+                pass
+        return json.loads(data)
+
+    def load(self, file_location):
+        """
+        Parse a JSON file
+
+        :param file_location: JSON file path
+        :return: parsed object
+        """
+        with open(file_location, 'rb') as f:
+            return self.loads(f.read())
+
+    def dumps(self, obj, compact=False):
+        """
+        Serialize an object to a JSON document
+
+        :param obj: object to serialize
+        :param compact: write without indentation or whitespace
+        :return: str of the JSON document
+        """
+        if compact and self.module is not json:
+            try:
+                if self.name == 'orjson':
+                    json_document = self.module.dumps(obj, option=self.module.OPT_SORT_KEYS).decode('utf-8')
+                elif self.name == 'ujson':
+                    json_document = self.module.dumps(obj, indent=0, sort_keys=True, escape_forward_slashes=False)
+                else:
+                    json_document = self.module.dumps(obj, indent=None, sort_keys=True)
+                if not any(i in json_document for i in non_finite_tokens):
+                    return json_document
+            except (ValueError, TypeError, OverflowError):
+                pass
+        if compact:
+            return json.dumps(obj, separators=(',', ':'), sort_keys=True, allow_nan=False)
+        return json.dumps(obj, indent=4, sort_keys=True, allow_nan=False)
+
+    def iterdumps(self, epjson, compact=False):
+        """
+        Serialize an epJSON object to a JSON document one object at a time.  Object types and object names are written
+        in sorted order, the same as dumps.  The epJSON object may be any mapping of object types to mappings of object
+        names to objects, e.g. an EPJSONLayeredView of several epJSON dictionaries, which is not merged or copied.
+
+        :param epjson: epJSON mapping to serialize
+        :param compact: write without indentation or whitespace
+        :return: generator of str parts of the JSON document
+        """
+        indent = '' if compact else ' ' * 4
+        newline = '' if compact else '\n'
+        key_separator = ':' if compact else ': '
+        if not epjson:
+            yield '{}'
+            return
+        yield '{'
+        for type_idx, object_type in enumerate(sorted(epjson.keys())):
+            object_structure = epjson[object_type]
+            yield ''.join([',' if type_idx else '', newline, indent, self.dumps(object_type), key_separator])
+            if not isinstance(object_structure, Mapping):
+                yield self.dumps(object_structure, compact=compact).replace('\n', newline + indent)
+                continue
+            if not object_structure:
+                yield '{}'
+                continue
+            yield '{'
+            for name_idx, object_name in enumerate(sorted(object_structure.keys())):
+                yield ''.join([
+                    ',' if name_idx else '', newline, indent * 2, self.dumps(object_name), key_separator,
+                    self.dumps(object_structure[object_name], compact=compact).replace('\n', newline + indent * 2)])
+            yield newline + indent + '}'
+        yield newline + '}'
+
+    def dump(self, epjson, file_location, compact=False):
+        """
+        Write an epJSON object to a JSON file one object at a time, see iterdumps
+
+        :param epjson: epJSON mapping to serialize
+        :param file_location: JSON file path
+        :param compact: write without indentation or whitespace
+        :return: None
+        """
+        with open(file_location, 'w', encoding='utf-8') as f:
+            for json_part in self.iterdumps(epjson, compact=compact):
+                f.write(json_part)
+        return
+
+
+def get_json_backend(name=None):
+    """
+    Get the JSONBackend of a JSON library
+
+    :param name: JSON library name, one of json_backend_names.  None uses the first installed library.
+    :return: JSONBackend object
+    """
+    if name is None:
+        name = next(i for i in json_backend_names if importlib.util.find_spec(i))
+    if name not in json_backends:
+        if name not in json_backend_names:
+            raise PyExpandObjectsException('JSON backend is not supported: {}'.format(name))
+        try:
+            json_backends[name] = JSONBackend(name)
+        except ImportError:
+            raise PyExpandObjectsException('JSON backend is not installed: {}'.format(name))
+    return json_backends[name]
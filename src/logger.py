@@ -1,19 +1,103 @@
 import logging
 import os
 import sys
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 from logging.config import fileConfig
 from io import StringIO
 
+
+class MessageStream(StringIO):
+    """
+    Output stream for logged messages.  The messages written by a thread can be captured in a separate buffer, so that
+    operations running at the same time can add their messages to the stream in a fixed order.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._thread_buffers = threading.local()
+        return
+
+    def write(self, s):
+        buffer = getattr(self._thread_buffers, 'buffer', None)
+        if buffer is not None:
+            return buffer.write(s)
+        return super().write(s)
+
+    def __getstate__(self):
+        # The capture buffers belong to the threads of this process, so they are not copied.
+        value, newline, position, state = super().__getstate__()
+        state = {k: v for k, v in (state or {}).items() if k != '_thread_buffers'}
+        return value, newline, position, state
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        self._thread_buffers = threading.local()
+        return
+
+    @contextmanager
+    def capture(self):
+        """
+        Capture the messages written by the current thread
+
+        :return: StringIO buffer of the captured messages
+        """
+        buffer = StringIO()
+        self._thread_buffers.buffer = buffer
+        try:
+            yield buffer
+        finally:
+            self._thread_buffers.buffer = None
+
+
 loggers = {}
-stream = StringIO()
+stream = MessageStream()
+# logging configuration files that have been applied in this process
+configured_logging = set()
+# handler of each logger that writes to the message stream
+stream_handlers = {}
+logging_lock = threading.RLock()
 
 this_script_path = Path(__file__).resolve()
 
 
+def set_stream(new_stream):
+    """
+    Send the messages of all loggers to a new message stream
+
+    :param new_stream: MessageStream object
+    :return: None
+    """
+    global stream
+    with logging_lock:
+        stream = new_stream
+        for handler in stream_handlers.values():
+            handler.setStream(new_stream)
+    return
+
+
+@contextmanager
+def message_stream(run_stream):
+    """
+    Send the messages of all loggers to a stream for the duration of the context, e.g. a run, and then return to the
+    previous stream.  Logger objects created in the context write to the run stream.
+
+    :param run_stream: MessageStream object
+    :return: MessageStream object
+    """
+    previous_stream = stream
+    set_stream(run_stream)
+    try:
+        yield run_stream
+    finally:
+        set_stream(previous_stream)
+
+
 class Logger:
     """
-    General logger
+    General logger.  The logging configuration file is applied once per process and each named logger has one handler
+    for the message stream, so creating a Logger object does not change the cost of logging.
     """
 
     def __init__(
@@ -26,7 +110,6 @@ class Logger:
         # prevent re-calling same logger handlers once initialized
         # also prevent bad logger name from being called
         global loggers
-        global stream
         # noinspection PyBroadException
         # Use a different file for testing logger
         # When packaged, the logs file is under the src/ directorey, so change the directory based on mode
@@ -42,55 +125,75 @@ class Logger:
             logging_dir,
             r'{}.log'.format('test')
         )
-        for log_file in [log_file_location, testing_log_file_location]:
-            if not os.path.isfile(log_file):  # pragma: no cover
-                with open(log_file, 'w'):
-                    pass
-        fileConfig(
-            os.path.join(
-                logging_dir,
-                logging_file_name
-            ),
-            defaults={
-                "base_log_filename": log_file_location,
-                "testing_log_filename": testing_log_file_location
-            }
-        )
-        # if the code fails, fall back to root logger
-        try:
-            # if the logger exists, use it instead of creating a new one
-            if not loggers.get(logger_name):
-                # if logger_name is not in the config file, default to root
-                if logger_name in logging.root.manager.loggerDict.keys():
-                    self.logger = logging.getLogger(logger_name)
-                    self.logger.setLevel(logger_level)
-                else:  # pragma: no cover
-                    self.logger = logging.getLogger('root')
-                    self.logger.setLevel(logger_level)
-                    self.logger.warning(
-                        'Bad logger name passed (%s), continuing with only console logging',
-                        logger_name
-                    )
-                # save logger to global dictionary
+        with logging_lock:
+            logging_configuration = (logging_file_name, log_file_location)
+            if logging_configuration not in configured_logging:
+                for log_file in [log_file_location, testing_log_file_location]:
+                    if not os.path.isfile(log_file):  # pragma: no cover
+                        with open(log_file, 'w'):
+                            pass
+                fileConfig(
+                    os.path.join(
+                        logging_dir,
+                        logging_file_name
+                    ),
+                    defaults={
+                        "base_log_filename": log_file_location,
+                        "testing_log_filename": testing_log_file_location
+                    }
+                )
+                configured_logging.add(logging_configuration)
+            # if the code fails, fall back to root logger
+            try:
+                # if the logger exists, use it instead of creating a new one
+                if not loggers.get(logger_name):
+                    # if logger_name is not in the config file, default to root
+                    if logger_name in logging.root.manager.loggerDict.keys():
+                        self.logger = logging.getLogger(logger_name)
+                        self.logger.setLevel(logger_level)
+                    else:  # pragma: no cover
+                        self.logger = logging.getLogger('root')
+                        self.logger.setLevel(logger_level)
+                        self.logger.warning(
+                            'Bad logger name passed (%s), continuing with only console logging',
+                            logger_name
+                        )
+                    # save logger to global dictionary
+                    loggers.update({logger_name: self.logger})
+                else:
+                    self.logger = loggers[logger_name]
+            except Exception as e:  # pragma: no cover
+                self.logger = logging.getLogger('root')
+                self.logger.setLevel(logger_level)
                 loggers.update({logger_name: self.logger})
-            else:
-                self.logger = loggers[logger_name]
-        except Exception as e:  # pragma: no cover
-            self.logger = logging.getLogger('root')
-            self.logger.setLevel(logger_level)
-            loggers.update({logger_name: self.logger})
-            self.logger.warning(
-                'Logger failed to start %s, continuing with only console logging, error message: %s',
-                logger_name, str(e)
-            )
-        finally:
-            if reset_stream:
-                stream = StringIO()
-            # add stream handler for output
-            self.stream = stream
-            handler = logging.StreamHandler(self.stream)
-            handler.setLevel(logger_level)
-            self.logger.addHandler(handler)
-            self.logger.setLevel(logger_level)
-            self.logger.stream_flush = self.stream.flush()
+                self.logger.warning(
+                    'Logger failed to start %s, continuing with only console logging, error message: %s',
+                    logger_name, str(e)
+                )
+            finally:
+                if reset_stream:
+                    set_stream(MessageStream())
+                # add one stream handler per logger for output.  The handler is added again if the logger was
+                #   reconfigured elsewhere.
+                self.stream = stream
+                handler = stream_handlers.get(self.logger.name)
+                if handler is None:
+                    handler = logging.StreamHandler(self.stream)
+                    stream_handlers[self.logger.name] = handler
+                if handler not in self.logger.handlers:
+                    self.logger.addHandler(handler)
+                handler.setLevel(logger_level)
+                self.logger.setLevel(logger_level)
+                self.logger.stream_flush = self.stream.flush()
+        return
+
+    def __getstate__(self):
+        # The output stream belongs to the process, so it is not copied when an object is sent to another process.
+        state = self.__dict__.copy()
+        state.pop('stream', None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.stream = stream
         return
@@ -4,9 +4,9 @@ import pathlib
 import re
 
 from hvac_template import HVACTemplate
-from epjson_handler import EPJSON
+from epjson_handler import EPJSON, EPJSONLayeredView
+from json_backend import json_backend_names, get_json_backend
 import logging
-import json
 
 
 def get_property(prop):
@@ -74,6 +74,47 @@ def build_parser():  # pragma: no cover
         '-wl',
         action='store_true',
         help='Write logs to file')
+    parser.add_argument(
+        '--processes',
+        '-p',
+        type=int,
+        default=1,
+        help='Number of worker processes used to expand templates.  Default is 1 (serial)')
+    parser.add_argument(
+        '--validation_processes',
+        '-vp',
+        type=int,
+        default=1,
+        help='Number of worker processes used to validate large epJSON files against the schema.  '
+             'Default is 1 (serial)')
+    parser.add_argument(
+        '--full_validation',
+        '-fv',
+        action='store_true',
+        help='Validate all objects of the expanded epJSON file, including the input objects that were not changed')
+    parser.add_argument(
+        '--json_backend',
+        '-jb',
+        nargs='?',
+        choices=json_backend_names,
+        default=None,
+        help='JSON library used to read and write epJSON files.  Default is the fastest installed library')
+    parser.add_argument(
+        '--compact',
+        '-c',
+        action='store_true',
+        help='Write epJSON files without indentation')
+    parser.add_argument(
+        '--stream_output',
+        '-so',
+        action='store_true',
+        help='Write the expanded epJSON file directly from the base and expanded objects, without merging them into '
+             'a new epJSON object in memory')
+    parser.add_argument(
+        '--zone_expansion_cache',
+        '-zc',
+        action='store_true',
+        help='Clone zone templates that differ only in their names from a cached expansion of the first one')
     return parser
 
 
@@ -116,6 +157,21 @@ def main(args=None):
         args.no_backup = False
     if not hasattr(args, 'no_schema'):
         args.no_schema = False
+    if not hasattr(args, 'processes'):
+        args.processes = 1
+    if not hasattr(args, 'validation_processes'):
+        args.validation_processes = 1
+    if not hasattr(args, 'full_validation'):
+        args.full_validation = False
+    if not hasattr(args, 'json_backend'):
+        args.json_backend = None
+    if not hasattr(args, 'compact'):
+        args.compact = False
+    if not hasattr(args, 'stream_output'):
+        args.stream_output = False
+    if not hasattr(args, 'zone_expansion_cache'):
+        args.zone_expansion_cache = False
+    json_backend = get_json_backend(args.json_backend)
     if getattr(args, 'write_logs', None):
         logger_name = 'expand_objects_logger'
     else:
@@ -123,7 +179,12 @@ def main(args=None):
     hvt = HVACTemplate(
         no_schema=args.no_schema,
         logger_level=args.logger_level,
-        logger_name=logger_name)
+        logger_name=logger_name,
+        processes=args.processes,
+        validation_processes=args.validation_processes,
+        json_backend=json_backend.name,
+        merge_output_epjson=not args.stream_output,
+        zone_expansion_cache=args.zone_expansion_cache)
     if isinstance(args.file, str):
         file_suffix_check = args.file.endswith('.epJSON')
     elif isinstance(args.file, (pathlib.PosixPath, pathlib.WindowsPath)):
@@ -175,23 +236,32 @@ def main(args=None):
                     ej = EPJSON(
                         no_schema=False,
                         logger_level=args.logger_level,
-                        logger_name=logger_name)
+                        logger_name=logger_name,
+                        validation_processes=args.validation_processes,
+                        json_backend=json_backend.name)
                     try:
-                        ej.epjson_process(epjson_ref=output['epJSON'])
+                        # input objects that were not changed by the expansion have already been validated
+                        ej.epjson_process(
+                            epjson_ref=output['epJSON'],
+                            validated_epjson=None if args.full_validation else hvt.validated_base_objects)
                     except:  # noqa: E722
                         output['Output:PreprocessorMessage'] = '\n'.join([
                             output['Output:PreprocessorMessage'],
                             'Error: Output epJSON schema validation failed. See output files for details.\n',
                             ej.stream.getvalue()])
             if not args.no_backup and output.get('epJSON_hvac_templates'):
-                with open(os.path.join(output_directory, hvac_templates_file_name), 'w') as hvac_template_file:
-                    json.dump(output['epJSON_hvac_templates'], hvac_template_file, indent=4, sort_keys=True)
-                    output_file_dictionary['hvac_templates'] = \
-                        os.path.join(output_directory, str(hvac_templates_file_name))
+                json_backend.dump(
+                    output['epJSON_hvac_templates'],
+                    os.path.join(output_directory, hvac_templates_file_name),
+                    compact=args.compact)
+                output_file_dictionary['hvac_templates'] = \
+                    os.path.join(output_directory, str(hvac_templates_file_name))
             if not args.no_backup and output.get('epJSON_base'):
-                with open(os.path.join(output_directory, base_file_name), 'w') as base_file:
-                    json.dump(output['epJSON_base'], base_file, indent=4, sort_keys=True)
-                    output_file_dictionary['base'] = os.path.join(output_directory, str(base_file_name))
+                json_backend.dump(
+                    output['epJSON_base'],
+                    os.path.join(output_directory, base_file_name),
+                    compact=args.compact)
+                output_file_dictionary['base'] = os.path.join(output_directory, str(base_file_name))
             if output_file_dictionary and output['epJSON']:
                 output_file_dictionary['expanded'] = os.path.join(output_directory, str(expanded_file_name))
                 hvt.logger.info('Output files written %s', output_file_dictionary)
@@ -209,11 +279,21 @@ def main(args=None):
                 output['Output:PreprocessorMessage'],
                 'Error: File does not exist: {}.  File not processed'.format(args.file)])
             hvt.logger.error('Error: File does not exist: %s.  File not processed', args.file)
-        output['epJSON']['Output:PreprocessorMessage'] = \
-            output_preprocessor_message_formatter(output['Output:PreprocessorMessage'])
+        preprocessor_messages = output_preprocessor_message_formatter(output['Output:PreprocessorMessage'])
+        if isinstance(output['epJSON'], EPJSONLayeredView):
+            # Replace the object type in the read-only view, without merging the layers
+            output['epJSON'] = EPJSONLayeredView(
+                {'Output:PreprocessorMessage': preprocessor_messages},
+                *[layer if 'Output:PreprocessorMessage' not in layer else {
+                    object_type: object_structure for object_type, object_structure in layer.items()
+                    if object_type != 'Output:PreprocessorMessage'} for layer in output['epJSON'].layers])
+        else:
+            output['epJSON']['Output:PreprocessorMessage'] = preprocessor_messages
         # Write out epJSON file.
-        with open(os.path.join(output_directory, expanded_file_name), 'w') as expanded_file:
-            json.dump(output['epJSON'], expanded_file, indent=4, sort_keys=True)
+        json_backend.dump(
+            output['epJSON'],
+            os.path.join(output_directory, expanded_file_name),
+            compact=args.compact)
         # write out successful file creation to base preprocessor object
         if output_file_dictionary and output['epJSON']:
             output['Output:PreprocessorMessage'] = '\n'.join([
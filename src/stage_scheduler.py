@@ -0,0 +1,210 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import contextmanager
+
+
+class Stage:
+    """
+    Step of a workflow with declared inputs and outputs
+
+    Attributes:
+        name: unique stage name
+
+        function: callable that performs the stage, without arguments
+
+        inputs: names of the data read by the stage
+
+        outputs: names of the data created or modified by the stage
+    """
+
+    def __init__(self, name, function, inputs=(), outputs=()):
+        self.name = name
+        self.function = function
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        return
+
+    def __repr__(self):
+        return 'Stage({})'.format(self.name)
+
+
+class StageTiming:
+    """
+    Timing trace entry of a stage
+
+    Attributes:
+        name: stage name
+
+        start: start time in seconds from the start of the scheduler run
+
+        end: end time in seconds from the start of the scheduler run
+
+        thread: name of the thread that ran the stage
+    """
+
+    def __init__(self, name, start, end, thread):
+        self.name = name
+        self.start = start
+        self.end = end
+        self.thread = thread
+        return
+
+    @property
+    def duration(self):
+        return self.end - self.start
+
+    def __repr__(self):
+        return 'StageTiming({}, {:.4f}, {:.4f}, {})'.format(self.name, self.start, self.end, self.thread)
+
+
+class StageScheduler:
+    """
+    Run a list of stages as a dependency graph.  A stage depends on each earlier stage that creates or modifies one of
+    its inputs or outputs, or that reads one of its outputs, so the list order is always a valid serial order.
+
+    With more than one worker, stages whose dependencies are complete run on a thread pool.  Only one stage runs
+    Python code at a time; a stage lets the others run while it waits, e.g. on worker processes, by using released().
+    The messages written by each stage are captured and added to the stream in list order, so the stream is the same as
+    for a serial run.
+
+    Attributes:
+        stages: list of Stage objects
+
+        dependencies: dictionary of stage name to the set of stage names it depends on
+
+        stream: logger.MessageStream that receives the stage messages
+
+        max_workers: number of threads used to run stages.  1 runs the stages in list order in the calling thread.
+
+        timings: list of StageTiming objects for the last run, in order of completion
+
+        results: dictionary of stage name to the value returned by the stage function in the last run
+    """
+
+    def __init__(self, stages, stream, max_workers=1):
+        self.stages = list(stages)
+        self.stream = stream
+        self.max_workers = max_workers or 1
+        self.dependencies = {}
+        for idx, stage in enumerate(self.stages):
+            if stage.name in self.dependencies:
+                raise ValueError('Duplicate stage name: {}'.format(stage.name))
+            # read or write after write, and write after read
+            self.dependencies[stage.name] = {
+                previous_stage.name for previous_stage in self.stages[:idx]
+                if set(previous_stage.outputs).intersection((*stage.inputs, *stage.outputs))}
+            self.dependencies[stage.name].update(
+                previous_stage.name for previous_stage in self.stages[:idx]
+                if set(previous_stage.inputs).intersection(stage.outputs))
+        self.timings = []
+        self.results = {}
+        self._lock = threading.Lock()
+        self._thread_state = threading.local()
+        self._start_time = None
+        return
+
+    @contextmanager
+    def released(self):
+        """
+        Let other stages run while the current stage waits.  Outside of an overlapped run this does nothing.
+        """
+        if getattr(self._thread_state, 'holds_lock', False):
+            self._thread_state.holds_lock = False
+            self._lock.release()
+            try:
+                yield
+            finally:
+                self._lock.acquire()
+                self._thread_state.holds_lock = True
+        else:
+            yield
+
+    def _run_stage(self, stage):
+        """
+        Run a stage function and record its timing
+
+        :param stage: Stage object
+        :return: stage function output
+        """
+        start_time = time.perf_counter() - self._start_time
+        result = stage.function()
+        self.timings.append(StageTiming(
+            name=stage.name,
+            start=start_time,
+            end=time.perf_counter() - self._start_time,
+            thread=threading.current_thread().name))
+        return result
+
+    def _run_captured_stage(self, stage):
+        """
+        Run a stage in a pool thread, capturing its messages
+
+        :param stage: Stage object
+        :return: tuple of captured messages, stage function output, and raised exception (None if passed)
+        """
+        result = None
+        error = None
+        with self._lock:
+            self._thread_state.holds_lock = True
+            try:
+                with self.stream.capture() as buffer:
+                    try:
+                        result = self._run_stage(stage)
+                    except Exception as e:
+                        error = e
+            finally:
+                self._thread_state.holds_lock = False
+        return buffer.getvalue(), result, error
+
+    def run(self):
+        """
+        Run all stages.  If a stage fails, the messages of the stages before it and its own messages are added to the
+        stream, and its exception is raised.  Stages that depend on it, and stages that come after it in the list once
+        its failure is found, are not started.
+
+        :return: dictionary of stage name to the value returned by the stage function
+        """
+        self.timings = []
+        self.results = {}
+        self._start_time = time.perf_counter()
+        if self.max_workers <= 1:
+            for stage in self.stages:
+                self.results[stage.name] = self._run_stage(stage)
+            return self.results
+        futures = {}
+        stop_index = len(self.stages)
+        flush_index = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='stage') as executor:
+            while True:
+                # Stages after the first failed stage are not started
+                for idx, stage in enumerate(self.stages[:stop_index]):
+                    future = futures.get(stage.name)
+                    if future and future.done() and future.result()[2]:
+                        stop_index = idx + 1
+                        break
+                # Add the messages of completed stages in list order
+                while flush_index < stop_index and futures.get(self.stages[flush_index].name) \
+                        and futures[self.stages[flush_index].name].done():
+                    stage = self.stages[flush_index]
+                    messages, result, error = futures[stage.name].result()
+                    self.stream.write(messages)
+                    if error:
+                        raise error
+                    self.results[stage.name] = result
+                    flush_index += 1
+                if flush_index == len(self.stages):
+                    break
+                # Check for failures again while submitting, since a stage may have failed after the scan above.  A
+                #   stage is only submitted when all of its dependencies have passed.
+                for idx, stage in enumerate(self.stages[:stop_index]):
+                    future = futures.get(stage.name)
+                    if future:
+                        if future.done() and future.result()[2]:
+                            stop_index = idx + 1
+                            break
+                    elif all(i in futures and futures[i].done() and futures[i].result()[2] is None
+                             for i in self.dependencies[stage.name]):
+                        futures[stage.name] = executor.submit(self._run_captured_stage, stage)
+                wait([i for i in futures.values() if not i.done()], return_when=FIRST_COMPLETED)
+        return self.results
@@ -0,0 +1,68 @@
+import os
+import sys
+import copy
+import json
+import time
+from functools import wraps
+
+this_script_path = os.path.dirname(
+    os.path.abspath(__file__)
+)
+
+base_project_path = os.path.dirname(os.path.dirname(this_script_path))
+
+example_file_directory = os.path.join(base_project_path, 'simulation', 'ExampleFiles')
+
+sys.path.append(os.path.join(base_project_path, 'src'))
+
+
+def get_example_files():
+    """
+    Get the HVACTemplate example files that are used as benchmark inputs
+
+    :return: list of epJSON file paths
+    """
+    return sorted([
+        os.path.join(example_file_directory, i) for i in os.listdir(example_file_directory)
+        if i.startswith('HVACTemplate') and 'expanded' not in i.lower() and i.endswith('.epJSON')])
+
+
+def timed(func):
+    """
+    Wrapper that returns the function output along with the elapsed wall time in seconds
+
+    :param func: function to time
+    :return: (function output, elapsed seconds)
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        start_time = time.perf_counter()
+        output = func(*args, **kwargs)
+        return output, time.perf_counter() - start_time
+    return wrapper
+
+
+def make_synthetic_epjson(zone_count, file_location=None):
+    """
+    Build an epJSON dictionary with a large number of zone templates by repeating the zone templates of an example
+    file.  Each copy receives a unique template and zone name.
+
+    :param zone_count: number of zone templates in the output
+    :param file_location: example epJSON file to replicate.  Default is the 5 zone VAV water cooled example.
+    :return: epJSON dictionary
+    """
+    file_location = file_location or os.path.join(example_file_directory, 'HVACTemplate-5ZoneVAVWaterCooled.epJSON')
+    with open(file_location, 'r') as f:
+        epjson = json.load(f)
+    zone_templates = [
+        (template_type, template_name, template_fields)
+        for template_type, template_objects in epjson.items() if template_type.startswith('HVACTemplate:Zone:')
+        for template_name, template_fields in template_objects.items()]
+    for template_type, _, _ in zone_templates:
+        epjson[template_type] = {}
+    for idx in range(zone_count):
+        template_type, template_name, template_fields = zone_templates[idx % len(zone_templates)]
+        zone_fields = copy.deepcopy(template_fields)
+        zone_fields['zone_name'] = '{} {}'.format(template_fields['zone_name'], idx)
+        epjson[template_type]['{} {}'.format(template_name, idx)] = zone_fields
+    return epjson
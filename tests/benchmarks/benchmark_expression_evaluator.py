@@ -0,0 +1,87 @@
+"""
+Micro-benchmark for field value expression evaluation.
+
+Every formatted field value that is evaluated while expanding the example files in simulation/ExampleFiles is
+recorded.  The values are then evaluated with eval(), as was done previously, and with evaluate_expression to compare
+timing and results.
+
+Usage: python -m tests.benchmarks.benchmark_expression_evaluator
+"""
+import timeit
+
+import expand_objects
+from hvac_template import HVACTemplate
+from tests.benchmarks import get_example_files
+
+
+def collect_field_values():
+    """
+    Expand the example files and record each value passed to the expression evaluator
+
+    :return: list of (field value, fast_path) tuples
+    """
+    field_values = []
+    evaluate_expression = expand_objects.evaluate_expression
+
+    def recording_evaluate_expression(expression, fast_path=True):
+        field_values.append((expression, fast_path))
+        return evaluate_expression(expression, fast_path=fast_path)
+    expand_objects.evaluate_expression = recording_evaluate_expression
+    try:
+        for file_location in get_example_files():
+            HVACTemplate(no_schema=True, logger_level='ERROR').run(input_epjson=file_location)
+    finally:
+        expand_objects.evaluate_expression = evaluate_expression
+    return field_values
+
+
+def evaluate_with_eval(field_value):
+    try:
+        return eval(field_value)
+    except NameError:
+        return NameError
+    except SyntaxError:
+        return SyntaxError
+
+
+def evaluate_with_evaluator(field_value, fast_path):
+    try:
+        return expand_objects.evaluate_expression(field_value, fast_path=fast_path)
+    except NameError:
+        return NameError
+    except SyntaxError:
+        return SyntaxError
+
+
+def main():
+    field_values = collect_field_values()
+    expression_count = sum(1 for i, _ in field_values if evaluate_with_eval(i) not in (NameError, SyntaxError))
+    print('Field values evaluated: {} ({} unique, {} expressions)'.format(
+        len(field_values), len(set(field_values)), expression_count))
+    mismatches = []
+    for field_value, fast_path in set(field_values):
+        eval_output = evaluate_with_eval(field_value)
+        evaluator_output = evaluate_with_evaluator(field_value, fast_path)
+        # the fast path does not distinguish names from syntax errors, which are handled the same by the caller
+        if fast_path and eval_output in (NameError, SyntaxError) and evaluator_output in (NameError, SyntaxError):
+            continue
+        if eval_output != evaluator_output or type(eval_output) is not type(evaluator_output):
+            mismatches.append((field_value, eval_output, evaluator_output))
+    print('Result mismatches: {}'.format(len(mismatches)))
+    for mismatch in mismatches:
+        print('    {!r}: eval {!r}, evaluator {!r}'.format(*mismatch))
+    repeat = 5
+    eval_time = min(timeit.repeat(
+        lambda: [evaluate_with_eval(i) for i, _ in field_values], number=1, repeat=repeat))
+    expand_objects._parse_expression.cache_clear()
+    evaluator_time = min(timeit.repeat(
+        lambda: [evaluate_with_evaluator(i, j) for i, j in field_values], number=1, repeat=repeat))
+    print('eval(): {:.4f}s ({:.2f} us per value)'.format(eval_time, eval_time / len(field_values) * 1e6))
+    print('evaluate_expression: {:.4f}s ({:.2f} us per value)'.format(
+        evaluator_time, evaluator_time / len(field_values) * 1e6))
+    print('Speedup: {:.1f}x'.format(eval_time / evaluator_time))
+    return
+
+
+if __name__ == "__main__":
+    main()
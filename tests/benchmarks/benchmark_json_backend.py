@@ -0,0 +1,80 @@
+"""
+Benchmark of the JSON libraries used to read and write epJSON files.
+
+Each installed JSON library reads the HVACTemplate example files and a synthetic geometry-heavy model, and writes
+them with indentation and in compact form.  Indented output is always written by the standard library, so only the
+read and compact columns compare the libraries.  The synthetic model is sized so its indented output from the standard
+library is about 50 MB.  The objects written by each library are checked against the standard library output.
+
+Usage: python -m tests.benchmarks.benchmark_json_backend [synthetic_size_mb]
+"""
+import importlib.util
+import os
+import sys
+import tempfile
+
+from tests.benchmarks import timed, get_example_files
+from tests.benchmarks.benchmark_parallel_validation import make_geometry_epjson
+from json_backend import get_json_backend, json_backend_names
+
+
+def make_sized_epjson(size_mb):
+    """
+    Build a synthetic geometry-heavy epJSON dictionary
+
+    :param size_mb: approximate size of the indented standard library output in MB
+    :return: epJSON dictionary
+    """
+    sample_size = len(get_json_backend('json').dumps(make_geometry_epjson(1000)))
+    return make_geometry_epjson(int(size_mb * 1e6 / sample_size * 1000))
+
+
+def time_backend(json_backend, file_locations, output_directory):
+    """
+    Read each file, and write it with indentation and in compact form
+
+    :param json_backend: JSONBackend object
+    :param file_locations: list of epJSON file paths
+    :param output_directory: directory of the written files
+    :return: tuple of read time, indented write time, compact write time, and list of the objects read from the
+        written files
+    """
+    read_time = indented_time = compact_time = 0
+    written_epjson_list = []
+    for file_location in file_locations:
+        epjson, file_read_time = timed(json_backend.load)(file_location)
+        output_location = os.path.join(output_directory, '{}.epJSON'.format(json_backend.name))
+        _, file_indented_time = timed(json_backend.dump)(epjson, output_location)
+        _, file_compact_time = timed(json_backend.dump)(epjson, output_location, compact=True)
+        written_epjson_list.append(get_json_backend('json').load(output_location))
+        read_time += file_read_time
+        indented_time += file_indented_time
+        compact_time += file_compact_time
+    return read_time, indented_time, compact_time, written_epjson_list
+
+
+def main(synthetic_size_mb=50):
+    json_backends = [get_json_backend(i) for i in json_backend_names if importlib.util.find_spec(i)]
+    with tempfile.TemporaryDirectory() as temp_dir:
+        synthetic_file = os.path.join(temp_dir, 'synthetic.epJSON')
+        get_json_backend('json').dump(make_sized_epjson(synthetic_size_mb), synthetic_file)
+        for label, file_locations in [
+                ('ExampleFiles ({} files)'.format(len(get_example_files())), get_example_files()),
+                ('synthetic model ({:.0f} MB)'.format(os.path.getsize(synthetic_file) / 1e6), [synthetic_file])]:
+            print(label)
+            print('{:>12}{:>12}{:>16}{:>16}{:>16}'.format(
+                'backend', 'read (s)', 'indented (s)', 'compact (s)', 'same objects'))
+            reference_epjson_list = None
+            for json_backend in reversed(json_backends):
+                read_time, indented_time, compact_time, written_epjson_list = time_backend(
+                    json_backend, file_locations, temp_dir)
+                # the standard library is timed first, as the reference output
+                reference_epjson_list = reference_epjson_list or written_epjson_list
+                print('{:>12}{:>12.3f}{:>16.3f}{:>16.3f}{:>16}'.format(
+                    json_backend.name, read_time, indented_time, compact_time,
+                    str(written_epjson_list == reference_epjson_list)))
+    return
+
+
+if __name__ == "__main__":
+    main(*[float(i) for i in sys.argv[1:2]])
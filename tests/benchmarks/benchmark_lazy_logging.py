@@ -0,0 +1,70 @@
+"""
+Benchmark for the cost of logging calls below the logger level.
+
+At the default WARNING level, info and debug messages are not written.  The message string of a call that formats its
+message before the call (str.format) is still built, while a call that passes its arguments to the logger (%s) is
+not formatted.  A debug dump of a build path or epJSON fragment is only skipped if it is guarded by a level check.
+Each call pattern is timed for the arguments of a VAV system expansion, followed by the expansion of the system
+template at WARNING level.
+
+Usage: python -m tests.benchmarks.benchmark_lazy_logging [call_count]
+"""
+import json
+import logging
+import sys
+
+from tests.benchmarks import timed
+from tests.benchmarks.benchmark_resolve_objects import vav_system_template
+from expand_objects import ExpandSystem
+
+
+def eager_message(logger, call_count, structure_hierarchy):
+    for _ in range(call_count):
+        logger.info('Processing option tree: {}'.format(structure_hierarchy))
+    return
+
+
+def lazy_message(logger, call_count, structure_hierarchy):
+    for _ in range(call_count):
+        logger.info('Processing option tree: %s', structure_hierarchy)
+    return
+
+
+def unguarded_dump(logger, call_count, build_path):
+    for _ in range(call_count):
+        logger.debug('build path: %s', json.dumps(build_path, indent=4, default=str))
+    return
+
+
+def guarded_dump(logger, call_count, build_path):
+    for _ in range(call_count):
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('build path: %s', json.dumps(build_path, indent=4, default=str))
+    return
+
+
+def expand_systems(template_count):
+    for _ in range(template_count):
+        ExpandSystem(template=vav_system_template, logger_level='WARNING').run()
+    return
+
+
+def main(call_count=10000, template_count=50):
+    system = ExpandSystem(template=vav_system_template, logger_level='WARNING').run()
+    structure_hierarchy = ['HVACTemplate', 'System', 'VAV']
+    print('{:>28}{:>16}'.format('WARNING level call', 'us per call'))
+    for label, function, argument in [
+            ('message, str.format', eager_message, structure_hierarchy),
+            ('message, deferred', lazy_message, structure_hierarchy),
+            ('build path dump, unguarded', unguarded_dump, system.build_path),
+            ('build path dump, guarded', guarded_dump, system.build_path)]:
+        _, call_time = timed(function)(system.logger, call_count, argument)
+        print('{:>28}{:>16.3f}'.format(label, call_time / call_count * 1e6))
+    _, expansion_time = timed(expand_systems)(template_count)
+    print('VAV system expansion at WARNING level: {:.2f} ms per template'.format(
+        expansion_time / template_count * 1e3))
+    return
+
+
+if __name__ == "__main__":
+    main(*[int(i) for i in sys.argv[1:2]])
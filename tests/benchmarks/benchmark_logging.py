@@ -0,0 +1,77 @@
+"""
+Regression benchmark for the cost of logging as templates are expanded.
+
+Template objects are created in batches, as in a run with many zones, and a fixed number of messages is logged after
+each batch.  The logging configuration is applied once per process and each logger keeps one stream handler, so the
+time per object and the time per message should stay constant, and each message should be written to the stream once.
+
+Usage: python -m tests.benchmarks.benchmark_logging [template_count]
+"""
+import sys
+
+from tests.benchmarks import timed
+from expand_objects import ExpandZone
+from logger import Logger
+
+zone_template = {
+    'HVACTemplate:Zone:VAV': {
+        'Zone Template': {
+            'zone_name': 'SPACE1-1',
+            'template_vav_system_name': 'VAV Sys 1',
+            'template_thermostat_name': 'All Zones'
+        }
+    }
+}
+
+
+def create_templates(template_count):
+    """
+    Create template objects, which set up their loggers
+
+    :param template_count: number of objects
+    :return: list of ExpandZone objects
+    """
+    return [ExpandZone(template=zone_template, logger_level='INFO') for _ in range(template_count)]
+
+
+def log_messages(logger, message_count):
+    """
+    Log messages to the message stream
+
+    :param logger: logging.Logger object
+    :param message_count: number of messages
+    :return: None
+    """
+    for idx in range(message_count):
+        logger.info('Benchmark message %s', idx)
+    return
+
+
+def main(template_count=1000, batch_count=4, message_count=1000):
+    stream = Logger(logger_level='INFO', reset_stream=True).stream
+    batch_size = template_count // batch_count
+    template_objects = []
+    print('{:>12}{:>12}{:>18}{:>18}{:>12}'.format(
+        'templates', 'handlers', 'us per template', 'us per message', 'lines'))
+    for batch in range(batch_count + 1):
+        if batch:
+            batch_templates, template_time = timed(create_templates)(batch_size)
+            template_objects.extend(batch_templates)
+        else:
+            template_time = 0
+        logger = Logger(logger_level='INFO').logger
+        # only the message stream is timed, so the console output is turned off
+        for handler in logger.handlers:
+            if getattr(handler, 'stream', None) is sys.stdout:
+                handler.setLevel('WARNING')
+        stream.seek(0)
+        stream.truncate()
+        _, message_time = timed(log_messages)(logger, message_count)
+        print('{:>12}{:>12}{:>18.2f}{:>18.2f}{:>12}'.format(
+            len(template_objects), len(logger.handlers), template_time / batch_size * 1e6 if batch else 0,
+            message_time / message_count * 1e6, len(stream.getvalue().splitlines())))
+    return
+
+
+if __name__ == "__main__":
+    main(*[int(i) for i in sys.argv[1:2]])
@@ -0,0 +1,52 @@
+"""
+Memory benchmark for zone template expansion.
+
+Synthetic buildings with an increasing number of zone templates are expanded in fresh interpreters and the peak
+resident set size is reported.  The expansion structure is shared between all template instances, so the peak should
+grow with the size of the output rather than with a per-template copy of the structure.
+
+Usage: python -m tests.benchmarks.benchmark_memory [zone_count ...]
+"""
+import subprocess
+import sys
+
+from tests.benchmarks import base_project_path
+
+memory_script = """
+import resource
+import sys
+sys.path.insert(0, {project!r})
+from tests.benchmarks import make_synthetic_epjson
+from hvac_template import HVACTemplate
+epjson = make_synthetic_epjson({zone_count})
+baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+output = HVACTemplate(no_schema=True, logger_level='ERROR').run(input_epjson=epjson)
+print(baseline_rss, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, len(output['epJSON']['ZoneHVAC:EquipmentList']))
+"""
+
+
+def run_memory(zone_count):
+    """
+    Expand a synthetic building in a new interpreter
+
+    :param zone_count: number of zone templates
+    :return: (rss before expansion, peak rss, expanded zone count); rss values are in kB
+    """
+    output = subprocess.run(
+        [sys.executable, '-c', memory_script.format(project=base_project_path, zone_count=zone_count)],
+        check=True, capture_output=True, text=True, cwd=base_project_path)
+    baseline_rss, peak_rss, expanded_zones = output.stdout.split()[-3:]
+    return int(baseline_rss), int(peak_rss), int(expanded_zones)
+
+
+def main(zone_counts=(10, 50, 100, 250, 500)):
+    print('{:>8}{:>16}{:>16}{:>16}'.format('zones', 'base rss (MB)', 'peak rss (MB)', 'MB per zone'))
+    for zone_count in zone_counts:
+        baseline_rss, peak_rss, expanded_zones = run_memory(zone_count)
+        print('{:>8}{:>16.1f}{:>16.1f}{:>16.3f}'.format(
+            expanded_zones, baseline_rss / 1024, peak_rss / 1024, (peak_rss - baseline_rss) / 1024 / expanded_zones))
+    return
+
+
+if __name__ == "__main__":
+    main(*[[int(i) for i in sys.argv[1:]]] if len(sys.argv) > 1 else [])
@@ -0,0 +1,86 @@
+"""
+Memory benchmark for writing the expanded epJSON file.
+
+A synthetic building with zone templates and a large number of BuildingSurface:Detailed base objects is expanded and
+the expanded epJSON is written in a fresh interpreter, for each combination of:
+
+    merged: the output epJSON is merged into a new dictionary, which is written with json.dump(indent=4,
+        sort_keys=True) as main did before the streaming writer
+    streamed: the output epJSON is a read-only view of the base objects and the expanded objects, which is written
+        one object at a time by json_backend.JSONBackend.dump
+
+The peak resident set size after the expansion and after writing the file is reported, along with a hash of the file.
+
+Usage: python -m tests.benchmarks.benchmark_output_memory [surface_count]
+"""
+import subprocess
+import sys
+
+from tests.benchmarks import base_project_path
+
+memory_script = """
+import hashlib
+import json
+import os
+import resource
+import sys
+import tempfile
+sys.path.insert(0, {project!r})
+from tests.benchmarks import make_synthetic_epjson
+from tests.benchmarks.benchmark_parallel_validation import make_geometry_epjson
+from hvac_template import HVACTemplate
+from json_backend import get_json_backend
+epjson = make_synthetic_epjson(100)
+epjson['BuildingSurface:Detailed'] = make_geometry_epjson({surface_count})['BuildingSurface:Detailed']
+baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+hvt = HVACTemplate(no_schema=True, logger_level='ERROR', merge_output_epjson={merge_output_epjson})
+output_epjson = hvt.run(input_epjson=epjson)['epJSON']
+del epjson
+expansion_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+with tempfile.TemporaryDirectory() as output_directory:
+    file_location = os.path.join(output_directory, 'expanded.epJSON')
+    if {merge_output_epjson}:
+        with open(file_location, 'w') as f:
+            json.dump(output_epjson, f, indent=4, sort_keys=True)
+    else:
+        get_json_backend('json').dump(output_epjson, file_location)
+    write_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    file_hash = hashlib.sha256()
+    with open(file_location, 'rb') as f:
+        for file_block in iter(lambda: f.read(1 << 20), b''):
+            file_hash.update(file_block)
+print(baseline_rss, expansion_rss, write_rss,
+      sum(len(i) for i in output_epjson.values()), file_hash.hexdigest()[:12])
+"""
+
+
+def run_memory(surface_count, merge_output_epjson):
+    """
+    Expand a synthetic building and write the output in a new interpreter
+
+    :param surface_count: number of BuildingSurface:Detailed objects
+    :param merge_output_epjson: merge the output epJSON into a new dictionary
+    :return: (rss before expansion, peak rss after expansion, peak rss after writing, object count, file hash); rss
+        values are in kB
+    """
+    output = subprocess.run(
+        [sys.executable, '-c', memory_script.format(
+            project=base_project_path, surface_count=surface_count, merge_output_epjson=merge_output_epjson)],
+        check=True, capture_output=True, text=True, cwd=base_project_path)
+    baseline_rss, expansion_rss, write_rss, object_count, file_hash = output.stdout.split()[-5:]
+    return int(baseline_rss), int(expansion_rss), int(write_rss), int(object_count), file_hash
+
+
+def main(surface_count=100000):
+    print('{:>10}{:>10}{:>16}{:>20}{:>18}{:>16}'.format(
+        'output', 'objects', 'base rss (MB)', 'expansion rss (MB)', 'write rss (MB)', 'file hash'))
+    for label, merge_output_epjson in (('merged', True), ('streamed', False)):
+        baseline_rss, expansion_rss, write_rss, object_count, file_hash = run_memory(
+            surface_count, merge_output_epjson)
+        print('{:>10}{:>10}{:>16.1f}{:>20.1f}{:>18.1f}{:>16}'.format(
+            label, object_count, baseline_rss / 1024, expansion_rss / 1024, write_rss / 1024, file_hash))
+    return
+
+
+if __name__ == "__main__":
+    main(*[int(i) for i in sys.argv[1:2]])
@@ -0,0 +1,109 @@
+"""
+Benchmark of parallel schema validation against serial validation.
+
+A synthetic geometry-heavy model is built with a large number of BuildingSurface:Detailed objects, one Zone for every
+6 surfaces, and a few invalid surfaces.  The model is validated in serial and by an increasing number of worker
+processes, and the errors of each parallel run are checked against the serial run.  If the EnergyPlus schema is not
+installed in src/resources, a schema with the same structure for the objects of the model is used.
+
+Usage: python -m tests.benchmarks.benchmark_parallel_validation [surface_count]
+"""
+import os
+import sys
+
+from tests.benchmarks import timed
+from epjson_handler import EPJSON, this_script_path
+
+vertex_schema = {
+    "type": "object",
+    "properties": {
+        "vertex_x_coordinate": {"type": "number"},
+        "vertex_y_coordinate": {"type": "number"},
+        "vertex_z_coordinate": {"type": "number"}},
+    "required": ["vertex_x_coordinate", "vertex_y_coordinate", "vertex_z_coordinate"]}
+
+fallback_schema = {
+    "epJSON_schema_version": "benchmark",
+    "epJSON_schema_build": "benchmark",
+    "properties": {
+        "Building": {
+            "type": "object",
+            "maxProperties": 1,
+            "patternProperties": {".*": {"type": "object"}}},
+        "GlobalGeometryRules": {
+            "type": "object",
+            "maxProperties": 1,
+            "patternProperties": {".*": {"type": "object"}}},
+        "Zone": {
+            "type": "object",
+            "patternProperties": {".*": {
+                "type": "object",
+                "properties": {"multiplier": {"type": "integer", "minimum": 1}}}}},
+        "BuildingSurface:Detailed": {
+            "type": "object",
+            "patternProperties": {".*": {
+                "type": "object",
+                "properties": {
+                    "surface_type": {"type": "string", "enum": ["Ceiling", "Floor", "Roof", "Wall"]},
+                    "construction_name": {"type": "string"},
+                    "zone_name": {"type": "string"},
+                    "outside_boundary_condition": {"type": "string"},
+                    "sun_exposure": {"type": "string", "enum": ["NoSun", "SunExposed"]},
+                    "wind_exposure": {"type": "string", "enum": ["NoWind", "WindExposed"]},
+                    "number_of_vertices": {"type": "number", "minimum": 3},
+                    "vertices": {"type": "array", "items": vertex_schema}},
+                "required": ["surface_type", "construction_name", "zone_name", "outside_boundary_condition"]}}}}}
+
+
+def make_geometry_epjson(surface_count, invalid_surface_interval=1000):
+    """
+    Build an epJSON dictionary with a large number of detailed surfaces
+
+    :param surface_count: number of BuildingSurface:Detailed objects
+    :param invalid_surface_interval: every nth surface has an invalid surface type
+    :return: epJSON dictionary
+    """
+    epjson = {
+        "Building": {"Building": {"north_axis": 0}},
+        "GlobalGeometryRules": {"GlobalGeometryRules 1": {
+            "coordinate_system": "Relative",
+            "starting_vertex_position": "UpperLeftCorner",
+            "vertex_entry_direction": "Counterclockwise"}},
+        "Zone": {"Zone {}".format(i): {"multiplier": 1} for i in range(-(-surface_count // 6))},
+        "BuildingSurface:Detailed": {}}
+    for idx in range(surface_count):
+        epjson["BuildingSurface:Detailed"]["Surface {}".format(idx)] = {
+            "surface_type": "Bad" if idx % invalid_surface_interval == invalid_surface_interval - 1 else "Wall",
+            "construction_name": "Exterior Wall",
+            "zone_name": "Zone {}".format(idx // 6),
+            "outside_boundary_condition": "Outdoors",
+            "sun_exposure": "SunExposed",
+            "wind_exposure": "WindExposed",
+            "number_of_vertices": 4,
+            "vertices": [
+                {"vertex_x_coordinate": x, "vertex_y_coordinate": float(idx), "vertex_z_coordinate": z}
+                for x, z in ((0.0, 3.0), (0.0, 0.0), (10.0, 0.0), (10.0, 3.0))]}
+    return epjson
+
+
+def main(surface_count=40000, process_counts=(2, 4)):
+    default_schema_file = str(this_script_path.parent / 'resources' / 'Energy+.schema.epJSON')
+    schema_ref = default_schema_file if os.path.isfile(default_schema_file) else fallback_schema
+    epjson = make_geometry_epjson(surface_count)
+    epjson_handler = EPJSON(logger_level='ERROR')
+    epjson_handler._load_schema(schema_ref)
+    serial_errors, serial_time = timed(epjson_handler._get_epjson_errors)(epjson)
+    print('schema: {}'.format('EnergyPlus' if schema_ref is default_schema_file else 'benchmark fallback'))
+    print('{:>12}{:>12}{:>12}{:>12}{:>16}'.format('processes', 'time (s)', 'speedup', 'errors', 'same as serial'))
+    print('{:>12}{:>12.3f}{:>12.2f}{:>12}{:>16}'.format(1, serial_time, 1, len(serial_errors), 'True'))
+    for process_count in process_counts:
+        epjson_handler.validation_processes = process_count
+        parallel_errors, parallel_time = timed(epjson_handler._get_epjson_errors)(epjson)
+        print('{:>12}{:>12.3f}{:>12.2f}{:>12}{:>16}'.format(
+            process_count, parallel_time, serial_time / parallel_time, len(parallel_errors),
+            str(parallel_errors == serial_errors)))
+    return
+
+
+if __name__ == "__main__":
+    main(*[int(i) for i in sys.argv[1:2]])
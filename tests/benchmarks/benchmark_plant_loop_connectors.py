@@ -0,0 +1,73 @@
+"""
+Scaling benchmark for plant loop connector construction.
+
+A hot water loop is connected to an increasing number of zone reheat coil branches on the demand side, with one boiler
+branch for every 10 demand branches on the supply side.  The BranchList, Connector:Splitter, Connector:Mixer, and
+NodeList objects are built and resolved.  The time per demand branch should stay constant.
+
+Usage: python -m tests.benchmarks.benchmark_plant_loop_connectors
+"""
+from types import SimpleNamespace
+
+from hvac_template import HVACTemplate, WaterLoopBranchRegistry
+from . import timed
+
+
+def make_water_loop_branches(demand_branch_count):
+    """
+    Create a registry of hot water loop branches
+
+    :param demand_branch_count: number of zone reheat coil branches
+    :return: WaterLoopBranchRegistry
+    """
+    expanded_zones = {
+        'Zone {}'.format(idx): SimpleNamespace(epjson={'Branch': {
+            'Zone {} Reheat Coil HW Branch'.format(idx): {
+                'components': [{
+                    'component_inlet_node_name': 'Zone {} Reheat Coil HW Inlet'.format(idx),
+                    'component_name': 'Zone {} Reheat Coil'.format(idx),
+                    'component_object_type': 'Coil:Heating:Water',
+                    'component_outlet_node_name': 'Zone {} Reheat Coil HW Outlet'.format(idx)}]}}})
+        for idx in range(demand_branch_count)}
+    expanded_plant_equipment = {
+        'Boiler {}'.format(idx): SimpleNamespace(
+            template_type='HVACTemplate:Plant:Boiler',
+            template_plant_loop_type='HotWater',
+            epjson={'Branch': {
+                'Boiler {} HW Branch'.format(idx): {
+                    'components': [{
+                        'component_inlet_node_name': 'Boiler {} HW Inlet'.format(idx),
+                        'component_name': 'Boiler {}'.format(idx),
+                        'component_object_type': 'Boiler:HotWater',
+                        'component_outlet_node_name': 'Boiler {} HW Outlet'.format(idx)}]}}})
+        for idx in range(max(1, demand_branch_count // 10))}
+    water_loop_branches = WaterLoopBranchRegistry()
+    water_loop_branches.add_zone_system_branches(expanded_objects=expanded_zones, template_group='zones')
+    water_loop_branches.add_plant_equipment_branches(expanded_plant_equipment=expanded_plant_equipment)
+    return water_loop_branches
+
+
+def main(demand_branch_counts=(10, 100, 500, 1000, 2500, 5000)):
+    plant_loop = SimpleNamespace(template_name='Hot Water Loop', template_type='HVACTemplate:Plant:HotWaterLoop')
+    # load the expansion structure before timing
+    HVACTemplate(no_schema=True, logger_level='ERROR')._create_water_loop_connectors_and_nodelist(
+        plant_loop_class_object=plant_loop,
+        expanded_plant_equipment={},
+        water_loop_branches=make_water_loop_branches(1))
+    print('{:>16}{:>16}{:>14}{:>20}'.format('demand branches', 'supply branches', 'time (s)', 'us per branch'))
+    for demand_branch_count in demand_branch_counts:
+        water_loop_branches = make_water_loop_branches(demand_branch_count)
+        hvac_template = HVACTemplate(no_schema=True, logger_level='ERROR')
+        _, connector_time = timed(hvac_template._create_water_loop_connectors_and_nodelist)(
+            plant_loop_class_object=plant_loop,
+            expanded_plant_equipment={},
+            water_loop_branches=water_loop_branches)
+        supply_branch_count = len(water_loop_branches.get_branches(loop_type='HotWaterLoop', loop_side='Supply'))
+        print('{:>16}{:>16}{:>14.4f}{:>20.2f}'.format(
+            demand_branch_count, supply_branch_count, connector_time,
+            connector_time / (demand_branch_count + supply_branch_count) * 1e6))
+    return
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Scaling benchmark for complex input resolution.
+
+The objects of a VAV system with all options enabled are resolved against reference epJSON dictionaries padded with
+an increasing number of additional object types, as found in a large building model.  Each padding object is also
+resolved and has complex inputs that reference the system objects, so the number of fields and references grows with
+the number of object types.  The time per resolved field should stay constant.
+
+Usage: python -m tests.benchmarks.benchmark_resolve_objects
+"""
+import copy
+import time
+
+from expand_objects import ExpandSystem
+
+vav_system_template = {
+    'HVACTemplate:System:VAV': {
+        'VAV Sys 1': {
+            'cooling_coil_type': 'ChilledWater',
+            'dehumidification_control_type': 'CoolReheat',
+            'economizer_type': 'DifferentialDryBulb',
+            'heat_recovery_type': 'Enthalpy',
+            'heating_coil_type': 'HotWater',
+            'humidifier_type': 'ElectricSteam',
+            'night_cycle_control': 'CycleOnAny',
+            'preheat_coil_type': 'HotWater',
+            'return_fan': 'Yes',
+            'supply_fan_part_load_power_coefficients': 'InletVaneDampers',
+            'supply_fan_placement': 'DrawThrough',
+            'cooling_coil_setpoint_reset_type': 'OutdoorAirTemperatureReset',
+            'heating_coil_setpoint_reset_type': 'OutdoorAirTemperatureReset'
+        }
+    }
+}
+
+
+def make_padding_epjson(object_type_count):
+    """
+    Create object types that are not referenced by the system objects.  Each object references system objects with
+    the same patterns used in the expansion structure.
+
+    :param object_type_count: number of object types
+    :return: epJSON dictionary
+    """
+    return {
+        'Padding:Object{}'.format(idx): {
+            'Padding Object {}'.format(idx): {
+                'field_1': 'Padding Node {}'.format(idx),
+                'field_2': 0.5,
+                'field_3': 'Autosize',
+                'field_4': {'OutdoorAir:Mixer': 'key'},
+                'field_5': {'Coil:Cooling:Water': 'self'}}}
+        for idx in range(object_type_count)}
+
+
+def main(object_type_counts=(0, 250, 500, 1000, 2000, 4000)):
+    system = ExpandSystem(template=vav_system_template, logger_level='ERROR')
+    system.unique_name = system.template_name
+    option_tree_objects = system._get_option_tree_objects(structure_hierarchy=['HVACTemplate', 'System', 'VAV'])
+    option_tree_objects.pop('DummyObject', None)
+    print('{:>14}{:>10}{:>14}{:>18}'.format('object types', 'fields', 'time (s)', 'us per field'))
+    for object_type_count in object_type_counts:
+        epjson = copy.deepcopy(option_tree_objects)
+        epjson.update(make_padding_epjson(object_type_count))
+        field_count = sum(len(j) for i in epjson.values() for j in i.values())
+        start_time = time.perf_counter()
+        system.resolve_objects(epjson)
+        resolve_time = time.perf_counter() - start_time
+        print('{:>14}{:>10}{:>14.4f}{:>18.2f}'.format(
+            len(epjson), field_count, resolve_time, resolve_time / field_count * 1e6))
+    return
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Cold-start benchmark for loading the template expansion structure.
+
+Each example file in simulation/ExampleFiles is expanded in a fresh interpreter, once with the precompiled
+expansion structure artifact removed (yaml parse) and once with a current artifact.
+
+Usage: python -m tests.benchmarks.benchmark_yaml_cold_start
+"""
+import os
+import subprocess
+import sys
+
+from tests.benchmarks import base_project_path, get_example_files
+
+expansion_structure_location = os.path.join(
+    base_project_path, 'src', 'resources', 'template_expansion_structures.yaml')
+cache_location = expansion_structure_location + '.pickle'
+
+cold_start_script = """
+import sys
+import time
+start_time = time.perf_counter()
+sys.path.append({src!r})
+from expand_objects import ExpandObjects
+ExpandObjects()
+structure_time = time.perf_counter() - start_time
+from hvac_template import HVACTemplate
+HVACTemplate(no_schema=True, logger_level='ERROR').run(input_epjson={file!r})
+print(structure_time, time.perf_counter() - start_time)
+"""
+
+
+def run_cold_start(file_location):
+    """
+    Expand a file in a new interpreter
+
+    :param file_location: epJSON file path
+    :return: (structure load seconds, total seconds)
+    """
+    output = subprocess.run(
+        [sys.executable, '-c', cold_start_script.format(
+            src=os.path.join(base_project_path, 'src'), file=file_location)],
+        check=True, capture_output=True, text=True)
+    structure_time, total_time = output.stdout.split()[-2:]
+    return float(structure_time), float(total_time)
+
+
+def main():
+    results = {}
+    for file_location in get_example_files():
+        if os.path.isfile(cache_location):
+            os.remove(cache_location)
+        yaml_times = run_cold_start(file_location)
+        # the previous run wrote the artifact
+        cache_times = run_cold_start(file_location)
+        results[os.path.basename(file_location)] = (yaml_times, cache_times)
+    print('{:<55}{:>12}{:>12}{:>12}{:>12}'.format('file', 'yaml load', 'cache load', 'yaml total', 'cache total'))
+    for file_name, ((yaml_load, yaml_total), (cache_load, cache_total)) in results.items():
+        print('{:<55}{:>12.3f}{:>12.3f}{:>12.3f}{:>12.3f}'.format(
+            file_name, yaml_load, cache_load, yaml_total, cache_total))
+    yaml_load = sum(i[0][0] for i in results.values()) / len(results)
+    cache_load = sum(i[1][0] for i in results.values()) / len(results)
+    print('Mean structure load time: yaml {:.3f}s, precompiled {:.3f}s ({:.1f}x)'.format(
+        yaml_load, cache_load, yaml_load / cache_load))
+    return
+
+
+if __name__ == "__main__":
+    main()
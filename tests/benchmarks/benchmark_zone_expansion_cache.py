@@ -0,0 +1,51 @@
+"""
+Throughput benchmark for the zone expansion cache.
+
+The zone templates of a synthetic building differ only in their names, so all but the first zone of each template
+signature are cloned from a cached expansion.  The zone expansion stage and the full run are timed with and without
+the cache, and the outputs are checked to be identical.
+
+Usage: python -m tests.benchmarks.benchmark_zone_expansion_cache [zone_count ...]
+"""
+import json
+import sys
+
+from tests.benchmarks import make_synthetic_epjson, timed
+from hvac_template import HVACTemplate
+from expand_objects import ExpandZone, ExpansionCache
+
+
+def run_zone_expansion(hvac_template, zone_expansion_cache):
+    """
+    Expand the zone templates of a processed HVACTemplate object again
+
+    :param hvac_template: HVACTemplate object after run()
+    :param zone_expansion_cache: Boolean flag for the zone expansion cache
+    :return: dictionary of expanded zones
+    """
+    return hvac_template._expand_templates(
+        templates=hvac_template.templates_zones,
+        expand_class=ExpandZone,
+        expansion_cache=ExpansionCache(expand_class=ExpandZone) if zone_expansion_cache else None,
+        system_class_objects=hvac_template.expanded_systems)
+
+
+def main(zone_counts=(100, 500, 2000)):
+    print('{:>8}{:>12}{:>14}{:>14}{:>14}{:>14}{:>10}'.format(
+        'zones', 'cache', 'zones (s)', 'zones per s', 'run (s)', 'cache hits', 'same'))
+    for zone_count in zone_counts:
+        outputs = []
+        for zone_expansion_cache in (False, True):
+            hvac_template = HVACTemplate(
+                no_schema=True, logger_level='ERROR', zone_expansion_cache=zone_expansion_cache)
+            output, run_time = timed(hvac_template.run)(input_epjson=make_synthetic_epjson(zone_count))
+            outputs.append(json.dumps(output['epJSON']))
+            _, zone_time = timed(run_zone_expansion)(hvac_template, zone_expansion_cache)
+            print('{:>8}{:>12}{:>14.2f}{:>14.0f}{:>14.2f}{:>14}{:>10}'.format(
+                zone_count, 'on' if zone_expansion_cache else 'off', zone_time, zone_count / zone_time, run_time,
+                hvac_template.zone_expansion_cache_hits, str(outputs[0] == outputs[-1])))
+    return
+
+
+if __name__ == "__main__":
+    main(*[[int(i) for i in sys.argv[1:]]] if len(sys.argv) > 1 else [])
@@ -1,9 +1,14 @@
 from pathlib import Path
 import unittest
+from unittest.mock import patch
 import tempfile
+import json
+from concurrent.futures import ProcessPoolExecutor
+import jsonschema
 
 from . import BaseTest
-from src.epjson_handler import EPJSON
+from src.epjson_handler import EPJSON, EPJSONObjectTypeIndex, EPJSONLayeredView, copy_object_fields, \
+    load_schema_file
 # must import exceptions directly from test code
 from src.epjson_handler import UniqueNameException, PyExpandObjectsTypeError, \
     PyExpandObjectsFileNotFoundError, PyExpandObjectsSchemaError, InvalidEpJSONException
@@ -25,6 +30,39 @@ minimum_objects_d = {
 
 test_dir = Path(__file__).parent
 
+mock_schema = {
+    "epJSON_schema_version": "9.9.0",
+    "epJSON_schema_build": "test",
+    "properties": {
+        "Building": {
+            "type": "object",
+            "maxProperties": 1
+        },
+        "GlobalGeometryRules": {
+            "type": "object"
+        },
+        "Zone": {
+            "type": "object",
+            "patternProperties": {
+                ".*": {
+                    "type": "object",
+                    "properties": {
+                        "multiplier": {
+                            "$ref": "#/definitions/integer_field"
+                        }
+                    }
+                }
+            }
+        }
+    },
+    "additionalProperties": False,
+    "definitions": {
+        "integer_field": {
+            "type": "integer"
+        }
+    }
+}
+
 
 class TestEPJSONHandler(BaseTest, unittest.TestCase):
     def setUp(self):
@@ -380,6 +418,130 @@ class TestEPJSONHandler(BaseTest, unittest.TestCase):
             self.epjson_handler._validate_schema({"properties": {"id": "asdf"}})
         return
 
+    def test_schema_file_precompiled_is_trusted(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            schema_file = Path(temp_dir) / 'test.schema.epJSON'
+            with open(schema_file, 'w') as f:
+                json.dump(mock_schema, f)
+            schema_hash, schema, trusted = load_schema_file(schema_file)
+            self.assertEqual(mock_schema, schema)
+            self.assertFalse(trusted)
+            self.assertFalse(Path(str(schema_file) + '.pickle').is_file())
+            self.epjson_handler._load_schema(str(schema_file))
+            self.assertTrue(Path(str(schema_file) + '.pickle').is_file())
+            self.assertEqual((schema_hash, mock_schema, True), load_schema_file(schema_file))
+            # a changed schema file is parsed again
+            with open(schema_file, 'w') as f:
+                json.dump({**mock_schema, "epJSON_schema_build": "changed"}, f)
+            _, schema, trusted = load_schema_file(schema_file)
+            self.assertEqual('changed', schema['epJSON_schema_build'])
+            self.assertFalse(trusted)
+        return
+
+    def test_schema_file_validator_shared(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            schema_file = str(Path(temp_dir) / 'test.schema.epJSON')
+            with open(schema_file, 'w') as f:
+                json.dump(mock_schema, f)
+            with patch.object(jsonschema.Draft4Validator, 'check_schema') as check_schema:
+                self.epjson_handler._load_schema(schema_file)
+                output_epjson_handler = EPJSON()
+                output_epjson_handler._load_schema(schema_file)
+            self.assertEqual(1, check_schema.call_count)
+            self.assertIs(self.epjson_handler.schema, output_epjson_handler.schema)
+            self.assertTrue(output_epjson_handler.schema_is_valid)
+            self.assertIsNotNone(output_epjson_handler.schema_load_time)
+        return
+
+    def test_epjson_errors_attributed_by_object(self):
+        self.epjson_handler._load_schema(mock_schema)
+        epjson_errors = self.epjson_handler._get_epjson_errors({
+            "Building": {"Building 1": {}, "Building 2": {}},
+            "GlobalGeometryRules": {"GlobalGeometryRules 1": {}},
+            "Zone": {
+                "Zone 1": {"multiplier": "a"},
+                "Zone 2": {"multiplier": 1},
+                "Zone 3": {"multiplier": "b"}},
+            "Bad:Object": {"Bad Object 1": {}}})
+        self.assertEqual(
+            [('Building', None), ('Zone', 'Zone 1'), ('Zone', 'Zone 3'), ('Bad:Object', None)],
+            [(object_type, object_name) for object_type, object_name, _ in epjson_errors])
+        self.assertIn("'a' is not of type 'integer'", epjson_errors[1][2])
+        return
+
+    def test_epjson_validated_in_one_pass(self):
+        self.epjson_handler._load_schema(mock_schema)
+        epjson = {
+            **minimum_objects_d,
+            "Zone": {
+                "Zone 1": {"multiplier": "a"},
+                "Zone 2": {"multiplier": "b"}}}
+        with patch.object(self.epjson_handler.schema, 'iter_errors') as full_schema_iter_errors:
+            with self.assertRaisesRegex(PyExpandObjectsSchemaError, 'Schema Format is invalid'):
+                self.epjson_handler._validate_epjson(epjson)
+        full_schema_iter_errors.assert_not_called()
+        self.assertRegex(self.epjson_handler.stream.getvalue(), r'Invalid choice in Zone \(Zone 2\)')
+        return
+
+    def test_validation_tasks_split_large_object_types(self):
+        self.epjson_handler._load_schema(mock_schema)
+        epjson = {
+            "Building": {"Building {}".format(i): {} for i in range(3)},
+            "GlobalGeometryRules": {"GlobalGeometryRules 1": {}},
+            "Zone": {"Zone {}".format(i): {} for i in range(7)}}
+        task_lists = self.epjson_handler._get_validation_tasks(
+            epjson=epjson,
+            required_objects={},
+            chunk_size=2)
+        # Building has a maximum number of objects, so it is not split
+        self.assertEqual(
+            [[('Building', 3)], [('GlobalGeometryRules', 1), ('Zone', 2)], [('Zone', 2)], [('Zone', 2)], [('Zone', 1)]],
+            [[(object_type, len(object_structure)) for object_type, object_structure, _ in i] for i in task_lists])
+        return
+
+    def test_parallel_validation_errors_match_serial(self):
+        epjson = {
+            "Building": {"Building 1": {}, "Building 2": {}},
+            "GlobalGeometryRules": {"GlobalGeometryRules 1": {}},
+            "Zone": {"Zone {}".format(i): {"multiplier": i if i % 7 else str(i)} for i in range(50)},
+            "Bad:Object": {"Bad Object 1": {}}}
+        self.epjson_handler._load_schema(mock_schema)
+        serial_errors = self.epjson_handler._get_epjson_errors(epjson)
+        parallel_epjson_handler = EPJSON(validation_processes=2)
+        parallel_epjson_handler._load_schema(mock_schema)
+        with patch('src.epjson_handler.parallel_validation_minimum_objects', 10), \
+                patch('src.epjson_handler.ProcessPoolExecutor', wraps=ProcessPoolExecutor) as process_pool:
+            parallel_errors = parallel_epjson_handler._get_epjson_errors(epjson)
+        self.assertEqual(1, process_pool.call_count)
+        self.assertEqual(10, len(serial_errors))
+        self.assertEqual(serial_errors, parallel_errors)
+        return
+
+    def test_validated_objects_not_validated_again(self):
+        self.epjson_handler._load_schema(mock_schema)
+        input_epjson = {
+            "Building": {"Building 1": {}},
+            "GlobalGeometryRules": {"GlobalGeometryRules 1": {}},
+            "Zone": {"Zone {}".format(i): {"multiplier": 1} for i in range(3)}}
+        # an unchanged object is skipped, and a replaced or new object is validated
+        output_epjson = {
+            "Building": {**input_epjson["Building"], "Building 2": {}},
+            "GlobalGeometryRules": input_epjson["GlobalGeometryRules"],
+            "Zone": {**input_epjson["Zone"], "Zone 1": {"multiplier": "a"}, "Zone 3": {"multiplier": "b"}}}
+        unvalidated_epjson = self.epjson_handler._get_unvalidated_objects(
+            epjson=output_epjson,
+            validated_epjson=input_epjson)
+        self.assertEqual(['Building', 'Zone'], list(unvalidated_epjson.keys()))
+        # Building has a maximum number of objects, so all of its objects are validated
+        self.assertEqual(['Building 1', 'Building 2'], list(unvalidated_epjson['Building'].keys()))
+        self.assertEqual(['Zone 1', 'Zone 3'], list(unvalidated_epjson['Zone'].keys()))
+        with self.assertRaisesRegex(PyExpandObjectsSchemaError, 'Schema Format is invalid'):
+            self.epjson_handler._validate_epjson(output_epjson, validated_epjson=input_epjson)
+        self.assertEqual(
+            [('Building', None), ('Zone', 'Zone 1'), ('Zone', 'Zone 3')],
+            [i[:2] for i in self.epjson_handler._get_epjson_errors(output_epjson, validated_epjson=input_epjson)])
+        return
+
     def test_good_object_is_valid(self):
         self.epjson_handler.epjson_process(
             epjson_ref={
@@ -519,3 +681,78 @@ class TestEPJSONHandler(BaseTest, unittest.TestCase):
                 object_type_regexp='^Z.*',
                 object_name_regexp='^Space2.*')
         return
+
+    def test_object_type_index(self):
+        epjson = {
+            'Fan:VariableVolume': {'Fan 1': {}},
+            'Coil:Cooling:Water': {'Coil 1': {}},
+            'Fan:ConstantVolume': {'Fan 2': {}}}
+        object_type_index = EPJSONObjectTypeIndex(epjson)
+        self.assertEqual(['Fan:VariableVolume', 'Fan:ConstantVolume'], object_type_index.get_object_types('Fan:.*'))
+        self.assertEqual(['Coil:Cooling:Water'], object_type_index.get_object_types('Coil'))
+        self.assertEqual([], object_type_index.get_object_types('Zone'))
+        # stored matches are reset when an object type is added
+        epjson['Fan:OnOff'] = {'Fan 3': {}}
+        self.assertEqual(
+            ['Fan:VariableVolume', 'Fan:ConstantVolume', 'Fan:OnOff'],
+            object_type_index.get_object_types('Fan:.*'))
+        # and when an object type is replaced by another without changing the count
+        epjson.pop('Coil:Cooling:Water')
+        epjson['Coil:Heating:Water'] = {'Coil 2': {}}
+        self.assertEqual(['Coil:Heating:Water'], object_type_index.get_object_types('Coil'))
+        return
+
+    def test_layered_view_matches_merge(self):
+        base_epjson = {
+            'Zone': {'Zone 1': {'floor_area': 10}},
+            'Schedule:Compact': {'HVACTemplate-Always1': {'field_1': 'Base'}}}
+        new_epjson = {
+            'Fan:VariableVolume': {'Fan 1': {'air_inlet_node_name': 'Inlet'}},
+            'Zone': {'Zone 2': {'floor_area': 20}},
+            'Schedule:Compact': {'HVACTemplate-Always1': {'field_1': 'New'}}}
+        epjson_view = EPJSONLayeredView(base_epjson, new_epjson)
+        self.assertEqual(['Zone', 'Schedule:Compact', 'Fan:VariableVolume'], list(epjson_view))
+        self.assertEqual(3, len(epjson_view))
+        self.assertEqual(['Zone 1', 'Zone 2'], list(epjson_view['Zone'].keys()))
+        # the base layer takes precedence on duplicate names, the same as merge_epjson skipping them
+        self.assertEqual('Base', epjson_view['Schedule:Compact']['HVACTemplate-Always1']['field_1'])
+        self.assertNotIn('Coil:Cooling:Water', epjson_view)
+        # layers are not copied
+        self.assertIs(base_epjson['Zone']['Zone 1'], epjson_view['Zone']['Zone 1'])
+        base_epjson['Coil:Cooling:Water'] = {'Coil 1': {}}
+        self.assertIn('Coil:Cooling:Water', epjson_view)
+        self.assertEqual(4, len(epjson_view))
+        return
+
+    def test_layered_view_truth_value(self):
+        self.assertFalse(EPJSONLayeredView())
+        self.assertFalse(EPJSONLayeredView({}, {}))
+        self.assertTrue(EPJSONLayeredView({}, {'Zone': {'Zone 1': {}}}))
+        return
+
+    def test_layered_view_is_read_only(self):
+        epjson_view = EPJSONLayeredView({'Zone': {'Zone 1': {}}})
+        with self.assertRaises(TypeError):
+            epjson_view['Zone']['Zone 2'] = {}
+        with self.assertRaises(TypeError):
+            epjson_view['Zone'] = {}
+        return
+
+    def test_get_epjson_objects_from_layered_view(self):
+        epjson_view = EPJSONLayeredView(
+            {'Zone': {'Space1-1': {}}, 'Fan:VariableVolume': {'Fan 1': {}}},
+            {'Zone': {'Space2-1': {}}})
+        output = self.epjson_handler.get_epjson_objects(
+            epjson=epjson_view,
+            object_type_regexp='^Z.*',
+            object_name_regexp='^Space2.*')
+        self.assertEqual({'Zone': {'Space2-1': {}}}, output)
+        return
+
+    def test_copy_object_fields(self):
+        epjson = {'Zone': {'Zone 1': {'floor_area': 10, 'nested': [{'a': 1}]}}}
+        output = copy_object_fields(epjson)
+        self.assertEqual(epjson, output)
+        self.assertIsNot(epjson['Zone']['Zone 1'], output['Zone']['Zone 1'])
+        self.assertIs(epjson['Zone']['Zone 1']['nested'], output['Zone']['Zone 1']['nested'])
+        return
@@ -1,8 +1,15 @@
 import unittest
 import os
 import re
+import tempfile
+import pickle
+import copy
+import json
+import logging
+from unittest.mock import MagicMock, patch
 
-from src.expand_objects import ExpandObjects
+from src.expand_objects import ExpandObjects, ExpansionStructureIndex, load_expansion_structure, evaluate_expression
+from src.expand_objects import ExpandZone, ExpansionCache, ExpansionWarningCounter, ExpandObjectsHelper
 from src.expand_objects import InvalidTemplateException, PyExpandObjectsTypeError
 from . import BaseTest
 
@@ -75,6 +82,118 @@ class TestExpandObjects(BaseTest, unittest.TestCase):
             ExpandObjects(template=mock_template, expansion_structure=expansion_dictionary)
         return
 
+    def test_expansion_structure_cache_created_and_reused(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            yaml_location = os.path.join(tmp_dir, 'structure.yaml')
+            with open(yaml_location, 'w') as f:
+                f.write('test: val\n')
+            structure = load_expansion_structure(yaml_location)
+            self.assertEqual({'test': 'val'}, structure)
+            self.assertTrue(os.path.isfile(yaml_location + '.pickle'))
+            # overwrite the artifact contents while keeping the hash to verify the artifact is what gets loaded
+            with open(yaml_location + '.pickle', 'rb') as f:
+                yaml_hash, _ = pickle.load(f)
+            with open(yaml_location + '.pickle', 'wb') as f:
+                pickle.dump((yaml_hash, {'test': 'cached'}), f)
+            self.assertEqual({'test': 'cached'}, load_expansion_structure(yaml_location))
+        return
+
+    def test_expansion_structure_cache_stale_hash_reloads_yaml(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            yaml_location = os.path.join(tmp_dir, 'structure.yaml')
+            with open(yaml_location, 'w') as f:
+                f.write('test: val\n')
+            load_expansion_structure(yaml_location)
+            with open(yaml_location, 'w') as f:
+                f.write('test: new_val\n')
+            self.assertEqual({'test': 'new_val'}, load_expansion_structure(yaml_location))
+            # corrupt artifact falls back to yaml
+            with open(yaml_location + '.pickle', 'wb') as f:
+                f.write(b'bad artifact')
+            self.assertEqual({'test': 'new_val'}, load_expansion_structure(yaml_location))
+        return
+
+    def test_expansion_structure_shared_between_instances(self):
+        eo_1 = ExpandObjects(template=mock_template)
+        eo_2 = ExpandObjects(template=mock_zone_template)
+        self.assertIs(eo_1.expansion_structure, eo_2.expansion_structure)
+        structure = eo_1.get_structure(structure_hierarchy=['Objects', 'Common', 'Objects', 'Schedule', 'Compact', 'ALWAYS_VAL'])
+        structure['name'] = 'modified'
+        self.assertNotEqual(
+            'modified',
+            eo_2.expansion_structure['Objects']['Common']['Objects']['Schedule']['Compact']['ALWAYS_VAL']['name'])
+        return
+
+    def test_expansion_structure_index_lookup(self):
+        expansion_structure = {
+            'AutoCreated': {'PlantLoop': {'Connector': {'Mixer': {'Supply': {'name': 'test_name'}}}}},
+            'TemplateObjects': {
+                'test_field': {
+                    'None': {'Objects': 'none_option'},
+                    'AnyNumber': {'Objects': 'number_option'}},
+                'test_field_2': {
+                    'Literal': {'Objects': 'literal_option'},
+                    'AnyValue': {'Objects': 'any_option'}}}}
+        structure_index = ExpansionStructureIndex(expansion_structure)
+        found, node = structure_index.get(['AutoCreated', 'PlantLoop', 'Connector', 'Mixer', 'Supply'])
+        self.assertTrue(found)
+        self.assertIs(expansion_structure['AutoCreated']['PlantLoop']['Connector']['Mixer']['Supply'], node)
+        found, node = structure_index.get(['TemplateObjects', 'test_field', 3.5], match_option=True)
+        self.assertEqual({'Objects': 'number_option'}, node)
+        found, node = structure_index.get(['TemplateObjects', 'test_field', 'None'], match_option=True)
+        self.assertEqual({'Objects': 'none_option'}, node)
+        found, node = structure_index.get(['TemplateObjects', 'test_field_2', 'Other'], match_option=True)
+        self.assertEqual({'Objects': 'any_option'}, node)
+        # multiple matching options are left to a direct walk
+        found, node = structure_index.get(['TemplateObjects', 'test_field_2', 'Literal'], match_option=True)
+        self.assertFalse(found)
+        found, node = structure_index.get(['AutoCreated', 'Bad'])
+        self.assertFalse(found)
+        self.assertEqual(6, structure_index.lookups)
+        self.assertEqual(4, structure_index.hits)
+        return
+
+    def test_retrieve_structure_from_index(self):
+        eo = ExpandObjects(template=mock_template)
+        structure_index = eo._expansion_structure_index
+        lookups = structure_index.lookups
+        hits = structure_index.hits
+        structure_hierarchy = ['Objects', 'Common', 'Objects', 'Schedule', 'Compact', 'ALWAYS_VAL']
+        structure = eo.get_structure(structure_hierarchy=structure_hierarchy)
+        self.assertEqual(lookups + 1, structure_index.lookups)
+        self.assertEqual(hits + 1, structure_index.hits)
+        self.assertEqual(
+            eo.expansion_structure['Objects']['Common']['Objects']['Schedule']['Compact']['ALWAYS_VAL'],
+            structure)
+        return
+
+    def test_evaluate_expression(self):
+        self.assertEqual(0.25, evaluate_expression('0.5 / 2'))
+        self.assertEqual(-3, evaluate_expression(' -1 - 2'))
+        self.assertEqual(0.25, evaluate_expression('0.5 / 2 or Autosize'))
+        self.assertEqual(0.75, evaluate_expression('min(1, 0.7 + 0.05)'))
+        self.assertEqual(18, evaluate_expression('max(18, 15+1.0)'))
+        self.assertEqual(4, evaluate_expression('2 * 2'))
+        self.assertIsInstance(evaluate_expression('2 * 2'), int)
+        return
+
+    def test_evaluate_expression_rejects_non_expression(self):
+        with self.assertRaises(NameError):
+            evaluate_expression('0 / 2 or Autosize')
+        with self.assertRaises(NameError):
+            evaluate_expression('Autosize * 2', fast_path=False)
+        with self.assertRaises(SyntaxError):
+            evaluate_expression('Autosize * 2')
+        with self.assertRaises(SyntaxError):
+            evaluate_expression('SPACE1-1 Supply Inlet')
+        with self.assertRaises(SyntaxError):
+            evaluate_expression('1, 2')
+        with self.assertRaises(SyntaxError):
+            evaluate_expression('(1).__class__')
+        with self.assertRaises(SyntaxError):
+            evaluate_expression('9 ** 9 ** 9')
+        return
+
     def test_retrieve_structure(self):
         structure_hierarchy = ['Objects', 'Common', 'Objects', 'Schedule', 'Compact', 'ALWAYS_VAL']
         eo = ExpandObjects(template=mock_template)
@@ -135,3 +254,152 @@ class TestExpandObjects(BaseTest, unittest.TestCase):
         set_value = schedule_fields['data'][-1]['field']
         self.assertEqual(3, set_value)
         return
+
+    def test_expand_objects_helper_retarget(self):
+        eo = ExpandObjectsHelper()
+        eo.retarget(unique_name='VAV Sys 1')
+        eo.supply_plenum_name = 'PLENUM-1'
+        eo.build_compact_schedule(
+            structure_hierarchy=['Objects', 'Common', 'Objects', 'Schedule', 'Compact', 'ALWAYS_VAL'],
+            insert_values=[3, ])
+        supply_plenum = eo.get_structure(
+            structure_hierarchy=['AutoCreated', 'System', 'AirLoopHVAC', 'SupplyPlenum', 'Base'])
+        supply_plenum['nodes'] = []
+        output = eo.resolve_objects(epjson=eo.yaml_list_to_epjson_dictionaries(
+            yaml_list=[{'AirLoopHVAC:SupplyPlenum': supply_plenum}]))
+        (supply_plenum_name, supply_plenum_fields), = output['AirLoopHVAC:SupplyPlenum'].items()
+        self.assertEqual('VAV Sys 1 Supply Plenum', supply_plenum_name)
+        self.assertEqual('PLENUM-1', supply_plenum_fields['zone_name'])
+        self.assertIs(eo, eo.retarget(unique_name='VAV Sys 2'))
+        self.assertEqual('VAV Sys 2', eo.unique_name)
+        self.assertEqual({}, eo.epjson)
+        self.assertFalse(hasattr(eo, 'supply_plenum_name'))
+        self.assertIsNotNone(eo.logger)
+        self.assertIsNotNone(eo.expansion_structure)
+        return
+
+    def test_debug_dump_only_created_when_logged(self):
+        with patch('src.expand_objects.json.dumps', wraps=json.dumps) as json_dumps:
+            ExpandZone(template=copy.deepcopy(mock_zone_template), logger_level='WARNING').run()
+            self.assertEqual(0, json_dumps.call_count)
+            ez = ExpandZone(template=copy.deepcopy(mock_zone_template), logger_level='DEBUG').run()
+            self.assertEqual(1, json_dumps.call_count)
+        self.assertIn('HVACTemplate:Zone:VAV ({}) created objects:'.format(ez.unique_name), ez.stream.getvalue())
+        ez.logger.setLevel('WARNING')
+        return
+
+    @staticmethod
+    def _rename_zone_template(template_name, zone_name, **kwargs):
+        (template_fields, ), = [i.values() for i in mock_zone_template.values()]
+        return {'HVACTemplate:Zone:VAV': {template_name: {**copy.deepcopy(template_fields), 'zone_name': zone_name,
+                                                          **kwargs}}}
+
+    def test_expansion_cache_clone_matches_full_expansion(self):
+        expansion_cache = ExpansionCache(expand_class=ExpandZone)
+        expansion_cache.expand(template=self._rename_zone_template('Zone Template 1', 'SPACE1-1'))
+        zone_template = self._rename_zone_template('Zone Template 2', 'SPACE2-1', template_thermostat_name='Other')
+        cloned_zone = expansion_cache.expand(template=copy.deepcopy(zone_template))
+        expanded_zone = ExpandZone(template=zone_template).run()
+        self.assertEqual(1, expansion_cache.hits)
+        self.assertEqual(1, expansion_cache.misses)
+        self.assertEqual(json.dumps(expanded_zone.epjson), json.dumps(cloned_zone.epjson))
+        self.assertEqual('SPACE2-1', cloned_zone.unique_name)
+        self.assertEqual('Other', cloned_zone.template_thermostat_name)
+        self.assertEqual('Zone Template 2', cloned_zone.template_name)
+        self.assertEqual(zone_template['HVACTemplate:Zone:VAV'], cloned_zone.template)
+        self.assertIn('SPACE2-1 Equipment', cloned_zone.epjson['ZoneHVAC:EquipmentList'])
+        return
+
+    def test_expansion_cache_clones_do_not_share_epjson(self):
+        expansion_cache = ExpansionCache(expand_class=ExpandZone)
+        expansion_cache.expand(template=self._rename_zone_template('Zone Template 1', 'SPACE1-1'))
+        cloned_zone_2 = expansion_cache.expand(template=self._rename_zone_template('Zone Template 2', 'SPACE2-1'))
+        cloned_zone_3 = expansion_cache.expand(template=self._rename_zone_template('Zone Template 3', 'SPACE3-1'))
+        cloned_zone_2.epjson['Sizing:Zone']['SPACE2-1 Sizing Zone']['zone_or_zonelist_name'] = 'changed'
+        self.assertEqual('SPACE3-1', cloned_zone_3.epjson['Sizing:Zone']['SPACE3-1 Sizing Zone']['zone_or_zonelist_name'])
+        self.assertEqual(2, expansion_cache.hits)
+        return
+
+    def test_expansion_cache_clones_do_not_share_attributes(self):
+        expansion_cache = ExpansionCache(expand_class=ExpandZone)
+        expansion_cache.expand(template=self._rename_zone_template('Zone Template 1', 'SPACE1-1'))
+        cloned_zone_2 = expansion_cache.expand(template=self._rename_zone_template('Zone Template 2', 'SPACE2-1'))
+        cloned_zone_3 = expansion_cache.expand(template=self._rename_zone_template('Zone Template 3', 'SPACE3-1'))
+        for attribute_name, attribute_value in vars(cloned_zone_2).items():
+            if isinstance(attribute_value, (dict, list)) and attribute_name not in ExpansionCache.shared_attributes:
+                self.assertIsNot(attribute_value, getattr(cloned_zone_3, attribute_name))
+        self.assertIs(cloned_zone_2.expansion_structure, cloned_zone_3.expansion_structure)
+        return
+
+    def test_expansion_cache_prototype_does_not_disable_other_loggers(self):
+        def expand_class(template, **kwargs):
+            logging.getLogger('console_only_logger').warning('prototype message')
+            logging.getLogger('test_expansion_cache_logger').warning('other message')
+            return MagicMock()
+        expand_class.expansion_cache_naming_fields = ExpandZone.expansion_cache_naming_fields
+        expansion_cache = ExpansionCache(expand_class=expand_class)
+        warning_counter = ExpansionWarningCounter()
+        logging.getLogger('console_only_logger').addHandler(warning_counter)
+        try:
+            with self.assertLogs('test_expansion_cache_logger', level='WARNING') as log_context:
+                expansion_cache._create_prototype(template=self._rename_zone_template('Zone Template 1', 'SPACE1-1'))
+        finally:
+            logging.getLogger('console_only_logger').removeHandler(warning_counter)
+        self.assertEqual(['WARNING:test_expansion_cache_logger:other message'], log_context.output)
+        self.assertEqual(0, warning_counter.count)
+        self.assertEqual([], logging.getLogger('console_only_logger').filters)
+        return
+
+    def test_expansion_cache_signature_uses_non_naming_fields(self):
+        expansion_cache = ExpansionCache(expand_class=ExpandZone)
+        self.assertEqual(
+            expansion_cache.get_signature(self._rename_zone_template('Zone Template 1', 'SPACE1-1')),
+            expansion_cache.get_signature(self._rename_zone_template('Zone Template 2', 'SPACE2-1')))
+        self.assertNotEqual(
+            expansion_cache.get_signature(self._rename_zone_template('Zone Template 1', 'SPACE1-1')),
+            expansion_cache.get_signature(
+                self._rename_zone_template('Zone Template 2', 'SPACE2-1', reheat_coil_type='Electric')))
+        expansion_cache.expand(template=self._rename_zone_template('Zone Template 1', 'SPACE1-1'))
+        expansion_cache.expand(
+            template=self._rename_zone_template('Zone Template 2', 'SPACE2-1', reheat_coil_type='Electric'))
+        self.assertEqual(0, expansion_cache.hits)
+        self.assertEqual(2, expansion_cache.misses)
+        return
+
+    def test_expansion_cache_skips_names_used_as_values(self):
+        expansion_cache = ExpansionCache(expand_class=ExpandZone)
+        for zone_name in ['101', '1-1', '2 * 3', 'None', 'Zone {1}', 'HVACTemplate-Always1']:
+            self.assertIsNone(
+                expansion_cache.get_signature(self._rename_zone_template('Zone Template 1', zone_name)))
+        self.assertIsNone(ExpansionCache(expand_class=ExpandObjects).get_signature(mock_template))
+        return
+
+    def test_expansion_cache_rejects_mismatched_prototype(self):
+        expansion_cache = ExpansionCache(expand_class=ExpandZone)
+        expansion_cache._is_same_expansion = MagicMock(return_value=False)
+        expansion_cache.expand(template=self._rename_zone_template('Zone Template 1', 'SPACE1-1'))
+        expanded_zone = expansion_cache.expand(template=self._rename_zone_template('Zone Template 2', 'SPACE2-1'))
+        self.assertEqual(0, expansion_cache.hits)
+        self.assertEqual(1, len(expansion_cache.uncacheable_signatures))
+        self.assertIn('SPACE2-1 Equipment', expanded_zone.epjson['ZoneHVAC:EquipmentList'])
+        return
+
+    def test_expansion_cache_verify_all(self):
+        expansion_cache = ExpansionCache(expand_class=ExpandZone, verify_all=True)
+        for idx in range(3):
+            expansion_cache.expand(
+                template=self._rename_zone_template('Zone Template {}'.format(idx), 'SPACE{}-1'.format(idx)))
+        self.assertEqual(2, expansion_cache.hits)
+        self.assertEqual(0, len(expansion_cache.uncacheable_signatures))
+        return
+
+    def test_pickled_object_shares_expansion_structure(self):
+        ez = ExpandZone(template=copy.deepcopy(mock_zone_template)).run()
+        unpickled_ez = pickle.loads(pickle.dumps(ez))
+        self.assertIs(ez.expansion_structure, unpickled_ez.expansion_structure)
+        self.assertIs(ez._expansion_structure_index, unpickled_ez._expansion_structure_index)
+        self.assertIs(ez.stream, unpickled_ez.stream)
+        self.assertEqual(ez.epjson, unpickled_ez.epjson)
+        self.assertEqual('SPACE1-1', unpickled_ez.unique_name)
+        self.assertLess(len(pickle.dumps(ez)), 100000)
+        return
@@ -2,7 +2,7 @@ import unittest
 from unittest.mock import MagicMock
 import copy
 
-from src.expand_objects import ExpandObjects, ExpandZone, ExpandSystem
+from src.expand_objects import ExpandObjects, ExpandZone, ExpandSystem, OptionTreePlan
 from src.expand_objects import PyExpandObjectsTypeError, PyExpandObjectsYamlStructureException, \
     PyExpandObjectsYamlError, PyExpandObjectsException
 from . import BaseTest
@@ -321,6 +321,18 @@ class TestExpandObjectsYaml(BaseTest, unittest.TestCase):
         self.assertTrue(key_check)
         return
 
+    def test_option_tree_leaf_does_not_modify_expansion_structure(self):
+        expansion_structure = copy.deepcopy(mock_zone_option_tree)
+        eo = ExpandObjects(
+            template=mock_zone_template,
+            expansion_structure=expansion_structure)
+        option_tree = eo._get_option_tree(structure_hierarchy=['OptionTree', 'Zone', 'VAV'])
+        option_tree_leaf = eo._get_option_tree_leaf(option_tree=option_tree, leaf_path=['BaseObjects', ])
+        eo._apply_transitions(option_tree_leaf)
+        self.assertEqual(mock_zone_option_tree, eo.expansion_structure)
+        self.assertIn('Transitions', eo.expansion_structure['OptionTree']['Zone']['VAV']['BaseObjects'])
+        return
+
     def test_reject_option_tree_leaf_bad_structure(self):
         option_tree = {'mock': 'object'}
         eo = ExpandObjects()
@@ -542,6 +554,61 @@ class TestExpandObjectsYaml(BaseTest, unittest.TestCase):
         )
         return
 
+    def test_option_tree_plan_shared_between_templates(self):
+        eo_1 = ExpandZone(template=mock_zone_template)
+        eo_2 = ExpandZone(template=mock_zone_template)
+        structure_hierarchy = ['OptionTree', 'HVACTemplate', 'Zone', 'VAV']
+        option_tree_plan = eo_1._get_option_tree_plan(structure_hierarchy=structure_hierarchy)
+        self.assertIsNotNone(option_tree_plan)
+        self.assertIs(option_tree_plan, eo_2._get_option_tree_plan(structure_hierarchy=structure_hierarchy))
+        self.assertIs(
+            eo_1.expansion_structure['OptionTree']['HVACTemplate']['Zone']['VAV'],
+            option_tree_plan.option_tree)
+        return
+
+    def test_option_tree_plan_matches_option_tree_objects(self):
+        system_template = {
+            'HVACTemplate:System:VAV': {
+                'VAV Sys 1': {
+                    'cooling_coil_type': 'ChilledWater',
+                    'economizer_type': 'DifferentialDryBulb',
+                    'heat_recovery_type': 'Sensible',
+                    'heating_coil_type': 'HotWater',
+                    'humidifier_type': 'ElectricSteam',
+                    'night_cycle_control': 'CycleOnAny',
+                    'preheat_coil_type': 'Electric',
+                    'return_fan': 'Yes',
+                    'supply_fan_part_load_power_coefficients': 'InletVaneDampers',
+                    'supply_fan_placement': 'DrawThrough'
+                }
+            }
+        }
+        for expand_class, template in ((ExpandZone, mock_zone_template), (ExpandSystem, system_template)):
+            structure_hierarchy = list(template.keys())[0].split(':')
+            eo_plan = expand_class(template=template)
+            eo_plan.unique_name = eo_plan.template_name
+            eo_tree = expand_class(template=template)
+            eo_tree.unique_name = eo_tree.template_name
+            eo_tree._get_option_tree_plan = MagicMock()
+            eo_tree._get_option_tree_plan.return_value = None
+            self.assertEqual(
+                eo_tree._get_option_tree_objects(structure_hierarchy=list(structure_hierarchy)),
+                eo_plan._get_option_tree_objects(structure_hierarchy=list(structure_hierarchy)))
+        return
+
+    def test_option_tree_plan_selects_first_matching_option(self):
+        option_dispatch = OptionTreePlan.build_option_dispatch(
+            {'AnyNumber': {}, 'None': {}, 'Electric': {}, 'AnyValue': {}})
+        self.assertEqual('AnyNumber', OptionTreePlan.select_option(option_dispatch, 2.5))
+        self.assertEqual('None', OptionTreePlan.select_option(option_dispatch, 'None'))
+        self.assertEqual('Electric', OptionTreePlan.select_option(option_dispatch, 'Electric'))
+        self.assertEqual('AnyValue', OptionTreePlan.select_option(option_dispatch, 'HotWater'))
+        self.assertIsNone(OptionTreePlan.select_option(option_dispatch, '-bad'))
+        self.assertIsNone(OptionTreePlan.select_option(option_dispatch, 0))
+        option_dispatch = OptionTreePlan.build_option_dispatch({'AnyValue': {}, 'Electric': {}})
+        self.assertEqual('AnyValue', OptionTreePlan.select_option(option_dispatch, 'Electric'))
+        return
+
     def test_get_option_tree_no_match(self):
         structure_hierarchy = ['mock', 'object']
         eo = ExpandObjects()
@@ -649,6 +716,24 @@ class TestExpandObjectsYaml(BaseTest, unittest.TestCase):
         self.assertTrue(isinstance([o for o in output][0]['value'], int))
         return
 
+    def test_complex_inputs_class_attribute_reference_expression(self):
+        eo = ExpandZone(template=mock_zone_template)
+        eo.test_val = 1.5
+        output = eo._resolve_complex_input(
+            epjson={},
+            field_name="field_1",
+            input_value="{test_val} * 2"
+        )
+        self.assertEqual(3.0, [o for o in output][0]['value'])
+        eo.test_val = 2
+        output = eo._resolve_complex_input(
+            epjson={},
+            field_name="field_1",
+            input_value="{test_val} * 2"
+        )
+        self.assertEqual(4, [o for o in output][0]['value'])
+        return
+
     def test_complex_inputs_dictionary(self):
         test_d = {
             "Object:1": {
@@ -1617,6 +1702,51 @@ class TestExpandObjectsYaml(BaseTest, unittest.TestCase):
         self.assertEqual('test_object_type_2', list(build_path[2].keys())[0])
         return
 
+    def test_build_path_action_objects_reference_their_own_action(self):
+        test_system_option_tree = copy.deepcopy(mock_system_option_tree)
+        test_system_option_tree['OptionTree']['HVACTemplate']['System']['VAV']['BuildPath']['Actions'] = [
+            {
+                'template_field': {
+                    'template_test_value': {
+                        'Location': location,
+                        'ActionType': 'Insert',
+                        'Objects': [
+                            {
+                                coil_type: {
+                                    "Fields": {
+                                        'name': '{} ' + coil_type,
+                                        'air_inlet_node_name': '{} Inlet ' + coil_type,
+                                        'air_outlet_node_name': '{} Outlet ' + coil_type
+                                    },
+                                    "Connectors": {
+                                        'AirLoop': {"Inlet": 'air_inlet_node_name', "Outlet": "air_outlet_node_name"}}
+                                }
+                            },
+                            {
+                                "SetpointManager:MixedAir": {
+                                    'name': '{} Setpoint ' + coil_type,
+                                    'setpoint_node_or_nodelist_name': {'Coil:.*': 'air_outlet_node_name'}
+                                }
+                            }
+                        ]
+                    }
+                }
+            } for location, coil_type in ((1, 'Coil:Cooling:Water'), (2, 'Coil:Heating:Water'))
+        ]
+        eo = ExpandObjects(
+            template=mock_system_template,
+            expansion_structure=test_system_option_tree)
+        eo.unique_name = eo.template_name
+        structure_hierarchy = ['OptionTree', 'HVACTemplate', 'System', 'VAV']
+        option_tree = eo._get_option_tree(structure_hierarchy=structure_hierarchy)
+        eo._process_build_path(option_tree=option_tree['BuildPath'])
+        for coil_type in ('Coil:Cooling:Water', 'Coil:Heating:Water'):
+            self.assertEqual(
+                '{} Outlet {}'.format(eo.template_name, coil_type),
+                eo.epjson['SetpointManager:MixedAir']['{} Setpoint {}'.format(eo.template_name, coil_type)][
+                    'setpoint_node_or_nodelist_name'])
+        return
+
     def test_insert_on_build_path_from_option_tree_with_none_value(self):
         test_system_option_tree = copy.deepcopy(mock_system_option_tree)
         test_system_option_tree['OptionTree']['HVACTemplate']['System']['VAV']['BuildPath']['Actions'] = [
@@ -2147,6 +2277,52 @@ class TestExpandObjectsYaml(BaseTest, unittest.TestCase):
         self.assertEqual('val_3', eo.epjson['Object:Type2']['ObjectName2']['field_3'])
         return
 
+    def test_separate_objects_build_path_reference_converted_once(self):
+        eo = ExpandObjects()
+        eo.epjson = {}
+        object_list = [
+            {
+                "Object:Type1": {
+                    "Fields": {
+                        "name": "ObjectName1",
+                        "field_1": "val_1",
+                        "field_2": "val_2"
+                    },
+                    "Connectors": {
+                        "AirLooop": {
+                            "Inlet": "field_1",
+                            "Outlet": "field_2"
+                        }
+                    }
+                }
+            },
+            {
+                "Object:Type2": {
+                    "name": "ObjectName2",
+                    "field_3": {"Object:Type1": "field_2"},
+                    "field_4": {"Object:Type3": "key"}
+                }
+            },
+            {
+                "Object:Type3": {
+                    "name": "ObjectName3",
+                    "field_5": {"Object:Type2": "field_3"},
+                    "field_6": 3
+                }
+            }
+        ]
+        eo.yaml_list_to_epjson_dictionaries = MagicMock(wraps=eo.yaml_list_to_epjson_dictionaries)
+        output = eo._parse_build_path(object_list=object_list)
+        self.assertEqual(['Object:Type1'], [list(i.keys())[0] for i in output])
+        self.assertEqual(
+            {
+                'Object:Type2': {'ObjectName2': {'field_3': 'val_2', 'field_4': 'ObjectName3'}},
+                'Object:Type3': {'ObjectName3': {'field_5': 'val_2', 'field_6': 3}}},
+            eo.epjson)
+        # one conversion per regular object and one for the shared reference
+        self.assertEqual(3, eo.yaml_list_to_epjson_dictionaries.call_count)
+        return
+
     def test_reject_complex_inputs_build_path_reference_no_build_path(self):
         es = ExpandSystem(template=mock_system_template)
         es.build_path = {}
@@ -2339,6 +2515,23 @@ class TestExpandObjectsYaml(BaseTest, unittest.TestCase):
             ez.epjson['ZoneHVAC:EquipmentList']['test_zone Equipment']['equipment'][0]['zone_equipment_name'])
         return
 
+    def test_create_objects_references_base_epjson_without_copy(self):
+        ez = ExpandZone(template={
+            'HVACTemplate:Zone:FanCoil': {
+                'zone_template_name': {
+                    "cooling_coil_type": "ChilledWater",
+                    "heating_coil_type": "HotWater",
+                    'zone_name': 'test_zone'}}})
+        base_epjson = ez.epjson
+        ez.resolve_objects = MagicMock(wraps=ez.resolve_objects)
+        ez._create_objects()
+        reference_epjson = ez.resolve_objects.call_args[1]['reference_epjson']
+        self.assertIs(base_epjson, reference_epjson.layers[0])
+        self.assertEqual(
+            'test_zone Fan Coil',
+            ez.epjson['ZoneHVAC:EquipmentList']['test_zone Equipment']['equipment'][0]['zone_equipment_name'])
+        return
+
     def test_zonehvac_equipmentlist_baseboard(self):
         ez = ExpandZone(template={
             'HVACTemplate:Zone:FanCoil': {
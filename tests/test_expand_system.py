@@ -1,7 +1,8 @@
 import unittest
 import copy
+from unittest.mock import patch
 
-from src.expand_objects import ExpandSystem
+from src.expand_objects import ExpandObjects, ExpandSystem
 from src.expand_objects import PyExpandObjectsException, PyExpandObjectsYamlStructureException, \
     PyExpandObjectsTypeError
 from . import BaseTest
@@ -667,6 +668,35 @@ class TestExpandSystem(BaseTest, unittest.TestCase):
             output['BranchList']['{} Branches'.format(es.unique_name)]['branches'][0]['branch_name'])
         return
 
+    def test_branch_and_branchlist_merged_objects_returned(self):
+        es = ExpandSystem(template={'template_type': {'template_name': {}}})
+        es.unique_name = 'TEST SYSTEM'
+        es.epjson = {
+            "AirLoopHVAC:OutdoorAirSystem": {
+                "TEST SYSTEM OA System": {
+                    "availability_manager_list_name": "TEST SYSTEM Availability Managers",
+                    "controller_list_name": "TEST SYSTEM OA System Controllers",
+                    "outdoor_air_equipment_list_name": "TEST SYSTEM OA System Equipment"
+                }
+            }
+        }
+        es.build_path = mock_build_path
+        es._connect_and_convert_build_path_to_object_list()
+        output = es._create_branch_and_branchlist_from_build_path()
+        self.assertIs(
+            es.epjson['BranchList']['TEST SYSTEM Branches'],
+            output['BranchList']['TEST SYSTEM Branches'])
+        return
+
+    def test_resolve_objects_calls_per_template(self):
+        # Each set of objects should be resolved once.  Lower the count if the expansion is made to resolve less often.
+        with patch.object(ExpandObjects, 'resolve_objects', autospec=True,
+                          side_effect=ExpandObjects.resolve_objects) as resolve_objects:
+            es = ExpandSystem(template=mock_template)
+            es.run()
+        self.assertLessEqual(resolve_objects.call_count, 12)
+        return
+
     def test_reject_create_branch_and_branchlist_from_build_path_no_build_path(self):
         es = ExpandSystem(template={'template_type': {'template_name': {}}})
         with self.assertRaisesRegex(PyExpandObjectsException, 'Build path was not provided'):
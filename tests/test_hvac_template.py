@@ -1,4 +1,6 @@
 import unittest
+import json
+from unittest.mock import MagicMock
 
 from src.hvac_template import HVACTemplate
 from src.hvac_template import InvalidTemplateException, InvalidEpJSONException
@@ -927,3 +929,130 @@ class TestHVACTemplateObject(BaseTest, unittest.TestCase):
             'SupplyAirTemperature',
             getattr(self.expanded_zones['Zone Template 1'], 'zone_cooling_design_supply_air_temperature_input_method'))
         return
+
+    def test_zone_expansion_cache_matches_full_expansion(self):
+        zone_template = {
+            'HVACTemplate:Zone:VAV': {
+                **mock_zone_template['HVACTemplate:Zone:VAV'],
+                'HVACTemplate:Zone:VAV 2': {
+                    **mock_zone_template['HVACTemplate:Zone:VAV']['HVACTemplate:Zone:VAV 1'],
+                    'zone_name': 'SPACE2-1'}}}
+        outputs = []
+        for zone_expansion_cache in (False, True):
+            hvac_template = HVACTemplate(no_schema=True, zone_expansion_cache=zone_expansion_cache)
+            output = hvac_template.run(input_epjson={
+                **minimum_objects_d,
+                **mock_thermostat_template,
+                **zone_template,
+                **mock_system_template})
+            outputs.append(json.dumps(output['epJSON']))
+        self.assertEqual(1, hvac_template.zone_expansion_cache_hits)
+        self.assertEqual(outputs[0], outputs[1])
+        return
+
+    def test_parallel_expansion_matches_serial(self):
+        zone_template = {
+            'HVACTemplate:Zone:VAV': {
+                'HVACTemplate:Zone:VAV {}'.format(idx): {
+                    **mock_zone_template['HVACTemplate:Zone:VAV']['HVACTemplate:Zone:VAV 1'],
+                    'zone_name': 'SPACE{}-1'.format(idx)}
+                for idx in range(1, 4)}}
+        outputs = []
+        for processes in (1, 2):
+            hvac_template = HVACTemplate(no_schema=True, processes=processes)
+            output = hvac_template.run(input_epjson={
+                **minimum_objects_d,
+                **mock_thermostat_template,
+                **zone_template,
+                **mock_system_template})
+            outputs.append((json.dumps(output['epJSON']), output['Output:PreprocessorMessage']))
+            self.assertEqual(['SPACE1-1', 'SPACE2-1', 'SPACE3-1'],
+                             [i.unique_name for i in hvac_template.expanded_zones.values()])
+            self.assertIsNone(hvac_template._process_pool)
+        self.assertEqual(outputs[0], outputs[1])
+        return
+
+    def test_parallel_expansion_raises_template_error(self):
+        zone_template = {
+            'HVACTemplate:Zone:VAV': {
+                **mock_zone_template['HVACTemplate:Zone:VAV'],
+                'HVACTemplate:Zone:VAV 2': {
+                    **mock_zone_template['HVACTemplate:Zone:VAV']['HVACTemplate:Zone:VAV 1'],
+                    'zone_name': None}}}
+        hvac_template = HVACTemplate(no_schema=True, processes=2)
+        with self.assertRaisesRegex(InvalidTemplateException, 'Zone name not provided'):
+            hvac_template.run(input_epjson={
+                **minimum_objects_d,
+                **mock_thermostat_template,
+                **zone_template,
+                **mock_system_template})
+        self.assertIsNone(hvac_template._process_pool)
+        self.assertEqual([], hvac_template._process_pool_futures)
+        return
+
+    def test_shutdown_process_pool_cancels_pending_chunks(self):
+        hvac_template = HVACTemplate(no_schema=True, processes=2)
+        process_pool = MagicMock()
+        futures = [MagicMock(), MagicMock()]
+        hvac_template._process_pool = process_pool
+        hvac_template._process_pool_futures = list(futures)
+        hvac_template._shutdown_process_pool()
+        for future in futures:
+            future.cancel.assert_called_once_with()
+        process_pool.shutdown.assert_called_once_with(wait=True)
+        self.assertIsNone(hvac_template._process_pool)
+        self.assertEqual([], hvac_template._process_pool_futures)
+        return
+
+    def test_overlapped_stages_match_serial(self):
+        zone_template = {
+            'HVACTemplate:Zone:VAV': {
+                'HVACTemplate:Zone:VAV {}'.format(idx): {
+                    **mock_zone_template['HVACTemplate:Zone:VAV']['HVACTemplate:Zone:VAV 1'],
+                    'zone_name': 'SPACE{}-1'.format(idx)}
+                for idx in range(1, 4)}}
+        outputs = []
+        for stage_workers in (1, 3):
+            hvac_template = HVACTemplate(no_schema=True, logger_level='INFO', processes=2, stage_workers=stage_workers)
+            output = hvac_template.run(input_epjson={
+                **minimum_objects_d,
+                **mock_thermostat_template,
+                **zone_template,
+                **mock_system_template})
+            outputs.append((json.dumps(output['epJSON']), output['Output:PreprocessorMessage']))
+            self.assertEqual(
+                ['preprocess', 'thermostats', 'systems', 'zones', 'zone_thermostat_connections',
+                 'system_zone_connections', 'plant_loops', 'plant_equipment', 'additional_plant_loops_and_equipment',
+                 'plant_equipment_connections', 'epjson'],
+                sorted([i.name for i in hvac_template.stage_timings],
+                       key=lambda x: [i.name for i in hvac_template._get_run_stages({})].index(x)))
+        self.assertEqual(outputs[0], outputs[1])
+        return
+
+    def test_run_messages_written_to_own_stream(self):
+        hvac_template = HVACTemplate(no_schema=True, logger_level='INFO')
+        # a second object resets the message stream of the process
+        other_hvac_template = HVACTemplate(no_schema=True, logger_level='INFO')
+        output = hvac_template.run(input_epjson={
+            **minimum_objects_d,
+            **mock_thermostat_template,
+            **mock_zone_template,
+            **mock_system_template})
+        self.assertIn('##### Processing Zones #####', output['Output:PreprocessorMessage'])
+        self.assertNotIn('##### Processing Zones #####', other_hvac_template.stream.getvalue())
+        return
+
+    def test_validated_base_objects_exclude_generated_objects(self):
+        hvac_template = HVACTemplate(no_schema=True)
+        hvac_template.base_objects = {
+            'Schedule:Compact': {'Schedule 1': {}, 'Schedule 2': {}},
+            'Zone': {'SPACE1-1': {}}}
+        generated_epjson_list = [{'Schedule:Compact': {'Schedule 2': {}, 'Schedule 3': {}}}]
+        # without schema validation the base objects have not been validated
+        self.assertEqual({}, hvac_template._get_validated_base_objects(generated_epjson_list=generated_epjson_list))
+        hvac_template.schema = hvac_template.Validator({})
+        hvac_template.input_epjson_is_valid = True
+        validated_base_objects = hvac_template._get_validated_base_objects(generated_epjson_list=generated_epjson_list)
+        self.assertEqual(['Schedule 1'], list(validated_base_objects['Schedule:Compact'].keys()))
+        self.assertIs(hvac_template.base_objects['Zone']['SPACE1-1'], validated_base_objects['Zone']['SPACE1-1'])
+        return
@@ -2,7 +2,7 @@ import copy
 import unittest
 from unittest.mock import MagicMock, PropertyMock
 
-from src.hvac_template import HVACTemplate
+from src.hvac_template import HVACTemplate, WaterLoopBranchRegistry
 from src.hvac_template import InvalidTemplateException
 from src.expand_objects import ExpandObjects, ExpandSystem, ExpandZone, ExpandPlantLoop, ExpandPlantEquipment
 from . import BaseTest
@@ -52,6 +52,14 @@ class TestHVACTemplateObjectConnections(BaseTest, unittest.TestCase):
     def tearDown(self):
         return
 
+    def test_expand_objects_helper_shared_between_connections(self):
+        eo = self.hvac_template._get_expand_objects_helper(unique_name='VAV Sys 1')
+        eo.return_plenum_name = 'PLENUM-1'
+        self.assertIs(eo, self.hvac_template._get_expand_objects_helper(unique_name='VAV Sys 2'))
+        self.assertEqual('VAV Sys 2', eo.unique_name)
+        self.assertFalse(hasattr(eo, 'return_plenum_name'))
+        return
+
     def test_create_zonecontrol_thermostat_dualsetpoint(self):
         et = MagicMock()
         et_epjson = PropertyMock(return_value={
@@ -232,6 +240,65 @@ class TestHVACTemplateObjectConnections(BaseTest, unittest.TestCase):
         )
         return
 
+    def test_zone_system_index(self):
+        expanded_zones = {}
+        for unique_name, system_name in [('SPACE1-1', 'VAV Sys 1'), ('SPACE2-1', 'VAV Sys 2'), ('SPACE3-1', 'VAV Sys 1')]:
+            ez = MagicMock()
+            type(ez).epjson = PropertyMock(return_value=copy.deepcopy(mock_zone_epjson))
+            type(ez).template_vav_system_name = system_name
+            type(ez).dedicated_outdoor_air_system_name = 'DOAS'
+            type(ez).unique_name = unique_name
+            for field_name in ['template_constant_volume_system_name', 'template_dual_duct_system_name',
+                               'template_unitary_system_name', 'template_vrf_system_name']:
+                delattr(ez, field_name)
+            expanded_zones[unique_name] = ez
+        zone_system_index = self.hvac_template._get_zone_system_index(expanded_zones=expanded_zones)
+        self.assertEqual(
+            ['SPACE1-1', 'SPACE3-1'],
+            [ez.unique_name for ez, _ in zone_system_index[('template_vav_system_name', 'VAV Sys 1')]])
+        self.assertEqual(
+            ['SPACE1-1', 'SPACE2-1', 'SPACE3-1'],
+            [ez.unique_name for ez, _ in zone_system_index[('dedicated_outdoor_air_system_name', 'DOAS')]])
+        self.assertEqual(3, len(zone_system_index))
+        (_, zone_connection_objects), = zone_system_index[('template_vav_system_name', 'VAV Sys 2')]
+        self.assertEqual(
+            ['AirTerminal:SingleDuct:VAV:Reheat', 'ZoneHVAC:EquipmentConnections'],
+            sorted(zone_connection_objects.keys()))
+        return
+
+    def test_system_path_objects_from_zone_system_index(self):
+        eo = ExpandObjects()
+        es = ExpandSystem(template={
+            "HVACTemplate:System:VAV": {
+                "VAV Sys 1": {
+                }
+            }
+        })
+        expanded_zones = {}
+        for unique_name in ['SPACE1-1', 'SPACE2-1']:
+            eo.unique_name = unique_name
+            mock_epjson = eo.resolve_objects(epjson=copy.deepcopy(mock_zone_epjson))
+            ez = MagicMock()
+            ez_epjson = PropertyMock(return_value=mock_epjson)
+            type(ez).epjson = ez_epjson
+            type(ez).template_vav_system_name = 'VAV Sys 1'
+            type(ez).zone_name = unique_name
+            type(ez).unique_name = unique_name
+            del ez.supply_plenum_name
+            del ez.return_plenum_name
+            expanded_zones[unique_name] = ez
+        zone_system_index = self.hvac_template._get_zone_system_index(expanded_zones=expanded_zones)
+        # only the index is used to find the zones of the system
+        self.hvac_template._create_system_path_connection_objects(
+            system_class_object=es,
+            expanded_zones={},
+            zone_system_index=zone_system_index)
+        (zone_mixer_fields, ) = self.hvac_template.epjson['AirLoopHVAC:ZoneMixer'].values()
+        self.assertEqual(
+            ['SPACE1-1 Return Outlet', 'SPACE2-1 Return Outlet'],
+            [i['inlet_node_name'] for i in zone_mixer_fields['nodes']])
+        return
+
     def test_system_path_objects_zone_no_supply_plenum(self):
         eo = ExpandObjects()
         es = ExpandSystem(template={
@@ -805,6 +872,77 @@ class TestHVACTemplateObjectConnections(BaseTest, unittest.TestCase):
         self.assertIsNone(output_list[1])
         return
 
+    def test_water_loop_branch_registry_by_loop_type_and_side(self):
+        def branch(component_object_type):
+            return {"components": [{"component_object_type": component_object_type}]}
+        ez = MagicMock()
+        ez.epjson = {
+            "Branch": {
+                "SPACE1-1 Reheat Coil HW Branch": branch("Coil:Heating:Water"),
+                "SPACE1-1 Main Branch": branch("Coil:Heating:Water")}}
+        es = MagicMock()
+        es.epjson = {"Branch": {"VAV Sys 1 Cooling Coil ChW Branch": branch("Coil:Cooling:Water")}}
+        epe = MagicMock()
+        epe.template_type = 'HVACTemplate:Plant:Chiller'
+        epe.condenser_type = 'WaterCooled'
+        epe.epjson = {
+            "Branch": {
+                "Main Chiller ChW Branch": branch("Chiller:Electric:EIR"),
+                "Main Chiller CndW Branch": branch("Chiller:Electric:EIR")}}
+        ect = MagicMock()
+        ect.template_type = 'HVACTemplate:Plant:Tower'
+        ect.template_plant_loop_type = 'CondenserWater'
+        ect.epjson = {"Branch": {"Main Tower CndW Branch": branch("CoolingTower:SingleSpeed")}}
+        water_loop_branches = WaterLoopBranchRegistry()
+        water_loop_branches.add_zone_system_branches(expanded_objects={'SPACE1-1': ez}, template_group='zones')
+        water_loop_branches.add_zone_system_branches(expanded_objects={'VAV Sys 1': es}, template_group='systems')
+        water_loop_branches.add_plant_equipment_branches(
+            expanded_plant_equipment={'Main Chiller': epe, 'Main Tower': ect})
+        self.assertEqual(
+            ['SPACE1-1 Reheat Coil HW Branch'],
+            list(water_loop_branches.get_branches(loop_type='HotWaterLoop', loop_side='Demand').keys()))
+        self.assertEqual(
+            ['VAV Sys 1 Cooling Coil ChW Branch'],
+            list(water_loop_branches.get_branches(loop_type='ChilledWaterLoop', loop_side='Demand').keys()))
+        self.assertEqual(
+            ['Main Chiller ChW Branch'],
+            list(water_loop_branches.get_branches(loop_type='ChilledWaterLoop', loop_side='Supply').keys()))
+        self.assertEqual(
+            ['Main Chiller CndW Branch'],
+            list(water_loop_branches.get_branches(loop_type='CondenserWaterLoop', loop_side='Demand').keys()))
+        self.assertEqual(
+            ['Main Tower CndW Branch'],
+            list(water_loop_branches.get_branches(loop_type='CondenserWaterLoop', loop_side='Supply').keys()))
+        self.assertEqual({}, water_loop_branches.get_branches(loop_type='MixedWaterLoop', loop_side='Demand'))
+        # branch structures are shared with the expanded objects, not copied
+        self.assertIs(
+            ect.epjson['Branch']['Main Tower CndW Branch'],
+            water_loop_branches.get_branches(
+                loop_type='CondenserWaterLoop', loop_side='Supply')['Main Tower CndW Branch'])
+        return
+
+    def test_split_supply_and_demand_side_branches_from_registry(self):
+        epl = MagicMock()
+        epl.template_type = 'HVACTemplate:Plant:HotWaterLoop'
+        epe = MagicMock()
+        epe.template_type = 'HVACTemplate:Plant:Boiler'
+        epe.template_plant_loop_type = 'HotWater'
+        epe.epjson = {
+            "Branch": {"Main Boiler HW Branch": {"components": [{"component_object_type": "Boiler:HotWater"}]}}}
+        water_loop_branches = WaterLoopBranchRegistry()
+        water_loop_branches.add_plant_equipment_branches(expanded_plant_equipment={'Main Boiler': epe})
+        # the registry is used instead of the expanded objects
+        demand_branches, supply_branches = self.hvac_template._split_supply_and_demand_side_branches(
+            plant_loop_class_object=epl,
+            expanded_plant_equipment={},
+            expanded_systems={},
+            expanded_zones={},
+            water_loop_branches=water_loop_branches)
+        self.assertIsNone(demand_branches)
+        self.assertEqual(['Main Boiler HW Branch'], list(supply_branches.keys()))
+        self.assertIs(epe.epjson['Branch']['Main Boiler HW Branch'], supply_branches['Main Boiler HW Branch'])
+        return
+
     def test_condenser_water_loop_connectors(self):
         epl = MagicMock()
         epl.template_name = 'Condenser Water Loop'
@@ -859,6 +997,74 @@ class TestHVACTemplateObjectConnections(BaseTest, unittest.TestCase):
             self.hvac_template.summarize_epjson(self.hvac_template.epjson))
         return
 
+    def test_repeated_insert_list(self):
+        for index in [0, 1, -1]:
+            for entries in [[], ['a'], ['a', 'b', 'c']]:
+                new_entries = ['d', 'e', 'f']
+                expected_entries = copy.deepcopy(entries)
+                for new_entry in new_entries:
+                    expected_entries.insert(index, new_entry)
+                self.assertEqual(
+                    expected_entries,
+                    self.hvac_template._get_repeated_insert_list(
+                        entries=entries, new_entries=new_entries, index=index))
+        with self.assertRaises(ValueError):
+            self.hvac_template._get_repeated_insert_list(entries=[], new_entries=['a'], index=2)
+        return
+
+    def test_hot_water_loop_connectors_branch_order(self):
+        epl = MagicMock()
+        epl.template_name = 'Hot Water Loop'
+        epl.template_type = 'HVACTemplate:Plant:HotWaterLoop'
+        epl.supply_side_bypass_pipe = 'No'
+        epl.demand_side_bypass_pipe = 'Yes'
+        expanded_plant_equipment = {}
+        for equipment_name in ['Boiler 1', 'Boiler 2']:
+            epe = MagicMock()
+            epe.template_type = 'HVACTemplate:Plant:Boiler'
+            epe.template_plant_loop_type = 'HotWater'
+            epe.epjson = {
+                'Branch': {
+                    '{} HW Branch'.format(equipment_name): {
+                        'components': [{
+                            'component_object_type': 'Boiler:HotWater',
+                            'component_outlet_node_name': '{} HW Outlet'.format(equipment_name)}]}}}
+            expanded_plant_equipment[equipment_name] = epe
+        expanded_zones = {}
+        for zone_name in ['SPACE1-1', 'SPACE2-1']:
+            ez = MagicMock()
+            ez.epjson = {
+                'Branch': {
+                    '{} Reheat Coil HW Branch'.format(zone_name): {
+                        'components': [{'component_object_type': 'Coil:Heating:Water'}]}}}
+            expanded_zones[zone_name] = ez
+        self.hvac_template._create_water_loop_connectors_and_nodelist(
+            plant_loop_class_object=epl,
+            expanded_plant_equipment=expanded_plant_equipment,
+            expanded_zones=expanded_zones)
+        self.assertEqual(
+            ['Hot Water Loop Demand Inlet Branch', 'SPACE2-1 Reheat Coil HW Branch', 'SPACE1-1 Reheat Coil HW Branch',
+             'Hot Water Loop Demand Bypass Branch', 'Hot Water Loop Demand Outlet Branch'],
+            [i['branch_name'] for i in self.hvac_template.epjson['BranchList']['Hot Water Loop Demand Side Branches']['branches']])
+        self.assertEqual(
+            ['Hot Water Loop Demand Bypass Branch', 'SPACE1-1 Reheat Coil HW Branch', 'SPACE2-1 Reheat Coil HW Branch'],
+            [i['outlet_branch_name'] for i in
+             self.hvac_template.epjson['Connector:Splitter']['Hot Water Loop Demand Splitter']['branches']])
+        self.assertEqual(
+            ['Hot Water Loop Supply Inlet Branch', 'Boiler 2 HW Branch', 'Boiler 1 HW Branch',
+             'Hot Water Loop Supply Outlet Branch'],
+            [i['branch_name'] for i in self.hvac_template.epjson['BranchList']['Hot Water Loop Supply Side Branches']['branches']])
+        # without a supply bypass branch, the first branch is inserted into an empty list and stays last
+        self.assertEqual(
+            ['Boiler 2 HW Branch', 'Boiler 1 HW Branch'],
+            [i['inlet_branch_name'] for i in
+             self.hvac_template.epjson['Connector:Mixer']['Hot Water Loop Supply Mixer']['branches']])
+        self.assertEqual(
+            ['Boiler 2 HW Outlet', 'Boiler 1 HW Outlet', 'Hot Water Loop Supply Outlet'],
+            [i['node_name'] for i in
+             self.hvac_template.epjson['NodeList']['Hot Water Loop Supply Setpoint Nodes']['nodes']])
+        return
+
     def test_plantequipmentlist_objects(self):
         epl = MagicMock()
         epl.template_name = 'Chilled Water Loop'
@@ -0,0 +1,125 @@
+import unittest
+import importlib.util
+import json
+import tempfile
+import os
+
+from . import BaseTest
+from src.json_backend import JSONBackend, get_json_backend, json_backend_names
+from src.epjson_handler import EPJSONLayeredView
+# must import exceptions directly from test code
+from src.json_backend import PyExpandObjectsException
+
+test_epjson = {
+    "Zone": {
+        "SPACE1-1": {
+            "ceiling_height": 2.438400269,
+            "multiplier": 1,
+            "volume": 239.247360229
+        }
+    },
+    "Building": {
+        "Test Building": {
+            "name": "Bâtiment / 1"
+        }
+    }
+}
+
+
+class TestJSONBackend(BaseTest, unittest.TestCase):
+    """
+    Test reading and writing JSON with each installed JSON library
+    """
+    def setUp(self):
+        self.json_backends = [JSONBackend(i) for i in json_backend_names if importlib.util.find_spec(i)]
+        return
+
+    def tearDown(self):
+        return
+
+    def test_default_backend_is_installed(self):
+        json_backend = get_json_backend()
+        self.assertIn(json_backend.name, [i.name for i in self.json_backends])
+        self.assertIs(json_backend, get_json_backend(json_backend.name))
+        return
+
+    def test_unsupported_backend_returns_error(self):
+        with self.assertRaisesRegex(PyExpandObjectsException, 'not supported'):
+            get_json_backend('bad_backend')
+        return
+
+    def test_output_is_semantically_identical(self):
+        for json_backend in self.json_backends:
+            for compact in (False, True):
+                with self.subTest(json_backend=json_backend.name, compact=compact):
+                    json_document = json_backend.dumps(test_epjson, compact=compact)
+                    self.assertEqual(test_epjson, json.loads(json_document))
+                    self.assertEqual(test_epjson, json_backend.loads(json_document))
+                    self.assertEqual(['Building', 'Zone'], list(json_backend.loads(json_document).keys()))
+                    self.assertEqual(not compact, '\n' in json_document)
+        return
+
+    def test_standard_library_output_unchanged(self):
+        self.assertEqual(
+            json.dumps(test_epjson, indent=4, sort_keys=True),
+            get_json_backend('json').dumps(test_epjson))
+        return
+
+    def test_indented_output_is_the_same_for_every_backend(self):
+        for json_backend in self.json_backends:
+            with self.subTest(json_backend=json_backend.name):
+                self.assertEqual(json.dumps(test_epjson, indent=4, sort_keys=True), json_backend.dumps(test_epjson))
+        return
+
+    def test_reject_non_finite_values(self):
+        for json_backend in self.json_backends:
+            for compact in (False, True):
+                for value in (float('nan'), float('inf'), -float('inf')):
+                    with self.subTest(json_backend=json_backend.name, compact=compact, value=value):
+                        with self.assertRaises(ValueError):
+                            json_backend.dumps({"value": value}, compact=compact)
+                        with self.assertRaises(ValueError):
+                            ''.join(json_backend.iterdumps({"Zone": {"SPACE1-1": {"volume": value}}}, compact=compact))
+        return
+
+    def test_null_values_are_written(self):
+        for json_backend in self.json_backends:
+            for compact in (False, True):
+                with self.subTest(json_backend=json_backend.name, compact=compact):
+                    self.assertEqual(
+                        {"value": None, "name": "null"},
+                        json_backend.loads(json_backend.dumps({"value": None, "name": "null"}, compact=compact)))
+        return
+
+    def test_unsupported_value_falls_back_to_standard_library(self):
+        for json_backend in self.json_backends:
+            with self.subTest(json_backend=json_backend.name):
+                self.assertEqual({"value": 2 ** 70}, json_backend.loads(json_backend.dumps({"value": 2 ** 70})))
+        return
+
+    def test_write_and_read_file(self):
+        for json_backend in self.json_backends:
+            with self.subTest(json_backend=json_backend.name):
+                with tempfile.TemporaryDirectory() as temp_dir:
+                    file_location = os.path.join(temp_dir, 'test.epJSON')
+                    json_backend.dump(test_epjson, file_location, compact=True)
+                    self.assertEqual(test_epjson, json_backend.load(file_location))
+        return
+
+    def test_layered_view_output_matches_merged_output(self):
+        top_layer = {
+            "Zone": {
+                "SPACE1-1": {"multiplier": 2},
+                "SPACE2-1": {"multiplier": 1}},
+            "Schedule:Compact": {}}
+        merged_epjson = {
+            "Zone": {**test_epjson["Zone"], **top_layer["Zone"]},
+            "Building": test_epjson["Building"],
+            "Schedule:Compact": {}}
+        for json_backend in self.json_backends:
+            for compact in (False, True):
+                with self.subTest(json_backend=json_backend.name, compact=compact):
+                    self.assertEqual(
+                        json_backend.dumps(merged_epjson, compact=compact),
+                        ''.join(json_backend.iterdumps(EPJSONLayeredView(top_layer, test_epjson), compact=compact)))
+        return
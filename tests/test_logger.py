@@ -0,0 +1,54 @@
+import unittest
+from unittest.mock import patch
+
+from . import BaseTest
+from src import logger
+from src.logger import Logger, MessageStream, message_stream
+
+
+class TestLogger(BaseTest, unittest.TestCase):
+    """
+    Test the configuration of loggers and the message stream
+    """
+    def setUp(self):
+        return
+
+    def tearDown(self):
+        return
+
+    def test_logging_configured_once(self):
+        Logger(logger_name='console_only_logger')
+        handler_count = len(Logger(logger_name='console_only_logger').logger.handlers)
+        with patch.object(logger, 'fileConfig') as file_config:
+            for _ in range(100):
+                console_logger = Logger(logger_name='console_only_logger').logger
+        self.assertEqual(0, file_config.call_count)
+        self.assertEqual(handler_count, len(console_logger.handlers))
+        return
+
+    def test_stream_handler_added_after_reconfiguration(self):
+        console_logger = Logger(logger_name='console_only_logger').logger
+        handler = logger.stream_handlers['console_only_logger']
+        console_logger.removeHandler(handler)
+        Logger(logger_name='console_only_logger')
+        self.assertEqual(1, console_logger.handlers.count(handler))
+        return
+
+    def test_reset_stream(self):
+        first_stream = Logger(logger_name='console_only_logger', reset_stream=True).stream
+        console_logger = Logger(logger_name='console_only_logger', logger_level='INFO', reset_stream=True).logger
+        console_logger.info('message')
+        self.assertEqual('', first_stream.getvalue())
+        self.assertEqual('message\n', Logger(logger_name='console_only_logger').stream.getvalue())
+        return
+
+    def test_message_stream_context(self):
+        base_stream = Logger(logger_name='console_only_logger', logger_level='INFO', reset_stream=True).stream
+        console_logger = Logger(logger_name='console_only_logger', logger_level='INFO').logger
+        with message_stream(MessageStream()) as run_stream:
+            console_logger.info('run message')
+            self.assertIs(run_stream, Logger(logger_name='console_only_logger', logger_level='INFO').stream)
+        console_logger.info('base message')
+        self.assertEqual('run message\n', run_stream.getvalue())
+        self.assertEqual('base message\n', base_stream.getvalue())
+        return
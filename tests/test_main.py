@@ -84,6 +84,64 @@ class TestMain(BaseTest, unittest.TestCase):
         self.assertTrue(msg_status)
         return
 
+    def test_processes_output_matches_serial(self):
+        outputs = []
+        for processes in (1, 2):
+            with tempfile.TemporaryDirectory() as output_directory:
+                output = main(
+                    Namespace(
+                        no_schema=True,
+                        file=str(
+                            test_dir / '..' / 'simulation' / 'ExampleFiles' / 'HVACTemplate-5ZoneVAVWaterCooled.epJSON'
+                        ),
+                        output_directory=output_directory,
+                        processes=processes
+                    )
+                )
+                with open(output['output_files']['expanded'], 'r') as f:
+                    outputs.append(f.read())
+        self.assertEqual(outputs[0], outputs[1])
+        return
+
+    def test_stream_output_matches_merged_output(self):
+        outputs = []
+        for stream_output in (False, True):
+            with tempfile.TemporaryDirectory() as output_directory:
+                output = main(
+                    Namespace(
+                        no_schema=True,
+                        file=str(
+                            test_dir / '..' / 'simulation' / 'ExampleFiles' / 'HVACTemplate-5ZoneVAVWaterCooled.epJSON'
+                        ),
+                        output_directory=output_directory,
+                        stream_output=stream_output
+                    )
+                )
+                for output_file in ('expanded', 'base', 'hvac_templates'):
+                    with open(output['output_files'][output_file], 'r') as f:
+                        outputs.append(f.read())
+        self.assertEqual(outputs[:3], outputs[3:])
+        return
+
+    def test_zone_expansion_cache_matches_full_expansion(self):
+        outputs = []
+        for zone_expansion_cache in (False, True):
+            with tempfile.TemporaryDirectory() as output_directory:
+                output = main(
+                    Namespace(
+                        no_schema=True,
+                        file=str(
+                            test_dir / '..' / 'simulation' / 'ExampleFiles' / 'HVACTemplate-5ZoneVAVWaterCooled.epJSON'
+                        ),
+                        output_directory=output_directory,
+                        zone_expansion_cache=zone_expansion_cache
+                    )
+                )
+                with open(output['output_files']['expanded'], 'r') as f:
+                    outputs.append(f.read())
+        self.assertEqual(outputs[0], outputs[1])
+        return
+
     def test_bad_file_path_returns_message(self):
         with tempfile.TemporaryDirectory() as output_directory:
             output = main(
@@ -148,6 +206,39 @@ class TestMain(BaseTest, unittest.TestCase):
                     100)
         return
 
+    def test_write_compact_output(self):
+        with tempfile.TemporaryDirectory() as output_directory:
+            with tempfile.NamedTemporaryFile(suffix='.epJSON', mode='w', dir=output_directory) as temp_file:
+                json.dump(
+                    {
+                        **minimum_objects_d,
+                        "HVACTemplate:Thermostat": {
+                            "All Zones Dual": {
+                                "cooling_setpoint_schedule_name": "Clg-SetP-Sch",
+                                "heating_setpoint_schedule_name": "Htg-SetP-Sch"
+                            }
+                        }
+                    },
+                    temp_file)
+                temp_file.seek(0)
+                output_files = {}
+                for compact in (False, True):
+                    output = main(
+                        Namespace(
+                            file=temp_file.name,
+                            no_schema=True,
+                            output_directory=output_directory,
+                            no_backup=True,
+                            compact=compact
+                        )
+                    )
+                    with open(os.path.join(output_directory, output['output_files']['expanded'])) as f:
+                        output_files[compact] = f.read()
+        self.assertNotIn('\n', output_files[True])
+        self.assertLess(len(output_files[True]), len(output_files[False]))
+        self.assertEqual(json.loads(output_files[False]), json.loads(output_files[True]))
+        return
+
     def test_write_output_no_directory_specified(self):
         with tempfile.NamedTemporaryFile(suffix='.epJSON', mode='w') as temp_file:
             json.dump(
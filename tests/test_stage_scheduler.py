@@ -0,0 +1,132 @@
+import unittest
+import threading
+import pickle
+
+from . import BaseTest
+from src.logger import MessageStream
+from src.stage_scheduler import Stage, StageScheduler
+
+
+class TestStageScheduler(BaseTest, unittest.TestCase):
+    """
+    Test the dependency graph scheduler of workflow stages
+    """
+    def setUp(self):
+        self.stream = MessageStream()
+        return
+
+    def tearDown(self):
+        return
+
+    def test_message_stream_captures_thread_messages(self):
+        self.stream.write('before\n')
+        with self.stream.capture() as buffer:
+            self.stream.write('captured\n')
+        self.stream.write('after\n')
+        self.assertEqual('captured\n', buffer.getvalue())
+        self.assertEqual('before\nafter\n', self.stream.getvalue())
+        return
+
+    def test_message_stream_pickles_without_capture_buffers(self):
+        self.stream.write('message\n')
+        with self.stream.capture():
+            loaded_stream = pickle.loads(pickle.dumps(self.stream))
+        self.assertEqual('message\n', loaded_stream.getvalue())
+        loaded_stream.write('loaded\n')
+        self.assertEqual('message\nloaded\n', loaded_stream.getvalue())
+        return
+
+    def test_dependencies_from_inputs_and_outputs(self):
+        scheduler = StageScheduler(
+            stages=[
+                Stage(name='a', function=None, outputs=('x', )),
+                Stage(name='b', function=None, outputs=('y', )),
+                Stage(name='c', function=None, inputs=('x', 'y'), outputs=('z', )),
+                Stage(name='d', function=None, inputs=('y', ), outputs=('w', )),
+                Stage(name='e', function=None, outputs=('z', )),
+                Stage(name='f', function=None, outputs=('y', ))],
+            stream=self.stream)
+        self.assertEqual(set(), scheduler.dependencies['a'])
+        self.assertEqual(set(), scheduler.dependencies['b'])
+        self.assertEqual({'a', 'b'}, scheduler.dependencies['c'])
+        self.assertEqual({'b'}, scheduler.dependencies['d'])
+        # modifies an output of c
+        self.assertEqual({'c'}, scheduler.dependencies['e'])
+        # modifies an output of b, which is read by c and d
+        self.assertEqual({'b', 'c', 'd'}, scheduler.dependencies['f'])
+        return
+
+    def test_duplicate_stage_name_raises_error(self):
+        with self.assertRaisesRegex(ValueError, 'Duplicate stage name'):
+            StageScheduler(
+                stages=[Stage(name='a', function=None), Stage(name='a', function=None)],
+                stream=self.stream)
+        return
+
+    def test_serial_run_in_list_order(self):
+        order = []
+        scheduler = StageScheduler(
+            stages=[
+                Stage(name='a', function=lambda: order.append('a'), outputs=('x', )),
+                Stage(name='b', function=lambda: order.append('b') or 'b output', inputs=('x', ))],
+            stream=self.stream)
+        results = scheduler.run()
+        self.assertEqual(['a', 'b'], order)
+        self.assertEqual('b output', results['b'])
+        self.assertEqual(['a', 'b'], [i.name for i in scheduler.timings])
+        self.assertTrue(all(i.end >= i.start for i in scheduler.timings))
+        self.assertEqual(['MainThread', 'MainThread'], [i.thread for i in scheduler.timings])
+        return
+
+    def test_overlapped_run_writes_messages_in_list_order(self):
+        b_finished = threading.Event()
+        scheduler = None
+
+        def stage_a():
+            # wait for the independent stage b, which can only run while a releases the scheduler
+            with scheduler.released():
+                self.assertTrue(b_finished.wait(timeout=10))
+            self.stream.write('a\n')
+            return 'a output'
+
+        def stage_b():
+            self.stream.write('b\n')
+            b_finished.set()
+            return
+
+        def stage_c():
+            self.stream.write('c\n')
+            return
+
+        scheduler = StageScheduler(
+            stages=[
+                Stage(name='a', function=stage_a, outputs=('x', )),
+                Stage(name='b', function=stage_b, outputs=('y', )),
+                Stage(name='c', function=stage_c, inputs=('x', 'y'))],
+            stream=self.stream,
+            max_workers=2)
+        results = scheduler.run()
+        self.assertEqual('a\nb\nc\n', self.stream.getvalue())
+        self.assertEqual('a output', results['a'])
+        self.assertEqual(['b', 'a', 'c'], [i.name for i in scheduler.timings])
+        return
+
+    def test_overlapped_run_raises_first_failed_stage_error(self):
+        order = []
+
+        def stage_b():
+            self.stream.write('b\n')
+            raise ValueError('stage b failed')
+
+        scheduler = StageScheduler(
+            stages=[
+                Stage(name='a', function=lambda: self.stream.write('a\n'), outputs=('x', )),
+                Stage(name='b', function=stage_b, outputs=('y', )),
+                Stage(name='c', function=lambda: order.append('c'), inputs=('x', 'y'))],
+            stream=self.stream,
+            max_workers=2)
+        with self.assertRaisesRegex(ValueError, 'stage b failed'):
+            scheduler.run()
+        self.assertEqual('a\nb\n', self.stream.getvalue())
+        self.assertEqual([], order)
+        return